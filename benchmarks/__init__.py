@@ -0,0 +1,11 @@
+"""
+NEXUS AI benchmark suite
+
+Repeatable micro and macro benchmarks for the executor, output store,
+context building, completion and startup hot paths. Runs offline: model
+CLIs are replaced by fake scripts and command output is synthetic.
+
+    python -m benchmarks                 # run and compare with the baseline
+    python -m benchmarks --save          # record a new baseline
+    python -m benchmarks -k output       # only benchmarks matching "output"
+"""
@@ -0,0 +1,88 @@
+# benchmarks/__main__.py
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+BENCH_MODULES = ("bench_checkpoint", "bench_executor", "bench_output", "bench_repl", "bench_startup")
+
+
+def isolate_environment(workdir: Path):
+    """Point HOME at a scratch dir and fake model CLIs onto PATH
+
+    Must run before nexus_ai is imported: several modules resolve paths
+    under ~/.nexus-ai at import time.
+    """
+    from benchmarks.fakes import install_fake_model_clis
+
+    os.environ["HOME"] = str(workdir / "home")
+    os.environ.pop("NEXUS_TRACE", None)
+    (workdir / "home").mkdir()
+    install_fake_model_clis(workdir / "bin")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="NEXUS AI benchmarks")
+    parser.add_argument("-k", dest="pattern", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--save", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown of the median before failing (default: 0.25)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="nexus-bench-") as workdir:
+        isolate_environment(Path(workdir))
+
+        import importlib
+        from benchmarks import harness
+        for module in BENCH_MODULES:
+            importlib.import_module(f"benchmarks.{module}")
+
+        selected = [bench for name, bench in harness.BENCHMARKS.items()
+                    if not args.pattern or args.pattern in name]
+        if not selected:
+            print(f"✗ No benchmarks match '{args.pattern}'")
+            return 1
+
+        baseline = None if args.save else harness.load_baseline(args.baseline)
+        previous_results = baseline.get("results", {}) if baseline else {}
+
+        harness.print_header()
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        results = {}
+        try:
+            for bench in selected:
+                results[bench.name] = harness.run_benchmark(bench, loop)
+                print(harness.format_row(bench.name, results[bench.name], previous_results.get(bench.name)))
+        finally:
+            loop.close()
+
+    if args.save:
+        if args.pattern and args.baseline.exists():
+            # Partial run: keep the other benchmarks' baselines
+            merged = harness.load_baseline(args.baseline)["results"]
+            merged.update(results)
+            results = merged
+        harness.save_baseline(args.baseline, results)
+        print(f"✓ Baseline saved to {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"⚠ No baseline at {args.baseline}; run with --save to record one")
+        return 0
+
+    regressions = harness.compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"✗ {len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"✓ No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+# benchmarks/bench_checkpoint.py
+import os
+import pickle
+import tempfile
+
+from benchmarks.harness import benchmark
+from nexus_ai.core.checkpoint import NamespaceCheckpointer
+
+
+def namespace():
+    """64 MB of array-like buffers plus ordinary Python objects"""
+    names = {f"array_{i}": pickle.PickleBuffer(bytearray(os.urandom(4 * 2**20))) for i in range(16)}
+    names["rows"] = [{"id": i, "name": f"row {i}"} for i in range(20_000)]
+    names["text"] = "x" * 2**20
+    return names
+
+
+@benchmark("checkpoint.save_64mb", repeat=5)
+def save():
+    values = namespace()
+    tmp = tempfile.mkdtemp()
+
+    def body():
+        NamespaceCheckpointer(os.path.join(tmp, str(len(os.listdir(tmp))))).save(values)
+    return body
+
+
+@benchmark("checkpoint.resave_one_changed_64mb", repeat=5)
+def resave():
+    """Only the changed name is written again"""
+    values = namespace()
+    checkpointer = NamespaceCheckpointer(tempfile.mkdtemp())
+    checkpointer.save(values)
+
+    def body():
+        values["counter"] = values.get("counter", 0) + 1
+        checkpointer.save(values)
+    return body
+
+
+@benchmark("checkpoint.restore_lazy_64mb", repeat=7, number=10)
+def restore():
+    checkpointer = NamespaceCheckpointer(tempfile.mkdtemp())
+    checkpointer.save(namespace())
+
+    def body():
+        lazy, _, _ = checkpointer.restore()
+        lazy["rows"]
+    return body
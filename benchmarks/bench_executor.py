@@ -0,0 +1,134 @@
+# benchmarks/bench_executor.py
+import contextlib
+import os
+import pty
+import sys
+
+from benchmarks.harness import benchmark
+from nexus_ai.core.capture import capture
+from nexus_ai.core.executor import CodeExecutor
+from nexus_ai.core.pmap import pmap
+from nexus_ai.core.session import Session
+
+
+@contextlib.contextmanager
+def _discard_stdout():
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+@benchmark("executor.captured_200k_lines", repeat=5)
+def captured_throughput():
+    executor = CodeExecutor(Session())
+
+    async def body():
+        with _discard_stdout():
+            stdout, _ = await executor._execute_captured_async("seq 1 200000")
+        assert stdout.endswith("200000\n")
+    return body
+
+
+@benchmark("executor.captured_spawn", repeat=7, number=10)
+def captured_spawn():
+    executor = CodeExecutor(Session())
+
+    async def body():
+        with _discard_stdout():
+            await executor._execute_captured_async("true")
+    return body
+
+
+@benchmark("executor.capture_200k_lines", repeat=5)
+def capture_throughput():
+    """Same command as captured_200k_lines, piped into a variable with |>"""
+    async def body():
+        captured = await capture("seq 1 200000")
+        assert captured[-7:] == b"200000\n"
+    return body
+
+
+@benchmark("executor.capture_256mb", repeat=3)
+def capture_large():
+    async def body():
+        captured = await capture("head -c 268435456 /dev/zero")
+        assert len(captured) == 268435456
+    return body
+
+
+@benchmark("executor.pty_relay_20k_lines", repeat=5)
+def pty_relay():
+    """The interactive relay with stdin on a pty slave and output to /dev/null"""
+    executor = CodeExecutor(Session())
+
+    def body():
+        master_fd, slave_fd = pty.openpty()
+        saved_stdin, saved_stdout = sys.stdin, sys.stdout
+        try:
+            with open(slave_fd, "r", closefd=True) as fake_stdin, open(os.devnull, "w") as devnull:
+                sys.stdin, sys.stdout = fake_stdin, devnull
+                stdout, stderr = executor._execute_interactive_bash("seq 1 20000")
+        finally:
+            sys.stdin, sys.stdout = saved_stdin, saved_stdout
+            os.close(master_fd)
+        assert not stderr, stderr
+    return body
+
+
+@benchmark("executor.python_eval", repeat=7, number=1000)
+def python_eval():
+    executor = CodeExecutor(Session())
+    executor.session.python_locals["values"] = list(range(100))
+
+    def body():
+        executor.execute_python("sum(values)")
+    return body
+
+
+@benchmark("executor.python_eval_async", repeat=7, number=1000)
+def python_eval_async():
+    """python_eval through the REPL's path (timing includes one run_until_complete)"""
+    executor = CodeExecutor(Session())
+    executor.session.python_locals["values"] = list(range(100))
+
+    async def body():
+        await executor.execute_python_async("sum(values)")
+    return body
+
+
+@benchmark("executor.python_await_gather_1000", repeat=5)
+def python_await_gather():
+    """A cell fanning out 1000 tasks that each print"""
+    executor = CodeExecutor(Session())
+    executor.execute_python("import asyncio")
+    executor.execute_python("async def work(i):\n    await asyncio.sleep(0)\n    print(i)\n    return i")
+
+    async def body():
+        stdout, _ = await executor.execute_python_async(
+            "sum(await asyncio.gather(*(work(i) for i in range(1000))))")
+        assert stdout.endswith("499500\n")
+    return body
+
+
+@benchmark("executor.python_trial_512mb", repeat=5)
+def python_trial():
+    """>? on a 512 MB namespace: a fork, not a copy, so it shouldn't grow with the data"""
+    executor = CodeExecutor(Session())
+    executor.session.python_locals["data"] = bytearray(b"x" * 512 * 2**20)
+    executor.session.python_locals["rows"] = [str(i) for i in range(1_000_000)]
+
+    async def body():
+        trial = await executor.execute_python_trial("data[0] = 0\nn = len(rows)")
+        assert list(trial.changed) == ["n"] and "data" in trial.unpicklable
+    return body
+
+
+@benchmark("executor.pmap_100k_items", repeat=5)
+def pmap_items():
+    """Dispatch overhead of pmap over a warm pool: a REPL-defined function, 100k items"""
+    namespace = {}
+    exec("def square(x):\n    return x * x", namespace)
+
+    async def body():
+        results = await pmap(namespace["square"], range(100_000))
+        assert results[-1] == 99_999 ** 2
+    return body
@@ -0,0 +1,153 @@
+# benchmarks/bench_output.py
+import tempfile
+
+from benchmarks.fakes import synthetic_output
+from benchmarks.harness import benchmark
+from nexus_ai.core.normalize import normalize_text
+from nexus_ai.core.session import Session
+from nexus_ai.core.spill import LineIndex, SpillStore, compile_search
+from nexus_ai.core.tables import parse_table
+
+
+ENTRIES = 100_000
+
+
+@benchmark("output.store_100k", repeat=5)
+def store_output():
+    outputs = [synthetic_output(3, seed=i) for i in range(64)]
+
+    def body():
+        manager = Session().output_manager
+        for i in range(ENTRIES):
+            manager.store_output("bash_output", outputs[i % 64])
+    return body
+
+
+@benchmark("output.history_memory_100k", repeat=3, memory=True)
+def history_memory():
+    """Per-entry cost of a history holding 100k entries"""
+    outputs = [synthetic_output(3, seed=i) for i in range(64)]
+
+    def body():
+        session = Session()
+        session.output_manager.max_history = ENTRIES
+        for i in range(ENTRIES):
+            session.output_manager.store_output("bash_output", outputs[i % 64])
+        return session
+    return body
+
+
+@benchmark("output.recent_context", repeat=7, number=1000)
+def recent_context():
+    session = Session()
+    for i in range(ENTRIES):
+        session.output_manager.store_output("bash_output", synthetic_output(3, seed=i % 64))
+
+    def body():
+        session.output_manager.get_recent_context(limit=10)
+    return body
+
+
+@benchmark("output.recent_context_large", repeat=7, number=100)
+def recent_context_large():
+    """Context built from outputs the size of a noisy build log"""
+    session = Session()
+    for i in range(10):
+        session.output_manager.store_output("bash_output", synthetic_output(2000, seed=i))
+
+    def body():
+        session.output_manager.get_recent_context(limit=10)
+    return body
+
+
+@benchmark("output.spill_200k_lines", repeat=5)
+def spill_large_output():
+    """Storing a huge output: spill to disk plus head/tail preview"""
+    text = synthetic_output(200_000)
+    manager = Session().output_manager
+
+    def body():
+        manager.spills = SpillStore()  # no dedupe hits between runs
+        manager.store_output("bash_stdout", text, label="synthetic")
+    return body
+
+
+@benchmark("output.store_repeated_300_lines", repeat=5)
+def store_repeated():
+    """The same mid-sized output (e.g. git diff) stored over and over"""
+    text = synthetic_output(300)
+
+    def body():
+        manager = Session().output_manager
+        for _ in range(1000):
+            manager.store_output("bash_stdout", text)
+    return body
+
+
+@benchmark("output.rerun_diff_5000_lines", repeat=5)
+def rerun_diff():
+    """A 5,000-line command re-run 20 times with one line changing each time"""
+    lines = synthetic_output(5000).splitlines()
+    spill_dir = tempfile.mkdtemp()
+
+    def body():
+        manager = Session().output_manager
+        manager.spills = SpillStore(spill_dir)
+        for run in range(20):
+            lines[run * 200] = f"changed in run {run}"
+            manager.store_command_output("bash_stdout", "\n".join(lines), "kubectl get pods", diff=True)
+    return body
+
+
+@benchmark("pager.index_and_search_200k_lines", repeat=5)
+def index_and_search():
+    manager = Session().output_manager
+    manager.store_output("bash_stdout", synthetic_output(200_000), label="synthetic")
+    path = manager.spills.get().path
+    pattern = compile_search("item 199998")
+
+    def body():
+        with LineIndex(path) as index:
+            index.lines(100_000, 50)
+            assert index.search(pattern, 0) is not None
+    return body
+
+
+@benchmark("output.normalize_200k_lines", repeat=5)
+def normalize_noisy_output():
+    """Progress redraws, colors and repeated lines through the normalization pipeline"""
+    noisy = "".join(
+        f"\x1b[32mstep {i // 50}\x1b[0m\rprogress {i % 100:3d}%\n" if i % 3 else "waiting...\n"
+        for i in range(200_000)
+    )
+
+    def body():
+        normalize_text(noisy, "pip install -r requirements.txt")
+    return body
+
+
+def _ps_like(rows: int) -> str:
+    lines = ["USER       PID %CPU %MEM    VSZ   RSS TTY      STAT START   TIME COMMAND"]
+    for i in range(rows):
+        lines.append(f"user{i % 13:<5} {i:>6} {i % 97 / 10:4.1f} {i % 31 / 10:4.1f} {i * 7 % 900000:>6} "
+                     f"{i * 3 % 90000:>5} ?        S    09:12   0:0{i % 10} /usr/bin/worker --id {i}")
+    return "\n".join(lines) + "\n"
+
+
+@benchmark("tables.parse_200k_rows", repeat=5)
+def parse_rows():
+    text = _ps_like(200_000)
+
+    def body():
+        table = parse_table(text)
+        assert len(table) == 200_000
+    return body
+
+
+@benchmark("tables.where_sort_200k_rows", repeat=5)
+def where_sort():
+    table = parse_table(_ps_like(200_000))
+
+    def body():
+        table.where("%CPU", ">", 5).sort("RSS", reverse=True)
+    return body
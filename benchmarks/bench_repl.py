@@ -0,0 +1,44 @@
+# benchmarks/bench_repl.py
+import os
+import time
+
+from prompt_toolkit.completion import CompleteEvent
+from prompt_toolkit.document import Document
+
+from benchmarks.harness import benchmark
+from nexus_ai.core.session import Session
+from nexus_ai.repl.completion import ExecutableIndex
+from nexus_ai.repl.history import HistoryIndex
+from nexus_ai.repl.prompt_toolkit_repl import NexusCompleter
+
+
+COMPLETER_INPUTS = ["", "he", "> pri", "> os.pa", "> os.path.jo", "> data", "!g", "!ls ", "%ti", "claude -"]
+
+
+@benchmark("completer.get_completions", repeat=7, number=20)
+def completer():
+    session = Session()
+    session.python_locals.update({"os": os, "data": list(range(10)), "dataset": {}})
+    executables = ExecutableIndex()
+    executables.refresh()
+    nexus_completer = NexusCompleter(session, executables)
+    documents = [Document(text) for text in COMPLETER_INPUTS]
+    event = CompleteEvent(completion_requested=True)
+
+    def body():
+        for document in documents:
+            list(nexus_completer.get_completions(document, event))
+    return body
+
+
+@benchmark("history.best_match_100k", repeat=7, number=1000)
+def history_best_match():
+    index = HistoryIndex()
+    now = time.time()
+    for i in range(100_000):
+        index.add(f"git commit -m 'change {i}'" if i % 2 else f"ls -la /tmp/dir{i}", now - i)
+
+    def body():
+        index.best_match("git c", now)
+        index.best_match("ls -la /tmp/dir9", now)
+    return body
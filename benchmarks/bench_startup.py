@@ -0,0 +1,34 @@
+# benchmarks/bench_startup.py
+import subprocess
+import sys
+
+from benchmarks.harness import benchmark
+from nexus_ai.models.claude_local import ClaudeLocal
+
+
+def _cold_import(module: str):
+    def body():
+        subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+    return body
+
+
+@benchmark("startup.import_main", repeat=5)
+def import_main():
+    return _cold_import("nexus_ai.main")
+
+
+@benchmark("startup.import_repl", repeat=5)
+def import_repl():
+    return _cold_import("nexus_ai.repl.prompt_toolkit_repl")
+
+
+@benchmark("model.claude_local_roundtrip", repeat=5, number=3)
+def claude_local_roundtrip():
+    """Spawn, prompt and read back a fake `claude -p` on PATH"""
+    model = ClaudeLocal()
+    context = "\n".join(f"[ts] bash_output: line {i}" for i in range(200))
+
+    async def body():
+        response = await model.get_response("summarize", context)
+        assert response.startswith("Fake model response")
+    return body
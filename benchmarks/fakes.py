@@ -0,0 +1,31 @@
+# benchmarks/fakes.py
+import os
+import stat
+from pathlib import Path
+
+
+FAKE_MODEL_SCRIPT = """#!/bin/sh
+# Offline stand-in for `claude -p` / `gemini -p`: swallow the prompt, answer
+cat > /dev/null
+printf 'Fake model response line %s\\n' 1 2 3 4 5 6 7 8 9 10
+"""
+
+
+def install_fake_model_clis(bin_dir: Path):
+    """Put fake claude/gemini commands first on PATH"""
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    for name in ("claude", "gemini"):
+        path = bin_dir / name
+        path.write_text(FAKE_MODEL_SCRIPT)
+        path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+
+
+def synthetic_output(lines: int, width: int = 80, seed: int = 0) -> str:
+    """Deterministic log-like command output"""
+    rows = []
+    for i in range(lines):
+        level = ("INFO", "WARN", "DEBUG", "ERROR")[(i + seed) % 4]
+        text = f"2025-01-01T00:00:{i % 60:02d} {level} worker-{i % 8} processed item {i + seed}"
+        rows.append(text.ljust(width, "."))
+    return "\n".join(rows) + "\n"
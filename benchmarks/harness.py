@@ -0,0 +1,134 @@
+# benchmarks/harness.py
+import asyncio
+import inspect
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Benchmark:
+    """A registered benchmark: setup() returns the body that gets timed"""
+
+    def __init__(self, name: str, setup: Callable, repeat: int, number: int, memory: bool):
+        self.name = name
+        self.setup = setup
+        self.repeat = repeat
+        self.number = number
+        self.memory = memory
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, repeat: int = 5, number: int = 1, memory: bool = False):
+    """Register a benchmark
+
+    The decorated function does any setup and returns a zero-argument
+    callable (plain or async) that is timed ``number`` times per repeat.
+    With ``memory=True`` one more run is traced with tracemalloc: the
+    peak, the memory still held by the body's return value, and the
+    number of allocated blocks are reported too.
+    """
+    def register(setup: Callable) -> Callable:
+        BENCHMARKS[name] = Benchmark(name, setup, repeat, number, memory)
+        return setup
+    return register
+
+
+def run_benchmark(bench: Benchmark, loop: asyncio.AbstractEventLoop) -> Dict[str, Any]:
+    body = bench.setup()
+    is_async = inspect.iscoroutinefunction(body)
+
+    # One untimed warm-up run
+    loop.run_until_complete(body()) if is_async else body()
+
+    samples: List[float] = []
+    for _ in range(bench.repeat):
+        start = time.perf_counter()
+        for _ in range(bench.number):
+            loop.run_until_complete(body()) if is_async else body()
+        samples.append((time.perf_counter() - start) / bench.number)
+
+    result = {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "repeat": bench.repeat,
+        "number": bench.number,
+    }
+    if bench.memory:
+        result.update(measure_memory(body, is_async, loop))
+    return result
+
+
+def measure_memory(body: Callable, is_async: bool, loop: asyncio.AbstractEventLoop) -> Dict[str, int]:
+    """Trace one run; memory held by the return value counts as retained"""
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        before = tracemalloc.take_snapshot()
+        kept = loop.run_until_complete(body()) if is_async else body()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+        del kept
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": peak - start, "retained_bytes": current - start, "blocks": blocks}
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.node(),
+    }
+
+
+def load_baseline(path: Path) -> Optional[Dict]:
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path: Path, results: Dict[str, Dict]):
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+
+
+def compare(results: Dict[str, Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """Return the names of benchmarks slower than baseline by more than tolerance"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        if result["median"] > previous["median"] * (1 + tolerance):
+            regressions.append(name)
+        elif result.get("retained_bytes", 0) > previous.get("retained_bytes", float("inf")) * (1 + tolerance):
+            regressions.append(f"{name} (memory)")
+    return regressions
+
+
+def format_row(name: str, result: Dict, previous: Optional[Dict]) -> str:
+    median_ms = result["median"] * 1000
+    row = f"{name:<34} {median_ms:>12.3f} ms"
+    if previous:
+        change = result["median"] / previous["median"] - 1
+        row += f"   {change:+7.1%} vs baseline"
+    if "retained_bytes" in result:
+        row += (f"\n{'':<34} {result['retained_bytes'] / 2**20:>12.2f} MB retained, "
+                f"{result['peak_bytes'] / 2**20:.2f} MB peak, {result['blocks']:,} blocks")
+        if previous and previous.get("retained_bytes"):
+            row += f"   {result['retained_bytes'] / previous['retained_bytes'] - 1:+7.1%} vs baseline"
+    return row
+
+
+def print_header():
+    env = environment()
+    print(f"NEXUS benchmarks — Python {env['python']} on {env['platform']}", file=sys.stderr)
@@ -0,0 +1,132 @@
+# nexus_ai/core/blobs.py
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+
+# Shorter outputs are stored as plain strings: a blob would cost more than it saves
+BLOB_MIN_CHARS = 256
+COMPRESS_MIN_BYTES = 4096
+
+
+class BlobRef:
+    """Shared handle to one unique output, stored as text or zlib-compressed UTF-8
+
+    History entries holding equal outputs point at the same BlobRef, and it
+    behaves enough like a str (str(), ==, in, len) for existing readers.
+    """
+
+    __slots__ = ("store", "digest", "payload", "compressed", "length", "refs")
+
+    def __init__(self, store: "BlobStore", digest: str, payload: Union[str, bytes],
+                 compressed: bool, length: int):
+        self.store = store
+        self.digest = digest
+        self.payload = payload
+        self.compressed = compressed
+        self.length = length
+        self.refs = 0
+
+    def text(self) -> str:
+        if not self.compressed:
+            return self.payload
+        return self.store._decompress(self)
+
+    def __str__(self) -> str:
+        return self.text()
+
+    def __format__(self, spec: str) -> str:
+        return format(self.text(), spec)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BlobRef):
+            return self.digest == other.digest
+        if isinstance(other, str):
+            return len(other) == self.length and self.text() == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.text()
+
+    def __repr__(self) -> str:
+        return f"BlobRef({self.digest[:12]}, {self.length} chars)"
+
+    def __reduce__(self):
+        # Pickles (e.g. daemon session eviction) carry the text itself
+        return (str, (self.text(),))
+
+
+Content = Union[str, BlobRef]
+
+
+class BlobStore:
+    """Content-addressed, reference-counted output store
+
+    Identical outputs are kept once (keyed by SHA-256); large ones are
+    zlib-compressed and only inflated when read, through a small LRU cache.
+    """
+
+    def __init__(self, cache_size: int = 8, compress_level: int = 1):
+        self.blobs: Dict[str, BlobRef] = {}
+        self.cache_size = cache_size
+        self.compress_level = compress_level
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+
+    def put(self, text: str) -> Content:
+        """Intern text, returning a shared BlobRef (or text itself if short)"""
+        if isinstance(text, BlobRef):
+            text.refs += 1
+            return text
+        if len(text) < BLOB_MIN_CHARS:
+            return text
+        data = text.encode("utf-8", errors="surrogatepass")
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self.blobs.get(digest)
+        if blob is None:
+            blob = self._new_blob(digest, text, data)
+            self.blobs[digest] = blob
+        blob.refs += 1
+        return blob
+
+    def _new_blob(self, digest: str, text: str, data: bytes) -> BlobRef:
+        if len(data) >= COMPRESS_MIN_BYTES:
+            packed = zlib.compress(data, self.compress_level)
+            if len(packed) < len(data):
+                return BlobRef(self, digest, packed, True, len(text))
+        return BlobRef(self, digest, text, False, len(text))
+
+    def _decompress(self, blob: BlobRef) -> str:
+        text = self._cache.get(blob.digest)
+        if text is not None:
+            self._cache.move_to_end(blob.digest)
+            return text
+        text = zlib.decompress(blob.payload).decode("utf-8", errors="surrogatepass")
+        self._cache[blob.digest] = text
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return text
+
+    def release(self, content: Optional[Content]):
+        """Drop one reference; the blob is freed with its last reference"""
+        if not isinstance(content, BlobRef):
+            return
+        content.refs -= 1
+        if content.refs <= 0 and self.blobs.get(content.digest) is content:
+            del self.blobs[content.digest]
+            self._cache.pop(content.digest, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "blobs": len(self.blobs),
+            "references": sum(blob.refs for blob in self.blobs.values()),
+            "text_chars": sum(blob.length for blob in self.blobs.values()),
+            "stored_bytes": sum(len(blob.payload) if blob.compressed else blob.length
+                                for blob in self.blobs.values()),
+        }
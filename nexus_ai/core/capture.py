@@ -0,0 +1,235 @@
+# nexus_ai/core/capture.py
+import asyncio
+import fcntl
+import mmap
+import os
+import pickle
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from nexus_ai.core.rusage import ShellProcess, Usage
+from nexus_ai.core.spill import SPILL_DIR
+
+
+# Outputs larger than this move from memory to a spill file on disk
+CAPTURE_SPILL_BYTES = int(os.getenv("NEXUS_CAPTURE_SPILL_BYTES", str(64 * 2**20)))
+
+# Also the largest result returned as a bytearray rather than a mapping
+_READ_SIZE = 2**20
+# Reads per event-loop callback, so a fast producer can't starve the prompt
+_READS_PER_WAKEUP = 16
+
+Buffer = Union[bytes, bytearray, mmap.mmap]
+
+
+class CapturedOutput:
+    """A command's stdout as raw bytes: a bytearray, or a memory mapping when large
+
+    Nothing is decoded until asked: view() is a zero-copy memoryview,
+    text() decodes everything and lines() decodes one line at a time,
+    so `for line in out` streams even a multi-gigabyte capture.
+    """
+
+    def __init__(self, data: Buffer, command: str = "", returncode: int = 0, stderr: str = "",
+                 spilled: bool = False, usage: Optional[Usage] = None):
+        self.data = data
+        self.command = command
+        self.returncode = returncode
+        self.stderr = stderr
+        self.spilled = spilled
+        self.usage = usage
+
+    @property
+    def mapped(self) -> bool:
+        return isinstance(self.data, mmap.mmap)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.data)
+
+    def __getitem__(self, index):
+        return self.data[index]
+
+    def view(self) -> memoryview:
+        return memoryview(self.data)
+
+    def text(self, encoding: str = "utf-8", errors: str = "replace") -> str:
+        return str(self.view(), encoding, errors)
+
+    def byte_lines(self) -> Iterator[bytes]:
+        data, start, end = self.data, 0, len(self.data)
+        while start < end:
+            stop = data.find(b"\n", start)
+            if stop < 0:
+                stop = end
+            yield data[start:stop]
+            start = stop + 1
+
+    def lines(self, encoding: str = "utf-8", errors: str = "replace") -> Iterator[str]:
+        for line in self.byte_lines():
+            yield line.decode(encoding, errors)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.lines()
+
+    def table(self, kind: Optional[str] = None):
+        """Parse into a Table of typed columns (see nexus_ai.core.tables)"""
+        # Imported here: most captures are never parsed as tables
+        from nexus_ai.core.tables import parse_table
+        return parse_table(self, kind)
+
+    def describe(self) -> str:
+        size = len(self.data)
+        amount = f"{size / 2**20:,.1f} MB" if size >= 2**20 else f"{size:,} bytes"
+        where = ", spilled to disk" if self.spilled else ", memory-mapped" if self.mapped else ""
+        status = f", exit {self.returncode}" if self.returncode else ""
+        return f"CapturedOutput({amount}{where}{status})"
+
+    def __repr__(self) -> str:
+        return self.describe()
+
+    def __reduce_ex__(self, protocol):
+        # Protocol 5 hands the bytes to checkpoints out-of-band, uncopied
+        data = pickle.PickleBuffer(self.data) if protocol >= 5 else bytes(self.data)
+        return (CapturedOutput, (data, self.command, self.returncode, self.stderr))
+
+
+class _PipeReader:
+    """Move a pipe's contents into a file without passing through user space
+
+    Output collects in an anonymous in-memory file and moves to a spill
+    file on disk past spill_bytes; splice does the copying inside the
+    kernel. Small results are read into one bytearray, anything larger is
+    memory-mapped, so no capture is copied more than once.
+    """
+
+    def __init__(self, fd: int, spill_bytes: int, spill_dir: Path):
+        self.fd = fd
+        self.spill_bytes = spill_bytes
+        self.spill_dir = Path(spill_dir)
+        self.file: Optional[int] = self._memory_file()
+        self.size = 0
+        self.spilled = False
+        os.set_blocking(fd, False)
+
+    def _memory_file(self) -> int:
+        if hasattr(os, "memfd_create"):
+            return os.memfd_create("nexus-capture", os.MFD_CLOEXEC)
+        return self._disk_file()
+
+    def _disk_file(self) -> int:
+        # Unlinked right away: the descriptor (later the mapping) keeps the data
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix="capture-", suffix=".out", dir=self.spill_dir)
+        os.unlink(path)
+        return fd
+
+    async def drain(self):
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def on_readable():
+            try:
+                if self._read():
+                    return
+            except Exception as e:
+                if not done.done():
+                    done.set_exception(e)
+                return
+            if not done.done():
+                done.set_result(None)
+
+        loop.add_reader(self.fd, on_readable)
+        try:
+            await done
+        finally:
+            loop.remove_reader(self.fd)
+
+    def _read(self) -> bool:
+        """Move what is available; False at end of output"""
+        for _ in range(_READS_PER_WAKEUP):
+            try:
+                count = self._move()
+            except BlockingIOError:
+                return True
+            if count == 0:
+                return False
+            self.size += count
+            if not self.spilled and self.size >= self.spill_bytes:
+                self._spill()
+        return True
+
+    def _move(self) -> int:
+        if hasattr(os, "splice"):
+            return os.splice(self.fd, self.file, _READ_SIZE,
+                             flags=os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK)
+        data = os.read(self.fd, _READ_SIZE)
+        os.write(self.file, data)
+        return len(data)
+
+    def _spill(self):
+        disk = self._disk_file()
+        offset = 0
+        while offset < self.size:
+            offset += os.sendfile(disk, self.file, offset, self.size - offset)
+        os.close(self.file)
+        self.file = disk
+        self.spilled = True
+
+    def result(self) -> Buffer:
+        if self.size <= _READ_SIZE:
+            data = bytearray(self.size)
+            read = 0
+            while read < self.size:
+                read += os.preadv(self.file, [memoryview(data)[read:]], read)
+        else:
+            data = mmap.mmap(self.file, 0, access=mmap.ACCESS_READ)
+        self.close()
+        return data
+
+    def close(self):
+        if self.file is not None:
+            os.close(self.file)
+            self.file = None
+
+
+async def capture(command: str, spill_bytes: int = CAPTURE_SPILL_BYTES,
+                  spill_dir: Path = SPILL_DIR) -> CapturedOutput:
+    """Run command and capture its stdout without decoding or line splitting"""
+    read_fd, write_fd = os.pipe()
+    try:
+        # Bigger pipe buffer: fewer reads and wakeups for fast producers
+        fcntl.fcntl(read_fd, fcntl.F_SETPIPE_SZ, _READ_SIZE)
+    except (AttributeError, OSError):
+        pass
+    try:
+        process = await ShellProcess.start(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=write_fd,
+            stderr=subprocess.PIPE,
+        )
+    except Exception:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)
+
+    reader = _PipeReader(read_fd, spill_bytes, spill_dir)
+    try:
+        _, stderr = await asyncio.gather(reader.drain(), process.stderr.read())
+        returncode = await process.wait()
+        data = reader.result()
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+        reader.close()
+        raise
+    finally:
+        os.close(read_fd)
+    return CapturedOutput(data, command, returncode, stderr.decode("utf-8", errors="replace"),
+                          spilled=reader.spilled, usage=process.usage)
@@ -0,0 +1,372 @@
+# nexus_ai/core/cells.py
+import ast
+import builtins
+import functools
+import os
+import types
+from typing import Dict, FrozenSet, Iterator, List, Mapping, Optional, Set, Tuple
+
+
+# Cells kept for 'cells', 'deps' and 'rerun'; the oldest are dropped past this
+MAX_CELLS = int(os.getenv("NEXUS_MAX_CELLS", "1000"))
+
+# Values of these types are fingerprinted by value; anything else by identity
+_VALUE_TYPES = (int, float, complex, bool, str, bytes, type(None), tuple, frozenset, range)
+
+_MISSING = "<unset>"
+
+
+class _NameVisitor(ast.NodeVisitor):
+    """Collect the top-level names a cell reads before writing, and the names it writes
+
+    Names bound inside functions, lambdas and comprehensions are local to
+    them; names they load from outside still count as reads. Assigning to
+    an attribute or item (df.x = 1, d[k] = v) counts as writing the base.
+    """
+
+    def __init__(self):
+        self.reads: Set[str] = set()
+        self.writes: Set[str] = set()
+        self.scopes: List[Set[str]] = []
+
+    def _load(self, name: str):
+        if any(name in scope for scope in self.scopes):
+            return
+        if not self.scopes and name in self.writes:
+            return  # Written earlier in this cell
+        self.reads.add(name)
+
+    def _store(self, name: str):
+        if self.scopes:
+            self.scopes[-1].add(name)
+        else:
+            self.writes.add(name)
+
+    def visit_Name(self, node: ast.Name):
+        if isinstance(node.ctx, ast.Load):
+            self._load(node.id)
+        else:
+            self._store(node.id)
+
+    def visit_AugAssign(self, node: ast.AugAssign):
+        self.visit(node.value)
+        if isinstance(node.target, ast.Name):
+            self._load(node.target.id)
+        self.visit(node.target)
+
+    def _base_store(self, node):
+        base = node
+        while isinstance(base, (ast.Attribute, ast.Subscript)):
+            base = base.value
+        if isinstance(base, ast.Name):
+            self._load(base.id)
+            self._store(base.id)
+
+    def visit_Attribute(self, node: ast.Attribute):
+        if isinstance(node.ctx, (ast.Store, ast.Del)):
+            self._base_store(node)
+            return
+        self.generic_visit(node)
+
+    def visit_Subscript(self, node: ast.Subscript):
+        if isinstance(node.ctx, (ast.Store, ast.Del)):
+            self._base_store(node)
+            self.visit(node.slice)
+            return
+        self.generic_visit(node)
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self._store(alias.asname or alias.name.split(".")[0])
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        for alias in node.names:
+            if alias.name != "*":
+                self._store(alias.asname or alias.name)
+
+    def _function(self, node, name: Optional[str]):
+        for decorator in getattr(node, "decorator_list", []):
+            self.visit(decorator)
+        for default in node.args.defaults + [d for d in node.args.kw_defaults if d]:
+            self.visit(default)
+        if name:
+            self._store(name)
+        arguments = node.args
+        params = {a.arg for a in arguments.posonlyargs + arguments.args + arguments.kwonlyargs}
+        params.update(a.arg for a in (arguments.vararg, arguments.kwarg) if a)
+        self.scopes.append(params)
+        body = node.body if isinstance(node.body, list) else [node.body]
+        # Bind every local first: a function can use a name it assigns later
+        for statement in body:
+            for child in ast.walk(statement):
+                if isinstance(child, ast.Name) and not isinstance(child.ctx, ast.Load):
+                    self.scopes[-1].add(child.id)
+        for statement in body:
+            self.visit(statement)
+        self.scopes.pop()
+
+    def visit_FunctionDef(self, node):
+        self._function(node, node.name)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node: ast.Lambda):
+        self._function(node, None)
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        for expression in node.decorator_list + node.bases + [k.value for k in node.keywords]:
+            self.visit(expression)
+        self.scopes.append(set())
+        for statement in node.body:
+            self.visit(statement)
+        self.scopes.pop()
+        self._store(node.name)
+
+    def _comprehension(self, node):
+        self.scopes.append(set())
+        for generator in node.generators:
+            self.visit(generator.iter)
+            self.visit(generator.target)
+            for condition in generator.ifs:
+                self.visit(condition)
+        for field in ("elt", "key", "value"):
+            if hasattr(node, field):
+                self.visit(getattr(node, field))
+        self.scopes.pop()
+
+    visit_ListComp = visit_SetComp = visit_GeneratorExp = visit_DictComp = _comprehension
+
+    def visit_Global(self, node: ast.Global):
+        for name in node.names:
+            self.writes.add(name)
+
+
+@functools.lru_cache(maxsize=256)
+def analyze(code: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """(reads, writes) of a Python cell; both empty if it doesn't parse
+
+    Cached: the same snippet typed again (or re-run) isn't parsed twice.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return frozenset(), frozenset()
+    visitor = _NameVisitor()
+    visitor.visit(tree)
+    return frozenset(visitor.reads), frozenset(visitor.writes)
+
+
+def global_names(code: types.CodeType) -> Set[str]:
+    """Global (and attribute) names compiled code refers to, nested functions included"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= global_names(const)
+    return names
+
+
+def by_value(value) -> bool:
+    """Whether value is plain immutable data, which can't change in place"""
+    if not isinstance(value, _VALUE_TYPES):
+        return False
+    try:
+        hash(value)
+    except TypeError:
+        return False  # A tuple holding mutable objects
+    return True
+
+
+def fingerprint(value) -> str:
+    """Cheap identity of a value: by value for plain data, by object otherwise
+
+    In-place mutation of a mutable object is not seen, except through
+    item or attribute assignment in a recorded cell.
+    """
+    if by_value(value):
+        return f"{type(value).__name__}:{hash(value)}"
+    return f"{type(value).__name__}@{id(value):x}"
+
+
+class Cell:
+    """One executed Python snippet and what it read and wrote"""
+
+    __slots__ = ("number", "code", "reads", "writes", "sources", "inputs", "outputs", "runs",
+                 "failed", "claimed")
+
+    def __init__(self, number: int, code: str, reads: FrozenSet[str], writes: FrozenSet[str]):
+        self.number = number
+        self.code = code
+        self.reads = reads
+        self.writes = writes
+        # For each name read, the cell that last wrote it before this one
+        self.sources: Dict[str, int] = {}
+        self.inputs: Dict[str, str] = {}
+        self.outputs: Dict[str, str] = {}
+        self.runs = 0
+        self.failed = False
+        # Whether it has run cleanly and so become the last writer of its names
+        self.claimed = False
+
+    def describe(self, width: int = 60) -> str:
+        code = " ⏎ ".join(line.strip() for line in self.code.strip().splitlines())
+        if len(code) > width:
+            code = code[:width - 1] + "…"
+        reads = ", ".join(sorted(self.reads)) or "-"
+        writes = ", ".join(sorted(self.writes)) or "-"
+        status = " ✗" if self.failed else ""
+        return f"[{self.number}]{status} {code}\n      reads: {reads}  writes: {writes}"
+
+
+class CellGraph:
+    """Executed cells linked by the names they pass to each other
+
+    A cell depends on the latest earlier cell writing each name it reads,
+    found through a map of each name's last writer (a cell only becomes
+    one once it has run without failing); the reverse edges make
+    downstream one traversal. Fingerprints of those names, taken when the
+    cell ran, tell whether re-running it would see different inputs.
+    A cell whose writes have all been overwritten, with no cell reading
+    them, is dropped; past max_cells the oldest go too.
+    """
+
+    def __init__(self, max_cells: int = MAX_CELLS):
+        self.cells: Dict[int, Cell] = {}
+        self.next_number = 1
+        self.max_cells = max_cells
+        self.last_writer: Dict[str, int] = {}
+        self.dependents: Dict[int, Set[int]] = {}
+        # When each name was last read or written by a cell, on a clock
+        # ticking at every cell start and finish (see touched_since)
+        self.clock = 0
+        self.touched_at: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def get(self, number: int) -> Optional[Cell]:
+        return self.cells.get(number)
+
+    def latest(self) -> Optional[Cell]:
+        """The cell registered last (numbers have gaps once cells are dropped)"""
+        return self.cells[next(reversed(self.cells))] if self.cells else None
+
+    def begin(self, code: str, namespace: Mapping) -> Cell:
+        """Register a cell about to run, fingerprinting the names it reads"""
+        reads, writes = analyze(code)
+        # Builtins (print, len) are only inputs when the namespace shadows them
+        reads = frozenset(name for name in reads if name in namespace or not hasattr(builtins, name))
+        cell = Cell(self.next_number, code, reads, writes)
+        self.next_number += 1
+        self.cells[cell.number] = cell
+        self._link(cell)
+        self.snapshot_inputs(cell, namespace)
+        self._touch(cell)
+        while len(self.cells) > self.max_cells:
+            self._drop(next(iter(self.cells)))
+        return cell
+
+    def _link(self, cell: Cell):
+        cell.sources = {name: self.last_writer[name] for name in cell.reads if name in self.last_writer}
+        for source in set(cell.sources.values()):
+            self.dependents.setdefault(source, set()).add(cell.number)
+
+    def _claim(self, cell: Cell):
+        """Make a cell that ran cleanly the last writer of its names, dropping cells it superseded"""
+        cell.claimed = True
+        superseded = set()
+        for name in cell.writes:
+            previous = self.last_writer.get(name)
+            # A later cell that finished first keeps the name
+            if previous is None or previous < cell.number:
+                if previous is not None:
+                    superseded.add(previous)
+                self.last_writer[name] = cell.number
+        # Itself too, if later cells already hold all its names
+        for number in [*superseded, cell.number]:
+            self._compact(number)
+
+    def _compact(self, number: int):
+        """Drop cell number if nothing reads what it wrote and it is no name's last writer"""
+        cell = self.cells.get(number)
+        if (cell is None or not cell.writes or self.dependents.get(number)
+                or any(self.last_writer.get(name) == number for name in cell.writes)):
+            return
+        self._drop(number)
+
+    def _drop(self, number: int):
+        cell = self.cells.pop(number)
+        self.dependents.pop(number, None)
+        for name in cell.writes:
+            if self.last_writer.get(name) == number:
+                del self.last_writer[name]
+        for source in set(cell.sources.values()):
+            readers = self.dependents.get(source)
+            if readers is not None:
+                readers.discard(number)
+                if not readers:
+                    # Its last reader is gone: it may be superseded now
+                    self._compact(source)
+
+    def snapshot_inputs(self, cell: Cell, namespace: Mapping):
+        cell.inputs = {name: self._fingerprint(namespace, name) for name in cell.reads}
+
+    def finish(self, cell: Cell, namespace: Mapping, failed: bool = False):
+        cell.runs += 1
+        cell.failed = failed
+        cell.outputs = {name: self._fingerprint(namespace, name) for name in cell.writes}
+        if not failed and not cell.claimed and cell.number in self.cells:
+            self._claim(cell)
+        # Again at the end: a cell still running at a checkpoint may change more after it
+        self._touch(cell)
+
+    def _touch(self, cell: Cell):
+        self.clock += 1
+        for name in cell.reads | cell.writes:
+            self.touched_at[name] = self.clock
+
+    def touched_since(self, clock: int) -> Set[str]:
+        """Names a cell read or wrote (so may have changed, even in place) after clock"""
+        return {name for name, at in self.touched_at.items() if at > clock}
+
+    @staticmethod
+    def _fingerprint(namespace: Mapping, name: str) -> str:
+        return fingerprint(namespace[name]) if name in namespace else _MISSING
+
+    def stale(self, cell: Cell, namespace: Mapping) -> List[str]:
+        """Names whose value differs from what the cell last read"""
+        changed = []
+        for name, seen in cell.inputs.items():
+            current = self._fingerprint(namespace, name)
+            # A cell that updates what it reads (x += 1) left x as it should be
+            if current != seen and current != cell.outputs.get(name):
+                changed.append(name)
+        return sorted(changed)
+
+    def upstream(self, number: int) -> Dict[str, int]:
+        """For each name cell `number` reads, the latest earlier cell that writes it"""
+        return {name: source for name, source in self.cells[number].sources.items()
+                if source in self.cells}
+
+    def downstream(self, number: int) -> List[int]:
+        """Cells that depend on cell `number`, directly or transitively, in run order"""
+        affected: Set[int] = set()
+        stack = [number]
+        while stack:
+            for later in self.dependents.get(stack.pop(), ()):
+                if later not in affected:
+                    affected.add(later)
+                    stack.append(later)
+        return sorted(affected)
+
+    def plan(self, namespace: Mapping, start: Optional[int] = None) -> Iterator[Tuple[Cell, List[str]]]:
+        """Cells to consider for re-running, in order, with the inputs that changed
+
+        With start, that cell and its downstream cells; otherwise every
+        cell. Staleness is checked lazily, after earlier cells reran; an
+        empty list means the inputs are unchanged (the start cell always
+        runs regardless).
+        """
+        numbers = sorted(self.cells) if start is None else [start] + self.downstream(start)
+        for number in numbers:
+            cell = self.cells[number]
+            yield cell, self.stale(cell, namespace)
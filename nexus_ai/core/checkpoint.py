@@ -0,0 +1,361 @@
+# nexus_ai/core/checkpoint.py
+import hashlib
+import importlib
+import json
+import mmap
+import os
+import pickle
+import shutil
+import time
+import types
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from nexus_ai.core.cells import CellGraph, global_names
+
+
+CHECKPOINT_DIR = Path.home() / ".nexus-ai" / "checkpoints"
+
+# Buffers smaller than this stay inside the pickle stream instead of a file of their own
+OUT_OF_BAND_MIN_BYTES = 64 * 1024
+
+# Values of these types never change in place, so the same object needs no re-pickling
+_IMMUTABLE = (int, float, complex, bool, str, bytes, range, type(None))
+
+
+class CheckpointError(Exception):
+    """A checkpointed name could not be restored"""
+
+
+class LazyNamespace(dict):
+    """Namespace dict whose checkpointed values load on first access
+
+    Pending names take part in `in`, iteration and len() without being
+    loaded; looking one up (including a name lookup from exec'd code,
+    which goes through __missing__ for dict subclasses) loads it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending: Dict[str, Tuple[Callable[[], Any], Path, Dict]] = {}
+
+    def add_lazy(self, name: str, loader: Callable[[], Any], directory: Path, entry: Dict):
+        dict.pop(self, name, None)
+        self._pending[name] = (loader, directory, entry)
+
+    def pending(self) -> Dict[str, Tuple[Path, Dict]]:
+        """Names not loaded yet, with the checkpoint entry each would load from"""
+        return {name: (directory, entry) for name, (_, directory, entry) in self._pending.items()}
+
+    def __missing__(self, name: str):
+        if name not in self._pending:
+            raise KeyError(name)
+        loader, _, _ = self._pending.pop(name)
+        try:
+            value = loader()
+        except Exception as e:
+            raise CheckpointError(f"could not restore {name!r}: {type(e).__name__}: {e}") from e
+        dict.__setitem__(self, name, value)
+        return value
+
+    def __setitem__(self, name: str, value: Any):
+        self._pending.pop(name, None)
+        dict.__setitem__(self, name, value)
+
+    def __delitem__(self, name: str):
+        if self._pending.pop(name, None) is not None and not dict.__contains__(self, name):
+            return
+        dict.__delitem__(self, name)
+
+    def __contains__(self, name) -> bool:
+        return dict.__contains__(self, name) or name in self._pending
+
+    def __iter__(self) -> Iterator[str]:
+        yield from dict.__iter__(self)
+        yield from list(self._pending)
+
+    def __len__(self) -> int:
+        return dict.__len__(self) + len(self._pending)
+
+    def keys(self):
+        return list(self)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def pop(self, name: str, *default):
+        if name in self._pending:
+            self[name]
+        return dict.pop(self, name, *default)
+
+    def items(self):
+        # Every value is needed here, so load whatever is still pending
+        return [(name, self[name]) for name in list(self)]
+
+    def values(self):
+        return [self[name] for name in list(self)]
+
+    def update(self, *args, **kwargs):
+        for name, value in dict(*args, **kwargs).items():
+            self[name] = value
+
+    def keep_missing(self, other: Dict):
+        """Add the names other has and this lacks, leaving pending ones unloaded"""
+        for name, value in dict.items(other):
+            if name not in self:
+                dict.__setitem__(self, name, value)
+        for name, pending in getattr(other, "_pending", {}).items():
+            if name not in self:
+                self._pending[name] = pending
+
+
+def _lookup(name: str, namespaces: Tuple[Dict, ...]) -> Any:
+    """A loaded value from the first namespace that has it; pending ones stay on disk"""
+    for namespace in namespaces:
+        if dict.__contains__(namespace, name):
+            return dict.__getitem__(namespace, name)
+    return None
+
+
+def checkpoint_dir(session_id: str) -> Path:
+    return CHECKPOINT_DIR / "".join(c if c.isalnum() or c in "_.-" else "_" for c in session_id)
+
+
+def list_checkpoints(root: Optional[Path] = None) -> List[Dict]:
+    """Saved checkpoints, newest first"""
+    root = Path(root or CHECKPOINT_DIR)
+    found = []
+    for manifest in root.glob("*/manifest.json"):
+        try:
+            with open(manifest) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        entries = {**data.get("globals", {}), **data.get("locals", {})}
+        found.append({
+            "name": manifest.parent.name,
+            "path": manifest.parent,
+            "saved_at": data.get("saved_at", 0),
+            "names": len(entries),
+            "bytes": sum(entry.get("bytes", 0) for entry in entries.values()),
+        })
+    return sorted(found, key=lambda c: c["saved_at"], reverse=True)
+
+
+class NamespaceCheckpointer:
+    """Incremental, content-addressed checkpoints of a Python namespace
+
+    Each value is pickled with protocol 5; large buffers (array data)
+    are handed over out-of-band and written raw from their memory, with
+    no copy into the pickle stream. Objects are stored by digest, so a
+    value that has not changed since the last checkpoint is not written
+    again. An unchanged immutable object is not even re-pickled, nor is
+    a mutable one no cell has touched since (given the session's cells).
+    Modules are recorded as imports. Restoring is lazy: values come back
+    through a LazyNamespace and raw buffers are memory-mapped.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.objects = self.directory / "objects"
+        self.manifest_path = self.directory / "manifest.json"
+        self._known: Dict[str, Tuple[Any, Dict]] = {}
+        # CellGraph clock at the last save, when saved with the session's cells
+        self._saved_at_clock: Optional[int] = None
+
+    def save(self, namespace: Dict, globals_ns: Optional[Dict] = None,
+             cells: Optional[CellGraph] = None) -> Dict:
+        """Checkpoint namespace (and globals); returns a report of what was written
+
+        With the session's cells, values no cell has read or written since
+        the last save are taken as unchanged when they are the same objects.
+        """
+        self.objects.mkdir(parents=True, exist_ok=True)
+        report = {"written": 0, "unchanged": 0, "bytes_written": 0, "modules": 0,
+                  "unpicklable": {}, "path": str(self.directory)}
+        known, self._known = self._known, {}
+        touched = self._touched(cells, namespace, globals_ns or {})
+        if cells is not None:
+            self._saved_at_clock = cells.clock
+
+        manifest = {"version": 1, "saved_at": time.time(), "globals": {}, "locals": {}}
+        sections = (("globals", globals_ns or {}), ("locals", namespace))
+        for section, values in sections:
+            pending = values.pending() if isinstance(values, LazyNamespace) else {}
+            for name, (directory, entry) in pending.items():
+                # Never loaded since the last restore, so it cannot have changed
+                manifest[section][name] = self._adopt(directory, entry)
+                report["unchanged"] += 1
+            for name in list(dict.keys(values)):
+                if name.startswith("__"):
+                    continue
+                value = dict.__getitem__(values, name)
+                untouched = (touched is not None and name not in touched[0]
+                             and id(value) not in touched[1])
+                try:
+                    manifest[section][name] = self._entry(f"{section}:{name}", value, known, report,
+                                                          untouched)
+                except pickle.PicklingError as e:
+                    report["unpicklable"][name] = str(e)
+
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+        self._collect(manifest)
+        return report
+
+    def _touched(self, cells: Optional[CellGraph],
+                 *namespaces: Dict) -> Optional[Tuple[Set[str], Set[int]]]:
+        """Names that may have changed in place since the last save, and their objects
+
+        None when unknown (no cells, or no save with them yet): every
+        mutable value is then re-pickled. Functions that cells used count
+        with the globals they refer to, since calling one can change those;
+        another name bound to a touched object counts through its id.
+        """
+        if cells is None or self._saved_at_clock is None:
+            return None
+        names = cells.touched_since(self._saved_at_clock)
+        stack = list(names)
+        while stack:
+            code = getattr(_lookup(stack.pop(), namespaces), "__code__", None)
+            if isinstance(code, types.CodeType):
+                for name in global_names(code) - names:
+                    names.add(name)
+                    stack.append(name)
+        values = (_lookup(name, namespaces) for name in names)
+        return names, {id(value) for value in values if value is not None}
+
+    def _entry(self, key: str, value: Any, known: Dict, report: Dict, untouched: bool = False) -> Dict:
+        if isinstance(value, types.ModuleType):
+            report["modules"] += 1
+            return {"kind": "module", "module": value.__name__}
+
+        previous = known.get(key)
+        if previous is not None and previous[0] is value and (untouched or type(value) in _IMMUTABLE):
+            self._known[key] = previous
+            report["unchanged"] += 1
+            return previous[1]
+
+        buffers: List[memoryview] = []
+
+        def out_of_band(buffer: pickle.PickleBuffer) -> bool:
+            try:
+                raw = buffer.raw()
+            except BufferError:
+                return True  # Not contiguous: keep it in the stream
+            if raw.nbytes < OUT_OF_BAND_MIN_BYTES:
+                return True
+            buffers.append(raw)
+            return False
+
+        try:
+            stream = pickle.dumps(value, protocol=5, buffer_callback=out_of_band)
+        except Exception as e:
+            # Lambdas, open files, sockets, locks, generators...
+            raise pickle.PicklingError(f"{type(e).__name__}: {e}"[:200]) from e
+
+        hasher = hashlib.sha256(stream)
+        for raw in buffers:
+            hasher.update(raw)
+        digest = hasher.hexdigest()[:32]
+        size = len(stream) + sum(raw.nbytes for raw in buffers)
+        entry = {"kind": "pickle", "digest": digest, "buffers": len(buffers), "bytes": size}
+        self._known[key] = (value, entry)
+
+        if (self.objects / f"{digest}.pkl").exists():
+            report["unchanged"] += 1
+            return entry
+        for index, raw in enumerate(buffers):
+            self._write(self.objects / f"{digest}.{index}.buf", raw)
+        # The stream goes last: its presence marks the object complete
+        self._write(self.objects / f"{digest}.pkl", stream)
+        report["written"] += 1
+        report["bytes_written"] += size
+        return entry
+
+    @staticmethod
+    def _write(path: Path, data):
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _adopt(self, directory: Path, entry: Dict) -> Dict:
+        """Make an entry from another checkpoint directory valid in this one"""
+        if entry.get("kind") != "pickle" or Path(directory) == self.directory:
+            return entry
+        for name in self._files(entry):
+            target = self.objects / name
+            if target.exists():
+                continue
+            try:
+                os.link(Path(directory) / "objects" / name, target)
+            except OSError:
+                shutil.copyfile(Path(directory) / "objects" / name, target)
+        return entry
+
+    @staticmethod
+    def _files(entry: Dict) -> List[str]:
+        digest = entry["digest"]
+        return [f"{digest}.{i}.buf" for i in range(entry["buffers"])] + [f"{digest}.pkl"]
+
+    def _collect(self, manifest: Dict):
+        """Delete stored objects the new manifest no longer refers to"""
+        keep = set()
+        for section in ("globals", "locals"):
+            for entry in manifest[section].values():
+                if entry.get("kind") == "pickle":
+                    keep.update(self._files(entry))
+        for path in self.objects.iterdir():
+            if path.name not in keep:
+                # Safe even if mapped by a lazy restore: the mapping outlives the name
+                path.unlink(missing_ok=True)
+
+    def manifest(self) -> Optional[Dict]:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load_entry(self, entry: Dict) -> Any:
+        if entry["kind"] == "module":
+            return importlib.import_module(entry["module"])
+        digest = entry["digest"]
+        buffers = [self._map(self.objects / f"{digest}.{i}.buf") for i in range(entry["buffers"])]
+        with open(self.objects / f"{digest}.pkl", "rb") as f:
+            return pickle.load(f, buffers=buffers)
+
+    @staticmethod
+    def _map(path: Path):
+        """Copy-on-write mapping: pages load on touch and arrays stay writable"""
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return bytearray()
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    def restore(self) -> Tuple[LazyNamespace, Dict, Dict]:
+        """Return (lazy locals, eagerly loaded globals, failed names) from the checkpoint
+
+        Raises FileNotFoundError when there is no checkpoint.
+        """
+        manifest = self.manifest()
+        if manifest is None:
+            raise FileNotFoundError(f"No checkpoint in {self.directory}")
+        failed: Dict[str, str] = {}
+        globals_ns: Dict = {}
+        for name, entry in manifest.get("globals", {}).items():
+            try:
+                globals_ns[name] = self.load_entry(entry)
+            except Exception as e:
+                failed[name] = f"{type(e).__name__}: {e}"[:200]
+
+        namespace = LazyNamespace()
+        for name, entry in manifest.get("locals", {}).items():
+            namespace.add_lazy(name, lambda entry=entry: self.load_entry(entry), self.directory, entry)
+        return namespace, globals_ns, failed
@@ -8,8 +8,64 @@ import os
 import select
 import termios
 import tty
-from typing import Tuple, Optional
-from nexus_ai.core.output import CaptureOutput
+import time
+import ast
+import functools
+import inspect
+import contextvars
+from contextvars import ContextVar
+from io import StringIO
+from typing import Callable, List, Tuple, Optional
+from nexus_ai.core.cells import Cell, CellGraph
+from nexus_ai.core.output import CaptureOutput, route_task_output
+from nexus_ai.core.pmap import pmap
+from nexus_ai.core.profiling import measuring
+from nexus_ai.core.rusage import (ShellProcess, Usage, command_finished, command_started,
+                                  command_stats, peak_rss, wait_returncode)
+from nexus_ai.core.spill import INLINE_MAX_LINES
+from nexus_ai.core.tracing import tracer
+from nexus_ai.core.trial import Trial, run_trial
+from nexus_ai.core.vscreen import TranscriptBuffer, summarize
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_cell(code: str, flags: int = 0):
+    """Compile as an expression if possible, else as statements; returns (code, is_expression)
+    
+    Cached, so repeated snippets and re-runs skip the compiler.
+    """
+    try:
+        return compile(code, "<cell>", "eval", flags=flags), True
+    except SyntaxError:
+        return compile(code, "<cell>", "exec", flags=flags), False
+
+
+def _run_forked_cell(code: str, namespace: dict) -> Optional[str]:
+    """Run a cell inside a trial's child process; returns an error message or None"""
+    try:
+        compiled, is_expression = _compile_cell(code, ast.PyCF_ALLOW_TOP_LEVEL_AWAIT)
+        result = eval(compiled, namespace)
+        if compiled.co_flags & inspect.CO_COROUTINE:
+            # The REPL's loop belongs to the parent; the child drives its own
+            asyncio._set_running_loop(None)
+            result = asyncio.new_event_loop().run_until_complete(result)
+        if is_expression and result is not None:
+            print(result)
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return str(e)
+    return None
+
+
+# Set inside background jobs: the prompt owns the terminal, so no PTY relay
+no_terminal: ContextVar[bool] = ContextVar("nexus_no_terminal", default=False)
+
+# Cleared where only the final output is wanted (watch runs diff it), not a live echo too
+live_echo: ContextVar[bool] = ContextVar("nexus_live_echo", default=True)
+
+# The last command this task ran and its usage, until take_usage hands it
+# over; per task, so concurrent runs of one command don't swap usages
+_last_usage: ContextVar[Optional[Tuple[str, Usage]]] = ContextVar("nexus_last_usage", default=None)
 
 
 class CodeExecutor:
@@ -17,6 +73,25 @@ class CodeExecutor:
         self.session = session
         self.output_manager = session.output_manager
         
+        # Python cells and the names they pass between them, for 'rerun'
+        self.cells = CellGraph()
+        
+        # Helpers every session namespace starts with
+        if "pmap" not in self.session.python_locals:
+            self.session.python_locals["pmap"] = pmap
+        
+        # Daemon-hosted sessions have no terminal to hand to a PTY
+        self.allow_interactive = True
+        
+        # Captured output echoed live per stream; the rest is only captured
+        self.live_echo_lines = INLINE_MAX_LINES
+        
+        # Summary of the last interactive command's screen output
+        self._transcript: Optional[dict] = None
+        
+        # Per-command durations, shared across sessions
+        self.stats = command_stats
+        
         # Interactive command patterns
         self.interactive_commands = {
             'ssh', 'scp', 'ftp', 'sftp', 'telnet', 
@@ -35,24 +110,104 @@ class CodeExecutor:
             'open', 'explorer', 'firefox', 'chrome'
         }
 
-    def execute_python(self, code: str) -> Tuple[str, str]:
-        """Execute Python code and capture output"""
-        with CaptureOutput() as output:
+    def execute_python(self, code: str, cell: Optional[Cell] = None) -> Tuple[str, str]:
+        """Execute Python code and capture output
+        
+        The run is recorded in the cell graph: as a new cell, or as a
+        re-run of cell when given.
+        """
+        namespace, cell = self._begin_cell(code, cell)
+        failed = False
+        
+        with tracer.span("executor.python", chars=len(code)), CaptureOutput() as output:
             try:
-                # Try to eval first
-                try:
-                    result = eval(
-                        code, self.session.python_globals, self.session.python_locals
-                    )
-                    if result is not None:
-                        print(result)
-                except SyntaxError:
-                    # If not an expression, execute as statement
-                    exec(code, self.session.python_globals, self.session.python_locals)
+                compiled, is_expression = _compile_cell(code)
+                with measuring():
+                    result = eval(compiled, namespace)
+                if is_expression and result is not None:
+                    print(result)
             except Exception as e:
+                failed = True
                 print(f"Error: {str(e)}", file=sys.stderr)
-
+        
+        self.cells.finish(cell, namespace, failed)
         return output.get_output()
+    
+    def namespace(self) -> dict:
+        """The dict cells run in, as both their globals and locals
+        
+        One namespace, like a module's: with separate dicts, functions and
+        comprehensions in a cell couldn't see the names cells define.
+        Names left in python_globals (older checkpoints) are moved over.
+        """
+        namespace = self.session.python_locals
+        leftover = self.session.python_globals
+        while leftover:
+            name, value = leftover.popitem()
+            if name not in namespace:
+                namespace[name] = value
+        return namespace
+    
+    def new_cell(self, code: str) -> Cell:
+        """Register a cell to run later with execute_python(_async)(code, cell)"""
+        return self._begin_cell(code, None)[1]
+    
+    def _begin_cell(self, code: str, cell: Optional[Cell]) -> Tuple[dict, Cell]:
+        namespace = self.namespace()
+        if cell is None:
+            cell = self.cells.begin(code, namespace)
+        else:
+            self.cells.snapshot_inputs(cell, namespace)
+        return namespace, cell
+    
+    async def execute_python_async(self, code: str, cell: Optional[Cell] = None) -> Tuple[str, str]:
+        """Execute Python code on the running event loop, allowing top-level await
+        
+        A cell using await is awaited in the current task, so Ctrl+C or
+        'kill %n' cancels it and tasks it starts (asyncio.gather) run
+        alongside the prompt. Output is captured per task: print() from
+        this cell, and from tasks it spawns, lands here even while other
+        jobs print.
+        """
+        namespace, cell = self._begin_cell(code, cell)
+        stdout, stderr = StringIO(), StringIO()
+        streams = {"stdout": stdout, "stderr": stderr}
+        failed = True
+        
+        with tracer.span("executor.python", chars=len(code)), \
+                route_task_output(lambda stream, data: streams[stream].write(data)):
+            try:
+                compiled, is_expression = _compile_cell(code, ast.PyCF_ALLOW_TOP_LEVEL_AWAIT)
+                with measuring():
+                    result = eval(compiled, namespace)
+                    if compiled.co_flags & inspect.CO_COROUTINE:
+                        result = await result
+                if is_expression and result is not None:
+                    print(result)
+                failed = False
+            except Exception as e:
+                print(f"Error: {str(e)}", file=sys.stderr)
+            finally:
+                # Also reached on cancellation, which leaves the cell failed
+                self.cells.finish(cell, namespace, failed)
+        
+        return stdout.getvalue(), stderr.getvalue()
+    
+    async def execute_python_trial(self, code: str,
+                                   on_output: Optional[Callable[[str], None]] = None) -> Trial:
+        """Run code in a forked copy of the session, leaving the namespace as it is
+        
+        The returned Trial holds what the cell changed until commit_trial.
+        """
+        with tracer.span("executor.python_trial", chars=len(code)):
+            return await run_trial(code, self.namespace(), _run_forked_cell, on_output)
+    
+    def commit_trial(self, trial: Trial) -> List[str]:
+        """Apply a trial's changes to the namespace, recording it as a cell"""
+        namespace, cell = self._begin_cell(trial.code, None)
+        names = trial.apply(namespace)
+        self.cells.finish(cell, namespace)
+        return names
 
     def is_likely_interactive(self, command: str) -> bool:
         """Detect if a command is likely to be interactive"""
@@ -100,6 +255,7 @@ class CodeExecutor:
     
     def _execute_interactive_bash(self, command: str) -> Tuple[str, str]:
         """Execute interactive bash command using PTY for proper terminal emulation"""
+        pid = None
         try:
             print(f"🔄 Running interactive command: {command}")
             
@@ -107,7 +263,13 @@ class CodeExecutor:
             master_fd, slave_fd = pty.openpty()
             
             # Fork a child process
-            pid = os.fork()
+            started = time.monotonic()
+            command_started()
+            try:
+                pid = os.fork()
+            except OSError:
+                command_finished()
+                raise
             
             if pid == 0:  # Child process
                 # Close master in child
@@ -127,11 +289,15 @@ class CodeExecutor:
                 os.execv('/bin/bash', ['/bin/bash', '-c', command])
                 
             else:  # Parent process
+                # What the child's peak RSS starts from (see command_started)
+                rss_floor = peak_rss()
                 # Close slave in parent
                 os.close(slave_fd)
                 
                 # Save terminal settings and set to raw mode
                 old_tty = termios.tcgetattr(sys.stdin)
+                status = rusage = None
+                transcript = TranscriptBuffer()
                 try:
                     tty.setraw(sys.stdin.fileno())
                     
@@ -147,6 +313,7 @@ class CodeExecutor:
                                 if not data:
                                     break
                                 os.write(sys.stdout.fileno(), data)
+                                transcript.append(data)
                                 
                             if sys.stdin in r:
                                 # Read from stdin and write to PTY
@@ -156,14 +323,16 @@ class CodeExecutor:
                                 os.write(master_fd, data)
                                 
                             # Check if child process has exited
-                            wpid, status = os.waitpid(pid, os.WNOHANG)
+                            wpid, wstatus, rusage = os.wait4(pid, os.WNOHANG)
                             if wpid == pid:
+                                status = wstatus
                                 # Read any remaining output
                                 while True:
                                     try:
                                         data = os.read(master_fd, 1024)
                                         if data:
                                             os.write(sys.stdout.fileno(), data)
+                                            transcript.append(data)
                                         else:
                                             break
                                     except:
@@ -176,16 +345,20 @@ class CodeExecutor:
                 except KeyboardInterrupt:
                     # Kill the child process on Ctrl+C
                     os.kill(pid, 9)
-                    os.waitpid(pid, 0)
+                    os.wait4(pid, 0)
                     return "", "✗ Command interrupted by user"
                 finally:
                     # Restore terminal settings
                     termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_tty)
                     os.close(master_fd)
+                    self._transcript = self._summarize_transcript(transcript)
                 
-                # Get exit status
-                _, status = os.waitpid(pid, 0)
+                # Get exit status (unless the relay loop already reaped it)
+                if status is None:
+                    _, status, rusage = os.wait4(pid, 0)
                 exit_code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else 1
+                self.record_usage(command, Usage.from_rusage(
+                    time.monotonic() - started, rusage, wait_returncode(status), rss_floor))
                 
                 if exit_code == 0:
                     return "✓ Command completed successfully", ""
@@ -194,10 +367,44 @@ class CodeExecutor:
                     
         except Exception as e:
             return "", f"Error: {str(e)}"
+        finally:
+            if pid:
+                command_finished()
+    
+    @staticmethod
+    def _summarize_transcript(transcript: TranscriptBuffer) -> Optional[dict]:
+        """Replay relayed output through a virtual screen, once the command is done"""
+        if not transcript.total:
+            return None
+        try:
+            columns, rows = os.get_terminal_size(sys.stdout.fileno())
+        except OSError:
+            columns, rows = 80, 24
+        return summarize(transcript, columns, rows)
+    
+    def take_transcript(self) -> Optional[dict]:
+        """Return and clear the last interactive command's transcript summary"""
+        transcript, self._transcript = self._transcript, None
+        return transcript
+    
+    def record_usage(self, command: str, usage: Usage):
+        """Add a finished command's usage to its stats and keep it for take_usage"""
+        self.stats.record(command, usage)
+        _last_usage.set((command, usage))
+    
+    def take_usage(self, command: str) -> Optional[Usage]:
+        """Return and clear the usage of command, if it's the last one this task ran"""
+        last = _last_usage.get()
+        if last is None or last[0] != command:
+            return None
+        _last_usage.set(None)
+        return last[1]
     
     def _execute_captured_bash(self, command: str) -> Tuple[str, str]:
         """Execute non-interactive bash command with output capture"""
         try:
+            # subprocess.run reaps the shell itself, so only wall time is known here
+            started = time.monotonic()
             result = subprocess.run(
                 command, 
                 shell=True, 
@@ -205,6 +412,7 @@ class CodeExecutor:
                 capture_output=True,
                 timeout=30  # Add timeout for safety
             )
+            self.record_usage(command, Usage(time.monotonic() - started, returncode=result.returncode))
             return result.stdout, result.stderr
         except subprocess.TimeoutExpired:
             return "", f"Command timed out after 30 seconds"
@@ -222,6 +430,18 @@ class CodeExecutor:
     async def execute_bash_async(self, command: str, 
                                 mode: Optional[str] = None) -> Tuple[str, str]:
         """Execute bash command with auto-detection or forced mode"""
+        with tracer.span("executor.bash", mode=mode or "auto"):
+            return await self._execute_bash_mode(command, mode)
+    
+    async def _execute_bash_mode(self, command: str, mode: Optional[str]) -> Tuple[str, str]:
+        """Pick the execution path for a bash command"""
+        terminal_available = self.allow_interactive and not no_terminal.get()
+        if not terminal_available and (
+            mode == 'interactive' or (mode is None and self._is_interactive_command(command))
+        ):
+            if mode == 'interactive':
+                print("⚠ No terminal attached, running in captured mode")
+            mode = 'captured'
         
         # Determine execution mode
         if mode == 'interactive':
@@ -248,12 +468,17 @@ class CodeExecutor:
         loop = asyncio.get_event_loop()
         
         try:
-            # Run the synchronous version in a thread pool to avoid blocking
+            # Run the synchronous version in a thread pool to avoid blocking;
+            # in a copy of our context, to bring its usage back to this task
+            context = contextvars.copy_context()
             result = await loop.run_in_executor(
                 None,
+                context.run,
                 self._execute_interactive_bash,
                 command
             )
+            if context[_last_usage] is not None:
+                _last_usage.set(context[_last_usage])
             return result
             
         except Exception as e:
@@ -262,35 +487,76 @@ class CodeExecutor:
     async def _execute_captured_async(self, command: str) -> Tuple[str, str]:
         """Execute with output capture for analysis"""
         
-        process = await asyncio.create_subprocess_shell(
+        process = await ShellProcess.start(
             command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            stdin=asyncio.subprocess.PIPE
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.PIPE
         )
         
         # Collect output with real-time display option
         stdout_lines = []
         stderr_lines = []
         
-        # Read stdout
-        if process.stdout:
-            async for line in process.stdout:
-                decoded = line.decode('utf-8', errors='replace')
-                stdout_lines.append(decoded)
-                print(decoded, end='')  # Real-time display
-        
-        # Read stderr
-        if process.stderr:
-            async for line in process.stderr:
-                decoded = line.decode('utf-8', errors='replace')
-                stderr_lines.append(decoded)
-                print(decoded, end='', file=sys.stderr)
-        
-        await process.wait()
+        try:
+            # Read stdout
+            if process.stdout:
+                async for line in process.stdout:
+                    decoded = line.decode('utf-8', errors='replace')
+                    stdout_lines.append(decoded)
+                    self._echo(decoded, len(stdout_lines), sys.stdout)  # Real-time display
+            
+            # Read stderr
+            if process.stderr:
+                async for line in process.stderr:
+                    decoded = line.decode('utf-8', errors='replace')
+                    stderr_lines.append(decoded)
+                    self._echo(decoded, len(stderr_lines), sys.stderr)
+            
+            await process.wait()
+        except asyncio.CancelledError:
+            # Interrupted or cancelled job: don't leave the command running
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
         
+        self.record_usage(command, process.usage)
         return ''.join(stdout_lines), ''.join(stderr_lines)
     
+    async def run_command(self, command: str) -> Tuple[str, str, int]:
+        """Run a shell command without echoing it; returns (stdout, stderr, exit status)
+        
+        For callers that run several commands at once (task steps) and
+        need to know whether each succeeded.
+        """
+        with tracer.span("executor.bash", mode="quiet"):
+            process = await ShellProcess.start(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                stdin=subprocess.DEVNULL
+            )
+            try:
+                stdout, stderr = await process.communicate()
+            except asyncio.CancelledError:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+            self.record_usage(command, process.usage)
+        return (stdout.decode('utf-8', errors='replace'),
+                stderr.decode('utf-8', errors='replace'), process.returncode)
+    
+    def _echo(self, line: str, count: int, stream):
+        """Echo a captured line live, up to live_echo_lines per stream"""
+        if not live_echo.get():
+            return
+        if count <= self.live_echo_lines:
+            print(line, end='', file=stream)
+        elif count == self.live_echo_lines + 1:
+            print("⋯ live output paused, the rest is still captured", file=stream)
+    
     async def _execute_background_async(self, command: str) -> Tuple[str, str]:
         """Execute in background (like editors)"""
         
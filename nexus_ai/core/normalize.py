@@ -0,0 +1,149 @@
+# nexus_ai/core/normalize.py
+import os
+import re
+import shlex
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+
+# CSI/OSC and other escape sequences; colors never help a model read output
+ANSI_RE = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)?|\x1b[@-Z\\-_]")
+
+# A run of identical lines longer than this is folded into a count
+DEDUPE_MIN_RUN = 3
+
+Filter = Callable[[Iterator[str]], Iterator[str]]
+FILTERS: Dict[str, Filter] = {}
+
+
+def register_filter(*programs: str):
+    """Register a line filter applied to output of the given programs"""
+    def register(func: Filter) -> Filter:
+        for program in programs:
+            FILTERS[program] = func
+        return func
+    return register
+
+
+def strip_ansi(lines: Iterable[str]) -> Iterator[str]:
+    for line in lines:
+        yield ANSI_RE.sub("", line) if "\x1b" in line else line
+
+
+def collapse_cr(lines: Iterable[str]) -> Iterator[str]:
+    """Resolve carriage-return rewrites the way a terminal would"""
+    for line in lines:
+        if "\r" not in line:
+            yield line
+            continue
+        screen = ""
+        for segment in line.split("\r"):
+            screen = segment + screen[len(segment):]
+        yield screen
+
+
+def dedupe_runs(lines: Iterable[str], min_run: int = DEDUPE_MIN_RUN) -> Iterator[str]:
+    """Fold runs of identical lines into the line plus a repeat count"""
+    previous, count = None, 0
+    for line in lines:
+        if line == previous:
+            count += 1
+            continue
+        if count:
+            yield from _run(previous, count, min_run)
+        previous, count = line, 0
+        yield line
+    if count:
+        yield from _run(previous, count, min_run)
+
+
+def _run(line: str, repeats: int, min_run: int) -> Iterator[str]:
+    if repeats + 1 < min_run:
+        yield from [line] * repeats
+    else:
+        yield f"⋯ previous line repeated {repeats:,} more times"
+
+
+def _group(lines: Iterable[str], matches: Callable[[str], bool],
+           summary: Callable[[int], str], keep_first: int = 1) -> Iterator[str]:
+    """Keep the first few lines of each run that matches, then summarize the run"""
+    run = 0
+    for line in lines:
+        if matches(line):
+            if run < keep_first:
+                yield line
+            run += 1
+            continue
+        if run > keep_first:
+            yield summary(run - keep_first)
+        run = 0
+        yield line
+    if run > keep_first:
+        yield summary(run - keep_first)
+
+
+_PIP_PROGRESS = re.compile(r"^\s*(?:[━╸╺─\-|#=\s]+)\s*[\d.]+/[\d.]+\s*[kMG]?B\b")
+
+
+@register_filter("pip", "pip3", "uv")
+def pip_filter(lines: Iterator[str]) -> Iterator[str]:
+    lines = (line for line in lines if not _PIP_PROGRESS.match(line))
+    lines = _group(lines, lambda line: line.startswith("Requirement already satisfied"),
+                   lambda n: f"⋯ {n} more requirements already satisfied")
+    return _group(lines, lambda line: line.lstrip().startswith("Using cached"),
+                  lambda n: f"⋯ {n} more cached packages")
+
+
+_NPM_NOISE = re.compile(r"^\s*[⸨(][#░█ ]*[⸩)]|^npm (?:timing|http fetch|sill|verb)\b")
+
+
+@register_filter("npm", "npx", "yarn", "pnpm")
+def npm_filter(lines: Iterator[str]) -> Iterator[str]:
+    lines = (line for line in lines if not _NPM_NOISE.match(line))
+    return _group(lines, lambda line: line.startswith(("npm WARN deprecated", "npm warn deprecated")),
+                  lambda n: f"⋯ {n} more deprecation warnings")
+
+
+# BuildKit layer download progress: "#5 sha256:ab12… 10.49MB / 31.4MB 0.6s"
+_DOCKER_PROGRESS = re.compile(r"^#\d+ (?:sha256:[0-9a-f]+ )?[\d.]+[kMG]?B / [\d.]+[kMG]?B")
+
+
+@register_filter("docker", "podman")
+def docker_filter(lines: Iterator[str]) -> Iterator[str]:
+    return (line for line in lines if not _DOCKER_PROGRESS.match(line))
+
+
+def command_program(command: Optional[str]) -> Optional[str]:
+    """Program name at the start of a command line, skipping sudo/env/VAR=…"""
+    if not command:
+        return None
+    try:
+        words = shlex.split(command.split("|")[0].split("&&")[0])
+    except ValueError:
+        words = command.split()
+    while words and ("=" in words[0] or words[0] in ("sudo", "env", "time", "nice", "exec")):
+        words.pop(0)
+    if not words:
+        return None
+    program = os.path.basename(words[0])
+    if re.match(r"^python[\d.]*$", program) and len(words) > 2 and words[1] == "-m":
+        program = words[2]
+    return program
+
+
+def normalize_lines(lines: Iterable[str], command: Optional[str] = None,
+                    ansi: bool = True) -> Iterator[str]:
+    """Chain the normalization stages lazily over a stream of lines"""
+    stream = strip_ansi(lines) if ansi else lines
+    stream = dedupe_runs(collapse_cr(stream))
+    command_filter = FILTERS.get(command_program(command) or "")
+    return command_filter(stream) if command_filter else stream
+
+
+def normalize_text(text: str, command: Optional[str] = None) -> str:
+    # One substitution over the whole text is far cheaper than one per line
+    if "\x1b" in text:
+        text = ANSI_RE.sub("", text)
+    trailing_newline = text.endswith("\n")
+    body = text[:-1] if trailing_newline else text
+    normalized = "\n".join(normalize_lines(body.split("\n"), command, ansi=False))
+    return normalized + "\n" if trailing_newline else normalized
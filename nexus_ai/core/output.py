@@ -1,9 +1,27 @@
 # nexus-ai/nexus_ai/core/output.py
+import itertools
+import os
 import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 from io import StringIO
-from typing import Tuple
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 from datetime import datetime
 
+from nexus_ai.core.blobs import BlobStore, Content
+from nexus_ai.core.normalize import normalize_text
+from nexus_ai.core.rundiff import RUN_DIFF_MIN_LINES, RunDiffer
+from nexus_ai.core.spill import SpillStore, is_large, preview
+from nexus_ai.core.tracing import tracer
+
+
+# Per-task output sink; None means "write to the real stream"
+_task_sink: ContextVar[Optional[Callable[[str, str], None]]] = ContextVar(
+    "nexus_task_sink", default=None
+)
+
 
 class CaptureOutput:
     """Capture stdout and stderr"""
@@ -27,30 +45,218 @@ class CaptureOutput:
         return self.stdout.getvalue(), self.stderr.getvalue()
 
 
+class _RoutedStream:
+    """File-like proxy that sends writes to the current task's sink"""
+
+    def __init__(self, name: str, fallback):
+        self._name = name
+        self._fallback = fallback
+
+    def write(self, data: str) -> int:
+        sink = _task_sink.get()
+        if sink is None:
+            return self._fallback.write(data)
+        sink(self._name, data)
+        return len(data)
+
+    def flush(self):
+        if _task_sink.get() is None:
+            self._fallback.flush()
+
+    def __getattr__(self, attr):
+        return getattr(self._fallback, attr)
+
+
+def install_output_router():
+    """Wrap sys.stdout/sys.stderr so asyncio tasks can route their output"""
+    if not isinstance(sys.stdout, _RoutedStream):
+        sys.stdout = _RoutedStream("stdout", sys.stdout)
+    if not isinstance(sys.stderr, _RoutedStream):
+        sys.stderr = _RoutedStream("stderr", sys.stderr)
+
+
+@contextmanager
+def route_task_output(sink: Callable[[str, str], None]):
+    """Send print() output of the current task to sink(stream, data)
+
+    The sink lives in a context variable, so concurrent asyncio tasks
+    each keep their own destination.
+    """
+    install_output_router()
+    token = _task_sink.set(sink)
+    try:
+        yield
+    finally:
+        _task_sink.reset(token)
+
+
+def current_output_sink() -> Optional[Callable[[str, str], None]]:
+    """Return the sink the current task's output is routed to, if any"""
+    return _task_sink.get()
+
+
+class OutputRecord:
+    """One output history entry: epoch time, interned type, content reference
+
+    Reads like the dicts it replaces (``record["type"]``, ``"data" in
+    record``); the datetime and its display string are built on demand.
+    seq numbers entries in the order they were stored and doesn't shift
+    when older entries are trimmed.
+    """
+
+    __slots__ = ("time", "type", "content", "data", "seq", "_stamp")
+
+    _KEYS = ("timestamp", "type", "content")
+
+    def __init__(self, timestamp: float, output_type: str, content: Content,
+                 data: Optional[Dict] = None, seq: int = 0):
+        self.time = timestamp
+        self.type = sys.intern(output_type)
+        self.content = content
+        self.data = data
+        self.seq = seq
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.time)
+
+    @property
+    def stamp(self) -> str:
+        """str() of the timestamp, formatted once"""
+        try:
+            return self._stamp
+        except AttributeError:
+            self._stamp = str(self.timestamp)
+            return self._stamp
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._KEYS or (key == "data" and self.data is not None):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._KEYS or (key == "data" and self.data is not None)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def keys(self) -> Iterable[str]:
+        return [key for key in (*self._KEYS, "data") if key in self]
+
+    def to_dict(self) -> Dict:
+        entry = {"timestamp": self.timestamp, "type": self.type, "content": str(self.content)}
+        if self.data is not None:
+            entry["data"] = self.data
+        return entry
+
+    def __getstate__(self):
+        return (self.time, self.type, self.content, self.data, self.seq)
+
+    def __setstate__(self, state):
+        # Records pickled before seq existed are numbered by intern_history
+        self.time, output_type, self.content, self.data, *seq = state
+        self.type = sys.intern(output_type)
+        self.seq = seq[0] if seq else 0
+
+    def __repr__(self) -> str:
+        return f"OutputRecord({self.stamp!r}, {self.type!r}, {len(self.content)} chars)"
+
+
 class OutputManager:
     def __init__(self, session):
         self._session = session  # Use _session to avoid confusion
         self.max_history = 1000
+        # seq of the next history entry
+        self.next_seq = 1
+        self.spills = SpillStore()
+        # Entry contents are interned here: one copy per unique output
+        self.blobs = BlobStore()
+        # Last output of each repeated command, for storing reruns as diffs
+        self.runs = RunDiffer(self.blobs)
+        # Spill the raw text of command output that normalization changed
+        self.keep_raw = os.getenv("NEXUS_KEEP_RAW_OUTPUT", "") not in ("", "0")
 
-    def store_output(self, output_type: str, content: str):
-        """Store output with timestamp"""
-        self._session.output_history.append(
-            {"timestamp": datetime.now(), "type": output_type, "content": content}
-        )
+    def store_output(self, output_type: str, content: str, data: Optional[Dict] = None,
+                     label: str = "") -> str:
+        """Store output with timestamp and optional structured data
+
+        Output above the inline limits is spilled to disk: history keeps a
+        head/tail preview plus the spill reference in ``data["spill"]``.
+        Returns the content as stored.
+        """
+        with tracer.span("output.store", type=output_type, chars=len(content)):
+            if is_large(content):
+                ref = self.spills.spill(content, label or output_type)
+                content = preview(content, note=f"'view {ref.spill_id}' to page through it")
+                data = {**(data or {}), "spill": ref.to_dict()}
+            self._store(output_type, content, data)
+            return content
+
+    def store_command_output(self, output_type: str, content: str, command: str,
+                             diff: bool = False, data: Optional[Dict] = None) -> str:
+        """Normalize command output, then store it
+
+        ANSI codes, carriage-return redraws and repeated lines are removed
+        and per-command filters applied (see nexus_ai.core.normalize).
+        With diff, a command run before in this directory is stored as a
+        diff against its previous output, the full text spilled for 'view'
+        (see nexus_ai.core.rundiff). data is stored with the entry.
+        Returns the content as stored.
+        """
+        with tracer.span("output.normalize", chars=len(content)):
+            normalized = normalize_text(content, command)
+        if self.keep_raw and normalized != content:
+            data = {**(data or {}), "raw": self.spills.spill(content, f"raw: {command}").to_dict()}
+        if diff:
+            with tracer.span("output.diff", chars=len(normalized)):
+                run = self.runs.compare(command, normalized)
+            if (run is not None and run.lines >= RUN_DIFF_MIN_LINES
+                    and sum(map(len, run.diff)) < len(normalized) // 2):
+                ref = self.spills.spill(normalized, command)
+                data = {**(data or {}), "rundiff": {"run": run.run, "changed": run.changed,
+                                                    "full": ref.to_dict()}}
+                text = run.render(f"'view {ref.spill_id}' shows all of it")
+                return self.store_output(output_type, text, data=data, label=command)
+        return self.store_output(output_type, normalized, data=data, label=command)
 
-        # Trim history if too long
-        if len(self._session.output_history) > self.max_history:
-            self._session.output_history = self._session.output_history[
-                -self.max_history :
-            ]
+    def _store(self, output_type: str, content: str, data: Optional[Dict]):
+        history = self._session.output_history
+        history.append(OutputRecord(time.time(), output_type, self.blobs.put(content), data,
+                                    self.next_seq))
+        self.next_seq += 1
+
+        # Trim history if too long: O(1) per entry on a deque
+        while len(history) > self.max_history:
+            self.blobs.release(history.popleft().content)
+
+    def intern_history(self):
+        """Rebuild a restored history as records with contents in blobs
+
+        Accepts records or the dict entries older sessions were saved with.
+        """
+        history = deque()
+        for entry in self._session.output_history:
+            if isinstance(entry, OutputRecord):
+                entry.content = self.blobs.put(entry.content)
+            else:
+                timestamp = entry["timestamp"]
+                entry = OutputRecord(
+                    timestamp.timestamp() if isinstance(timestamp, datetime) else float(timestamp),
+                    entry["type"], self.blobs.put(entry["content"]), entry.get("data"),
+                )
+            if not entry.seq:
+                entry.seq = self.next_seq
+            self.next_seq = max(self.next_seq, entry.seq + 1)
+            history.append(entry)
+        self._session.output_history = history
 
     def get_recent_context(self, limit: int = 10) -> str:
         """Get recent output context"""
-        recent = (
-            self._session.output_history[-limit:]
-            if self._session.output_history
-            else []
-        )
+        with tracer.span("context.build", limit=limit):
+            return self._recent_context(limit)
+
+    def _recent_context(self, limit: int) -> str:
+        recent = list(itertools.islice(reversed(self._session.output_history), limit))
         return "\n".join(
-            f"[{o['timestamp']}] {o['type']}: {o['content']}" for o in recent
+            f"[{o.stamp}] {o.type}: {o.content}" for o in reversed(recent)
         )
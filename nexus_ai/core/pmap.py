@@ -0,0 +1,372 @@
+# nexus_ai/core/pmap.py
+import asyncio
+import atexit
+import builtins
+import hashlib
+import itertools
+import marshal
+import multiprocessing
+import os
+import pickle
+import reprlib
+import shutil
+import tempfile
+import time
+import traceback
+import types
+import weakref
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from nexus_ai.core.cells import global_names
+
+
+# Worker processes in the shared pool; defaults to one per core
+PMAP_WORKERS = int(os.getenv("NEXUS_PMAP_WORKERS", "0")) or os.cpu_count() or 1
+
+# Chunks per worker for sized inputs: enough to even out uneven items
+CHUNKS_PER_WORKER = 4
+# Chunks submitted but not finished, per worker: bounds memory for long iterables
+IN_FLIGHT_PER_WORKER = 2
+# Chunk size when the input has no len()
+DEFAULT_CHUNK_SIZE = 16
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_active: Set["PMap"] = set()
+# Encoded functions, one file per digest, read by each worker once
+_payload_dir: Optional[Path] = None
+# Chunks submitted to the pool, cancelled on shutdown if they haven't started
+_submitted: "weakref.WeakSet" = weakref.WeakSet()
+
+
+class PMapError(Exception):
+    """The function or its globals could not be sent to worker processes"""
+
+
+class ItemError:
+    """Stands in for the result of an item the function raised on
+
+    The map carries on past failed items; PMap.errors lists them.
+    """
+
+    __slots__ = ("index", "item", "error", "traceback")
+
+    def __init__(self, index: int, item: str, error: str, traceback: str = ""):
+        self.index = index
+        self.item = item
+        self.error = error
+        self.traceback = traceback
+
+    @classmethod
+    def from_exception(cls, index: int, item: Any, exc: BaseException, skip: int = 0) -> "ItemError":
+        tb = exc.__traceback__
+        for _ in range(skip):  # Frames of ours above the user's function
+            tb = tb.tb_next if tb is not None else None
+        return cls(index, reprlib.repr(item), f"{type(exc).__name__}: {exc}",
+                   "".join(traceback.format_exception(type(exc), exc, tb)))
+
+    def __repr__(self) -> str:
+        return f"<ItemError #{self.index} {self.item}: {self.error}>"
+
+
+def _context():
+    # forkserver: workers fork from a clean server process, not from the
+    # REPL with its threads and event loop; spawn where it's unavailable
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    if "forkserver" in methods:
+        context.set_forkserver_preload([__name__])
+    return context
+
+
+def get_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """The shared process pool, started on first use and reused after"""
+    global _pool, _pool_workers
+    workers = workers or PMAP_WORKERS
+    if _pool is not None and _pool_workers != workers:
+        shutdown_pool()
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_context())
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool(kill: bool = False):
+    """Stop the shared pool; with kill, terminate busy workers instead of waiting"""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is None:
+        return
+    # By hand, since shutdown(cancel_futures=True) is Python 3.9+
+    for future in list(_submitted):
+        future.cancel()
+    _submitted.clear()
+    if kill:
+        # ProcessPoolExecutor can't interrupt a running call, so stop the processes
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+    pool.shutdown(wait=not kill)
+    _clear_payloads()
+
+
+def _clear_payloads():
+    global _payload_dir
+    directory, _payload_dir = _payload_dir, None
+    if directory is not None:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+atexit.register(_clear_payloads)
+
+
+def _store_payload(digest: str, payload: bytes) -> str:
+    """Write an encoded function where workers can load it; returns its path
+
+    Chunks carry only the digest and this path, so a function with large
+    globals crosses to each worker once instead of with every chunk.
+    """
+    global _payload_dir
+    if _payload_dir is None:
+        _payload_dir = Path(tempfile.mkdtemp(prefix="nexus-pmap-"))
+    path = _payload_dir / digest
+    if not path.exists():
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+    return str(path)
+
+
+# Sending functions to workers
+#
+# Functions defined in the REPL live in the session namespace, not in an
+# importable module, so pickle can't send them by reference. They are
+# sent as marshalled code instead, with the globals they use.
+
+def _by_reference(value) -> bool:
+    try:
+        pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        return True
+    except Exception:
+        return False
+
+
+def _encode_function(fn: types.FunctionType, entries: Dict[str, Tuple], owner: str):
+    """Add fn's marshalled code and the globals it uses to entries"""
+    for name in sorted(global_names(fn.__code__)):
+        if name in entries or name not in fn.__globals__:
+            continue  # Already encoded, an attribute name, or a builtin
+        value = fn.__globals__[name]
+        if isinstance(value, types.ModuleType):
+            entries[name] = ("module", value.__name__)
+        elif isinstance(value, types.FunctionType) and not _by_reference(value):
+            entries[name] = ("pending", None)  # Guards recursion
+            entries[name] = _function_entry(value, entries, name)
+        else:
+            try:
+                entries[name] = ("value", pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            except Exception as e:
+                raise PMapError(f"{owner} uses {name!r}, which can't be sent to workers: "
+                                f"{type(e).__name__}: {e}") from e
+
+
+def _function_entry(fn: types.FunctionType, entries: Dict[str, Tuple], owner: str) -> Tuple:
+    _encode_function(fn, entries, owner)
+    try:
+        closure = [cell.cell_contents for cell in fn.__closure__ or ()]
+        extras = pickle.dumps((fn.__defaults__, fn.__kwdefaults__, closure),
+                              protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        raise PMapError(f"{owner}'s defaults or closure can't be sent to workers: {e}") from e
+    return ("function", (marshal.dumps(fn.__code__), fn.__name__, extras))
+
+
+def encode_callable(fn: Callable) -> bytes:
+    """Serialize fn for the workers: by reference when pickle can, else as code"""
+    if not isinstance(fn, types.FunctionType) or _by_reference(fn):
+        try:
+            return pickle.dumps(("pickle", fn), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            raise PMapError(f"{fn!r} can't be sent to workers: {e}") from e
+    name = fn.__name__
+    entries: Dict[str, Tuple] = {}
+    main = _function_entry(fn, entries, name)
+    return pickle.dumps(("code", main, entries), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+# Rebuilt functions, per worker process, by payload digest
+_functions: Dict[str, Callable] = {}
+
+
+def _decode_callable(payload: bytes) -> Callable:
+    kind, *rest = pickle.loads(payload)
+    if kind == "pickle":
+        return rest[0]
+    main, entries = rest
+    namespace: Dict[str, Any] = {"__builtins__": builtins}
+
+    def build(entry: Tuple):
+        code, name, extras = entry
+        defaults, kwdefaults, closure = pickle.loads(extras)
+        fn = types.FunctionType(marshal.loads(code), namespace, name, defaults,
+                                tuple(types.CellType(value) for value in closure) or None)
+        fn.__kwdefaults__ = kwdefaults
+        return fn
+
+    for name, (kind, value) in entries.items():
+        if kind == "module":
+            namespace[name] = __import__(value, fromlist=["_"])
+        elif kind == "value":
+            namespace[name] = pickle.loads(value)
+        elif kind == "function":
+            namespace[name] = build(value)
+    return build(main[1])
+
+
+def _run_chunk(digest: str, path: str, start: int, items: List) -> Tuple[List, List[int]]:
+    """Worker side: apply the function to one chunk
+
+    Returns the results and the offsets of items that raised, whose
+    results are ItemErrors.
+    """
+    fn = _functions.get(digest)
+    if fn is None:
+        with open(path, "rb") as f:
+            fn = _functions[digest] = _decode_callable(f.read())
+    results, failed = [], []
+    for offset, item in enumerate(items):
+        try:
+            results.append(fn(item))
+        except Exception as e:
+            results.append(ItemError.from_exception(start + offset, item, e, skip=1))
+            failed.append(offset)
+    return results, failed
+
+
+class PMap:
+    """fn applied to items on the shared process pool
+
+    Await it for the list of results, or iterate with `async for` to
+    stream them: in input order, or as chunks finish with ordered=False.
+    An item fn raises on gets an ItemError as its result, also listed in
+    errors, and the rest of the map goes on.
+    Cancelling (Ctrl+C) drops queued chunks and stops busy workers.
+    """
+
+    def __init__(self, fn: Callable, items: Iterable, ordered: bool = True,
+                 chunksize: Optional[int] = None, workers: Optional[int] = None):
+        self.fn = fn
+        self.items = items
+        self.ordered = ordered
+        self.workers = workers or PMAP_WORKERS
+        self.total: Optional[int] = len(items) if hasattr(items, "__len__") else None
+        if chunksize is None:
+            chunksize = (max(1, -(-self.total // (self.workers * CHUNKS_PER_WORKER)))
+                         if self.total is not None else DEFAULT_CHUNK_SIZE)
+        self.chunksize = chunksize
+        self.done = 0
+        self.errors: List[ItemError] = []
+        self.started: Optional[float] = None
+
+    def describe(self) -> str:
+        name = getattr(self.fn, "__name__", "fn")
+        progress = f"{self.done:,}/{self.total:,}" if self.total is not None else f"{self.done:,}"
+        return f"pmap {name} {progress}"
+
+    def __await__(self):
+        return self._collect().__await__()
+
+    async def _collect(self) -> List:
+        return [result async for result in self]
+
+    async def __aiter__(self) -> AsyncIterator:
+        payload = encode_callable(self.fn)
+        digest = hashlib.sha256(payload).hexdigest()[:32]
+        pool = get_pool(self.workers)
+        path = _store_payload(digest, payload)
+        chunks = iter(lambda it=iter(self.items): list(itertools.islice(it, self.chunksize)), [])
+        pending: Dict[asyncio.Future, Tuple[int, List]] = {}
+        finished: Dict[int, List] = {}
+        next_index = submitted = 0
+        limit = self.workers * IN_FLIGHT_PER_WORKER
+
+        def submit() -> bool:
+            nonlocal submitted
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            work = pool.submit(_run_chunk, digest, path, submitted * self.chunksize, chunk)
+            _submitted.add(work)
+            future = asyncio.wrap_future(work)
+            pending[future] = (submitted, chunk)
+            submitted += 1
+            return True
+
+        self.started = time.monotonic()
+        _active.add(self)
+        try:
+            while len(pending) < limit and submit():
+                pass
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    index, chunk = pending.pop(future)
+                    results = self._chunk_results(future, index, chunk)
+                    self.done += len(results)
+                    if self.ordered:
+                        finished[index] = results
+                    else:
+                        for result in results:
+                            yield result
+                    submit()
+                while next_index in finished:
+                    for result in finished.pop(next_index):
+                        yield result
+                    next_index += 1
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            if pending:
+                shutdown_pool(kill=True)
+            raise
+        finally:
+            _active.discard(self)
+
+    def _chunk_results(self, future: asyncio.Future, index: int, chunk: List) -> List:
+        try:
+            results, failed = future.result()
+        except BrokenExecutor:
+            raise
+        except Exception as e:
+            # The chunk as a whole failed (a result that won't pickle, or the
+            # function didn't load): each of its items gets the error
+            start = index * self.chunksize
+            results = [ItemError.from_exception(start + offset, item, e)
+                       for offset, item in enumerate(chunk)]
+            failed = range(len(chunk))
+        self.errors.extend(results[offset] for offset in failed)
+        return results
+
+
+def pmap(fn: Callable, items: Iterable, ordered: bool = True, chunksize: Optional[int] = None,
+         workers: Optional[int] = None) -> PMap:
+    """Map fn over items in worker processes: `await pmap(f, xs)` or `async for r in pmap(...)`
+
+    fn may be defined in the REPL; it is sent as code along with the
+    globals it uses. Items and results must be picklable. Items fn raises
+    on get an ItemError in place of their result.
+    """
+    return PMap(fn, items, ordered, chunksize, workers)
+
+
+def active_maps() -> List[PMap]:
+    return list(_active)
+
+
+def toolbar_text() -> str:
+    """Progress of running maps for the bottom toolbar"""
+    maps = active_maps()
+    if not maps:
+        return ""
+    return " ".join(m.describe() for m in maps) + " | "
@@ -0,0 +1,187 @@
+# nexus_ai/core/profiling.py
+import cProfile
+import io
+import pstats
+import resource
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+
+MAGICS = ('%time', '%prof', '%mem')
+
+
+class Timer:
+    """Wall clock plus rusage for this process and its waited-for children"""
+
+    def __init__(self):
+        self.start_wall = time.perf_counter()
+        self.start_self = resource.getrusage(resource.RUSAGE_SELF)
+        self.start_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    def stop(self) -> Dict:
+        wall = time.perf_counter() - self.start_wall
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return {
+            "wall": round(wall, 6),
+            "user": round(own.ru_utime - self.start_self.ru_utime, 6),
+            "sys": round(own.ru_stime - self.start_self.ru_stime, 6),
+            "child_user": round(children.ru_utime - self.start_children.ru_utime, 6),
+            "child_sys": round(children.ru_stime - self.start_children.ru_stime, 6),
+        }
+
+
+def format_timing(timing: Dict) -> str:
+    text = (f"⏱  wall {timing['wall']:.3f}s | user {timing['user']:.3f}s | "
+            f"sys {timing['sys']:.3f}s")
+    if timing["child_user"] or timing["child_sys"]:
+        text += (f" | children user {timing['child_user']:.3f}s "
+                 f"sys {timing['child_sys']:.3f}s")
+    return text
+
+
+def format_profile(profiler: cProfile.Profile, limit: int = 20) -> Tuple[str, List[Dict]]:
+    """Render the top-N cumulative-time table and its structured rows"""
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+        rows.append({
+            "function": f"{filename}:{line}({func})",
+            "calls": nc,
+            "tottime": round(tt, 6),
+            "cumtime": round(ct, 6),
+        })
+    rows.sort(key=lambda row: row["cumtime"], reverse=True)
+    return stream.getvalue(), rows[:limit]
+
+
+# Keep the tracer's own bookkeeping out of the allocation diff
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+]
+
+
+class MemoryTracer:
+    """tracemalloc peak and allocation diff around a block of Python code"""
+
+    def __init__(self, limit: int = 10):
+        self.limit = limit
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+        if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+            tracemalloc.reset_peak()
+        self.start_current, _ = tracemalloc.get_traced_memory()
+        self.before = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def stop(self) -> Dict:
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        if self._started:
+            tracemalloc.stop()
+
+        top = []
+        for stat in after.compare_to(self.before, "lineno")[:self.limit]:
+            if stat.size_diff == 0:
+                continue
+            frame = stat.traceback[0]
+            top.append({
+                "location": f"{frame.filename}:{frame.lineno}",
+                "size_diff_kb": round(stat.size_diff / 1024, 1),
+                "count_diff": stat.count_diff,
+            })
+
+        return {
+            "peak_mb": round((peak - self.start_current) / 2**20, 3),
+            "net_mb": round((current - self.start_current) / 2**20, 3),
+            "top": top,
+        }
+
+
+def format_memory(memory: Dict) -> str:
+    lines = [f"🧠 Python peak +{memory['peak_mb']:.3f} MB | net {memory['net_mb']:+.3f} MB"]
+    for entry in memory["top"]:
+        lines.append(f"   {entry['size_diff_kb']:+10.1f} KB  {entry['count_diff']:+6d}  {entry['location']}")
+    return "\n".join(lines)
+
+
+def format_command_memory(usages: List[Any]) -> str:
+    """Peak RSS of the commands a magic ran, from their own wait4 usage"""
+    if not usages:
+        return "🧠 No command ran"
+    lines = []
+    for usage in usages:
+        if usage.max_rss:
+            lines.append(f"🧠 command peak RSS {usage.max_rss / 2**20:.1f} MB")
+        elif usage.rss_floor:
+            lines.append(f"🧠 command peak RSS ≤ {usage.rss_floor / 2**20:.1f} MB "
+                         f"(no more than the REPL's own size when it started)")
+        else:
+            lines.append("🧠 command peak RSS not measured")
+    return "\n".join(lines)
+
+
+_measurement: ContextVar[Optional["Measurement"]] = ContextVar("nexus_measurement", default=None)
+
+
+class Measurement:
+    """What a magic measures, switched on only while the user's own code runs
+
+    Entered around the routed command; the executor wraps just the cell's
+    code in measuring(), so routing, output normalization and history
+    storage stay out of profiles and allocation lists. Commands report
+    their wait4 usage through note_usage().
+    """
+
+    def __init__(self, magic: str, limit: int = 20):
+        self.magic = magic
+        self.limit = limit
+        self.profiler = cProfile.Profile() if magic == '%prof' else None
+        self.memory: Optional[Dict] = None
+        self.usages: List[Any] = []
+        self.ran = False
+        self._token = None
+
+    def __enter__(self) -> "Measurement":
+        self._token = _measurement.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _measurement.reset(self._token)
+
+    @contextmanager
+    def tracing(self):
+        memory = MemoryTracer(self.limit)
+        try:
+            yield
+        finally:
+            self.memory = memory.stop()
+
+
+_NOT_MEASURING = nullcontext()
+
+
+def measuring():
+    """Context for a cell's own code: profiles or traces it if a magic is measuring"""
+    measurement = _measurement.get()
+    if measurement is None or measurement.magic == '%time':
+        return _NOT_MEASURING
+    measurement.ran = True
+    if measurement.profiler is not None:
+        # Used directly, so the only row not from the cell is its own __exit__
+        return measurement.profiler
+    return measurement.tracing()
+
+
+def note_usage(usage):
+    """Hand a finished command's usage to the magic measuring it, if any"""
+    measurement = _measurement.get()
+    if measurement is not None and usage is not None:
+        measurement.usages.append(usage)
@@ -0,0 +1,167 @@
+# nexus_ai/core/rundiff.py
+import difflib
+import os
+import re
+import shlex
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from nexus_ai.core.blobs import BlobStore, Content
+from nexus_ai.core.normalize import ANSI_RE
+
+
+# Repeated commands are shown and stored as a diff against their previous run
+RUN_DIFF = os.getenv("NEXUS_RUN_DIFF", "1") not in ("", "0")
+
+# Shorter outputs are always shown in full
+RUN_DIFF_MIN_LINES = 5
+# Past this many lines (either run) the diff isn't worth computing
+RUN_DIFF_MAX_LINES = 50_000
+# Commands whose last output is remembered
+RUN_DIFF_MAX_COMMANDS = 200
+
+CONTEXT_LINES = 2
+
+# Cleared where the caller diffs a whole command's output itself (watch jobs)
+run_diffs: ContextVar[bool] = ContextVar("nexus_run_diffs", default=True)
+
+# Parts of a line expected to change between runs: ages, durations, clock times, dates
+_VOLATILE_RE = re.compile(
+    r"\b\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2})?(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?)?\b"
+    r"|\b\d{1,2}:\d{2}(?::\d{2})?(?:\.\d+)?\b"
+    r"|\b\d+(?:\.\d+)?(?:ms|us|µs|s|m|h|d)(?:\d+(?:\.\d+)?(?:ms|s|m|h))*\b"
+)
+
+
+def mask_volatile(line: str) -> str:
+    return _VOLATILE_RE.sub("…", line)
+
+
+def normalize_command(command: str) -> str:
+    """Command with quoting and spacing normalized: `ls  -l 'a'` and `ls -l a` match"""
+    try:
+        return " ".join(shlex.split(command))
+    except ValueError:
+        return " ".join(command.split())
+
+
+def command_key(command: str, cwd: Optional[str] = None) -> str:
+    """Signature of a command run in a directory, shared by run diffs and command stats"""
+    return f"{cwd or os.getcwd()}\0{normalize_command(command)}"
+
+
+def unified_diff(before: List[str], after: List[str], context: int = CONTEXT_LINES) -> List[str]:
+    """Unified diff hunks, ignoring lines that differ only in ages, durations or times
+
+    Lines compared equal that did change (a pod's AGE) are shown as
+    context with their current text.
+    """
+    masked_before = [mask_volatile(line) for line in before]
+    masked_after = [mask_volatile(line) for line in after]
+    if masked_before == masked_after:
+        return []
+    matcher = difflib.SequenceMatcher(None, masked_before, masked_after, autojunk=False)
+    lines = []
+    for group in matcher.get_grouped_opcodes(context):
+        first, last = group[0], group[-1]
+        lines.append(f"@@ -{first[1] + 1},{last[2] - first[1]} +{first[3] + 1},{last[4] - first[3]} @@")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                lines.extend(" " + line for line in after[j1:j2])
+                continue
+            if tag in ("replace", "delete"):
+                lines.extend("-" + line for line in before[i1:i2])
+            if tag in ("replace", "insert"):
+                lines.extend("+" + line for line in after[j1:j2])
+    return lines
+
+
+def output_diff(previous: str, current: str, context: int = CONTEXT_LINES) -> List[str]:
+    """unified_diff of two outputs, colors stripped; [] if they match"""
+    return unified_diff(ANSI_RE.sub("", previous).splitlines(),
+                        ANSI_RE.sub("", current).splitlines(), context)
+
+
+class RunDiff:
+    """How a command's output compares with its previous run"""
+
+    __slots__ = ("run", "previous_at", "lines", "diff", "exact")
+
+    def __init__(self, run: int, previous_at: float, lines: int, diff: List[str], exact: bool):
+        self.run = run
+        self.previous_at = previous_at
+        self.lines = lines
+        self.diff = diff
+        self.exact = exact
+
+    @property
+    def changed(self) -> int:
+        return sum(1 for line in self.diff if line[:1] in "+-")
+
+    def render(self, full_hint: str = "") -> str:
+        """Text shown and stored in place of the output"""
+        ago = _ago(time.time() - self.previous_at)
+        hint = f"; {full_hint}" if full_hint else ""
+        if not self.diff:
+            same = "Same output" if self.exact else "Same output apart from times"
+            return f"↻ {same} as the run {ago} ago ({self.lines} lines{hint})"
+        header = (f"↻ {self.changed} line{'s' if self.changed != 1 else ''} changed since the "
+                  f"run {ago} ago ({self.lines} lines{hint}):")
+        return "\n".join([header, *self.diff])
+
+
+def _ago(seconds: float) -> str:
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 5400:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+class RunDiffer:
+    """Last output of recent commands, keyed by normalized command and cwd
+
+    Outputs are held as BlobStore contents, so the copy kept here is the
+    one the history already shares (compressed when large).
+    """
+
+    def __init__(self, blobs: Optional[BlobStore] = None, max_commands: int = RUN_DIFF_MAX_COMMANDS):
+        self.blobs = blobs or BlobStore()
+        self.max_commands = max_commands
+        self.last: "OrderedDict[str, Tuple[Content, float, int]]" = OrderedDict()
+
+    @staticmethod
+    def key(command: str, cwd: Optional[str] = None) -> str:
+        return command_key(command, cwd)
+
+    def seen(self, command: str, cwd: Optional[str] = None) -> bool:
+        return self.key(command, cwd) in self.last
+
+    def compare(self, command: str, output: str, cwd: Optional[str] = None) -> Optional[RunDiff]:
+        """Record output as the latest run; returns the diff against the run before, if any"""
+        key = self.key(command, cwd)
+        previous = self.last.pop(key, None)
+        run = previous[2] + 1 if previous else 1
+        self.last[key] = (self.blobs.put(output), time.time(), run)
+        while len(self.last) > self.max_commands:
+            _, (content, _, _) = self.last.popitem(last=False)
+            self.blobs.release(content)
+        if previous is None:
+            return None
+
+        content, previous_at, _ = previous
+        before = str(content)
+        self.blobs.release(content)
+        lines = output.count("\n") + (not output.endswith("\n") and bool(output))
+        if before == output:
+            return RunDiff(run, previous_at, lines, [], True)
+        if lines > RUN_DIFF_MAX_LINES or before.count("\n") > RUN_DIFF_MAX_LINES:
+            return None
+        return RunDiff(run, previous_at, lines, output_diff(before, output), False)
+
+    def forget(self, command: str, cwd: Optional[str] = None):
+        entry = self.last.pop(self.key(command, cwd), None)
+        if entry is not None:
+            self.blobs.release(entry[0])
@@ -0,0 +1,390 @@
+# nexus_ai/core/rusage.py
+import asyncio
+import atexit
+import json
+import math
+import os
+import resource
+import signal
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from nexus_ai.core.rundiff import command_key, normalize_command
+
+
+STATS_PATH = Path.home() / ".nexus-ai" / "command_stats.json"
+
+# Commands expected to take at least this long get a "usually takes" note before they run
+PREDICT_MIN_SECONDS = float(os.getenv("NEXUS_PREDICT_MIN_SECONDS", "5"))
+# A run is flagged as slow past this many standard deviations over the mean...
+SLOW_SIGMAS = 3.0
+# ...and at least this many times the mean, once there are enough runs to tell
+SLOW_FACTOR = 1.5
+SLOW_MIN_RUNS = 3
+# Least recently run commands are dropped past this many
+STATS_MAX_COMMANDS = 2000
+# The stats file is rewritten at most this often (and on exit)
+SAVE_INTERVAL = 30.0
+
+
+def wait_returncode(status: int) -> int:
+    """A wait status as a return code, -N for a signal (os.waitstatus_to_exitcode is 3.9+)"""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+# Commands started and not yet reaped, and sessions sharing this process
+# (the daemon hosts several): the high-water mark is process-wide, so it's
+# only reset while no one else could be measuring against it
+_running_commands = 0
+_sessions = 1
+_commands_lock = threading.Lock()
+
+
+def _reset_peak_rss():
+    """Lower this process's RSS high-water mark to its current RSS (Linux; else a no-op)
+
+    A forked child's peak starts from ours at its exec (Linux folds the
+    old address space's mark into it), so this makes the floor our size
+    now rather than our lifetime peak. Our own RUSAGE_SELF max RSS drops
+    with it.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def set_session_count(count: int):
+    """How many sessions share this process; past one, the high-water mark is left alone"""
+    global _sessions
+    _sessions = count
+
+
+def command_started():
+    """Count a command as running, resetting the high-water mark first if it's the only one
+
+    Call right before starting it, then take its floor with peak_rss();
+    call command_finished() once it's reaped.
+    """
+    global _running_commands
+    with _commands_lock:
+        if _running_commands == 0 and _sessions <= 1:
+            _reset_peak_rss()
+        _running_commands += 1
+
+
+def command_finished():
+    global _running_commands
+    with _commands_lock:
+        _running_commands -= 1
+
+
+def peak_rss() -> int:
+    """This process's RSS high-water mark in bytes: where a child forked now starts its peak"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Usage:
+    """What one command cost: wall time, CPU, peak memory and block I/O, from wait4
+
+    max_rss is 0 when the command's peak was no higher than rss_floor, our
+    own size when it started, which its reported peak can't go below.
+    """
+
+    __slots__ = ("wall", "user", "sys", "max_rss", "read_blocks", "write_blocks", "returncode",
+                 "rss_floor")
+
+    def __init__(self, wall: float, user: float = 0.0, sys: float = 0.0, max_rss: int = 0,
+                 read_blocks: int = 0, write_blocks: int = 0, returncode: Optional[int] = None,
+                 rss_floor: int = 0):
+        self.wall = wall
+        self.user = user
+        self.sys = sys
+        self.max_rss = max_rss
+        self.read_blocks = read_blocks
+        self.write_blocks = write_blocks
+        self.returncode = returncode
+        self.rss_floor = rss_floor
+
+    @classmethod
+    def from_rusage(cls, wall: float, rusage, returncode: Optional[int],
+                    rss_floor: Optional[int] = None) -> "Usage":
+        """rss_floor: peak_rss() taken just after the command started (see command_started)"""
+        if rss_floor is None:
+            rss_floor = peak_rss()
+        max_rss = rusage.ru_maxrss * 1024
+        if max_rss <= rss_floor:
+            max_rss = 0
+        return cls(wall, rusage.ru_utime, rusage.ru_stime, max_rss,
+                   rusage.ru_inblock, rusage.ru_oublock, returncode, rss_floor)
+
+    def to_dict(self) -> Dict:
+        return {"wall": round(self.wall, 4), "user": round(self.user, 4), "sys": round(self.sys, 4),
+                "max_rss": self.max_rss, "rss_floor": self.rss_floor, "read_blocks": self.read_blocks,
+                "write_blocks": self.write_blocks, "returncode": self.returncode}
+
+    def describe_rss(self) -> str:
+        if self.max_rss:
+            return f"{self.max_rss / 2**20:,.0f} MB peak"
+        if self.rss_floor:
+            # Below the REPL's own size, which the child's peak starts from
+            return f"peak ≤ {self.rss_floor / 2**20:,.0f} MB"
+        return ""
+
+    def describe(self) -> str:
+        text = f"{format_duration(self.wall)} wall, {self.user:.2f}s user, {self.sys:.2f}s sys"
+        if self.describe_rss():
+            text += f", {self.describe_rss()}"
+        if self.read_blocks or self.write_blocks:
+            text += f", {self.read_blocks:,}/{self.write_blocks:,} blocks in/out"
+        return text
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(round(seconds), 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+async def _read_all(reader: Optional[asyncio.StreamReader]) -> bytes:
+    return await reader.read() if reader is not None else b""
+
+
+class ShellProcess:
+    """A shell command reaped with wait4, so its resource usage is known
+
+    asyncio's subprocesses are reaped by its child watcher with waitpid,
+    which discards the rusage. These are started with Popen and reaped
+    here instead: as soon as the process's pidfd turns readable on the
+    loop, or by a thread blocked in wait4 where pidfd_open is missing.
+    stdout/stderr are StreamReaders when PIPE was asked for.
+    """
+
+    def __init__(self, popen: subprocess.Popen, loop: asyncio.AbstractEventLoop):
+        self.popen = popen
+        self.pid = popen.pid
+        self.started = time.monotonic()
+        self.returncode: Optional[int] = None
+        self.usage: Optional[Usage] = None
+        self.rss_floor: Optional[int] = None
+        self.stdout: Optional[asyncio.StreamReader] = None
+        self.stderr: Optional[asyncio.StreamReader] = None
+        self._loop = loop
+        self._exited = loop.create_future()
+        self._transports = []
+
+    @classmethod
+    async def start(cls, command: str, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE) -> "ShellProcess":
+        loop = asyncio.get_running_loop()
+        command_started()
+        try:
+            # Own session: kill() takes out the whole command, not just the shell
+            popen = subprocess.Popen(command, shell=True, stdin=stdin, stdout=stdout, stderr=stderr,
+                                     start_new_session=True)
+        except BaseException:
+            command_finished()
+            raise
+        process = cls(popen, loop)
+        process.rss_floor = peak_rss()
+        process._watch_exit()
+        try:
+            if popen.stdout is not None:
+                process.stdout = await process._reader(popen.stdout)
+            if popen.stderr is not None:
+                process.stderr = await process._reader(popen.stderr)
+        except BaseException:
+            process.kill()
+            raise
+        return process
+
+    async def _reader(self, pipe) -> asyncio.StreamReader:
+        reader = asyncio.StreamReader(loop=self._loop)
+        transport, _ = await self._loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader, loop=self._loop), pipe)
+        self._transports.append(transport)
+        return reader
+
+    def _watch_exit(self):
+        try:
+            pidfd = os.pidfd_open(self.pid)
+        except (AttributeError, OSError):
+            threading.Thread(target=self._wait_thread, daemon=True).start()
+            return
+
+        def exited():
+            self._loop.remove_reader(pidfd)
+            os.close(pidfd)
+            self._reap()
+
+        self._loop.add_reader(pidfd, exited)
+
+    def _wait_thread(self):
+        try:
+            _, status, rusage = os.wait4(self.pid, 0)
+        except ChildProcessError:
+            status, rusage = 0, None
+        self._loop.call_soon_threadsafe(self._finish, status, rusage)
+
+    def _reap(self):
+        try:
+            _, status, rusage = os.wait4(self.pid, 0)
+        except ChildProcessError:
+            status, rusage = 0, None
+        self._finish(status, rusage)
+
+    def _finish(self, status: int, rusage):
+        command_finished()
+        self.returncode = wait_returncode(status)
+        # Reaped here: Popen must not wait for it (or report it as still running)
+        self.popen.returncode = self.returncode
+        if self.popen.stdin is not None:
+            self.popen.stdin.close()
+        wall = time.monotonic() - self.started
+        self.usage = (Usage.from_rusage(wall, rusage, self.returncode, self.rss_floor)
+                      if rusage is not None
+                      else Usage(wall, returncode=self.returncode))
+        if not self._exited.done():
+            self._exited.set_result(self.returncode)
+
+    async def wait(self) -> int:
+        return await asyncio.shield(self._exited)
+
+    async def communicate(self) -> Tuple[bytes, bytes]:
+        stdout, stderr = await asyncio.gather(_read_all(self.stdout), _read_all(self.stderr))
+        await self.wait()
+        return stdout, stderr
+
+    def kill(self):
+        """SIGKILL the shell and everything it started; it is reaped as usual"""
+        if self.returncode is None:
+            try:
+                # Not popen.kill(): its poll() would reap the process and lose the rusage
+                os.killpg(self.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        for transport in self._transports:
+            transport.close()
+
+
+class Estimate:
+    """Expected duration of a command from its past runs"""
+
+    __slots__ = ("runs", "mean", "std", "max_rss")
+
+    def __init__(self, runs: int, mean: float, std: float, max_rss: int = 0):
+        self.runs = runs
+        self.mean = mean
+        self.std = std
+        self.max_rss = max_rss
+
+    def describe(self) -> str:
+        spread = f" ±{format_duration(self.std)}" if self.runs > 1 else ""
+        return f"~{format_duration(self.mean)}{spread} over {self.runs} run{'s' if self.runs != 1 else ''}"
+
+    def is_slow(self, wall: float) -> bool:
+        """Whether a run this long is well outside this command's history"""
+        if self.runs < SLOW_MIN_RUNS:
+            return False
+        return wall > self.mean * SLOW_FACTOR and wall > self.mean + SLOW_SIGMAS * self.std
+
+
+class CommandStats:
+    """Running duration and resource statistics per command signature
+
+    The signature is the working directory plus the command with its
+    quoting and spacing normalized. Durations are kept as Welford running
+    mean and variance, so each run updates them in O(1) and the file stays
+    small. Runs ended by a signal (Ctrl+C, kill) are not counted.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or STATS_PATH)
+        self.commands: Optional[Dict[str, Dict]] = None
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = 0.0
+
+    def _loaded(self) -> Dict[str, Dict]:
+        if self.commands is None:
+            try:
+                with open(self.path) as f:
+                    self.commands = json.load(f).get("commands", {})
+            except (OSError, ValueError, AttributeError):
+                self.commands = {}
+        return self.commands
+
+    def estimate(self, command: str, cwd: Optional[str] = None) -> Optional[Estimate]:
+        with self._lock:
+            entry = self._loaded().get(command_key(command, cwd))
+        if not entry:
+            return None
+        runs = entry["runs"]
+        std = math.sqrt(entry["m2"] / (runs - 1)) if runs > 1 else 0.0
+        return Estimate(runs, entry["mean"], std, entry.get("max_rss", 0))
+
+    def record(self, command: str, usage: Usage, cwd: Optional[str] = None):
+        """Add a finished run to its command's statistics"""
+        if usage.returncode is not None and usage.returncode < 0:
+            return
+        key = command_key(command, cwd)
+        with self._lock:
+            commands = self._loaded()
+            entry = commands.pop(key, None) or {
+                "command": normalize_command(command), "cwd": cwd or os.getcwd(),
+                "runs": 0, "mean": 0.0, "m2": 0.0, "user": 0.0, "sys": 0.0, "max_rss": 0,
+            }
+            entry["runs"] += 1
+            delta = usage.wall - entry["mean"]
+            entry["mean"] += delta / entry["runs"]
+            entry["m2"] += delta * (usage.wall - entry["mean"])
+            entry["user"] += (usage.user - entry["user"]) / entry["runs"]
+            entry["sys"] += (usage.sys - entry["sys"]) / entry["runs"]
+            entry["max_rss"] = max(entry["max_rss"], usage.max_rss)
+            entry["last"] = usage.to_dict()
+            entry["updated_at"] = time.time()
+            commands[key] = entry  # Re-inserted last: dicts keep recency order
+            while len(commands) > STATS_MAX_COMMANDS:
+                del commands[next(iter(commands))]
+            self._dirty = True
+        if time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+            self.save()
+
+    def save(self):
+        """Write the statistics file if anything changed since the last write"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps({"version": 1, "commands": self.commands})
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            self._dirty = True
+
+
+# Shared by every executor in the process (daemon sessions included)
+command_stats = CommandStats()
+atexit.register(command_stats.save)
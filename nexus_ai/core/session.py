@@ -1,4 +1,5 @@
 # nexus-ai/nexus_ai/core/session.py
+from collections import deque
 from datetime import datetime
 from typing import Dict
 import time
@@ -12,7 +13,7 @@ class Session:
         self.start_time = datetime.now()
         self.python_locals = {}
         self.python_globals = {}
-        self.output_history = []
+        self.output_history = deque()
         self.execution_history = []
         self.task_status = {}
         self.user_inputs = {}
@@ -28,9 +29,7 @@ class Session:
 
     def add_output(self, output_type: str, content: str):
         """Add output to history"""
-        self.output_history.append(
-            {"timestamp": datetime.now(), "type": output_type, "content": content}
-        )
+        self.output_manager.store_output(output_type, content)
         self.metadata["last_modified"] = datetime.now()
 
     def to_dict(self) -> Dict:
@@ -51,4 +50,5 @@ class Session:
         """Create session from dictionary"""
         session = cls(data["session_id"])
         session.__dict__.update(data)
+        session.output_manager.intern_history()
         return session
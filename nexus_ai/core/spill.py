@@ -0,0 +1,265 @@
+# nexus_ai/core/spill.py
+import bisect
+import hashlib
+import itertools
+import mmap
+import os
+import re
+import secrets
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern, Tuple
+
+
+SPILL_DIR = Path.home() / ".nexus-ai" / "spill"
+
+# Outputs above either limit are spilled to disk and previewed inline
+INLINE_MAX_LINES = int(os.getenv("NEXUS_INLINE_LINES", "400"))
+INLINE_MAX_BYTES = int(os.getenv("NEXUS_INLINE_BYTES", str(256 * 1024)))
+
+# Spill files left by other processes (exited REPLs) are deleted after this many days
+SPILL_MAX_AGE_DAYS = float(os.getenv("NEXUS_SPILL_MAX_AGE_DAYS", "7"))
+
+PREVIEW_HEAD = 40
+PREVIEW_TAIL = 20
+PREVIEW_LINE_WIDTH = 500
+
+_INDEX_CHUNK = 4 * 2**20
+_NEWLINE = re.compile(b"\n")
+
+
+def is_large(text: str) -> bool:
+    return len(text) > INLINE_MAX_BYTES or text.count("\n", 0, INLINE_MAX_BYTES) > INLINE_MAX_LINES
+
+
+def _clip(line: str) -> str:
+    return line if len(line) <= PREVIEW_LINE_WIDTH else line[:PREVIEW_LINE_WIDTH] + "…"
+
+
+def preview(text: str, head: int = PREVIEW_HEAD, tail: int = PREVIEW_TAIL,
+            note: str = "") -> str:
+    """First and last lines of text with a marker for what was left out
+
+    Only the ends of the string are split, so this is cheap for huge outputs.
+    """
+    total = text.count("\n") + (0 if text.endswith("\n") else 1)
+    if total <= head + tail:
+        # Few but very long lines: keep them all, clipped
+        lines = text.rstrip("\n").split("\n")
+        hidden_lines = []
+    else:
+        lines = text[:(head + 1) * PREVIEW_LINE_WIDTH].split("\n", head)[:head]
+        hidden_lines = text.rstrip("\n")[-(tail + 1) * PREVIEW_LINE_WIDTH:].rsplit("\n", tail)[-tail:]
+    marker = f"⋯ {total - len(lines) - len(hidden_lines):,} more lines" if hidden_lines else "⋯ lines clipped"
+    marker += f" ({len(text) / 2**20:.1f} MB total)"
+    if note:
+        marker += f" — {note}"
+    return "\n".join([*map(_clip, lines), marker, *map(_clip, hidden_lines)])
+
+
+class SpillRef:
+    """A spilled output: its file and the numbers needed to describe it"""
+
+    __slots__ = ("spill_id", "path", "lines", "bytes", "label")
+
+    def __init__(self, spill_id: int, path: Path, lines: int, size: int, label: str):
+        self.spill_id = spill_id
+        self.path = path
+        self.lines = lines
+        self.bytes = size
+        self.label = label
+
+    def to_dict(self) -> Dict:
+        return {"id": self.spill_id, "path": str(self.path), "lines": self.lines,
+                "bytes": self.bytes, "label": self.label}
+
+    def describe(self) -> str:
+        return (f"#{self.spill_id}  {self.lines:>10,} lines  {self.bytes / 2**20:8.1f} MB  "
+                f"{self.label[:50]}")
+
+
+class SpillStore:
+    """Writes large outputs to ~/.nexus-ai/spill, keeping its own newest max_files
+
+    The directory is shared by every REPL and daemon session, so a store
+    only prunes the files it wrote; other files are left for their owner
+    and only swept once older than SPILL_MAX_AGE_DAYS.
+    """
+
+    def __init__(self, spill_dir: Optional[Path] = None, max_files: int = 50):
+        self.spill_dir = Path(spill_dir or SPILL_DIR)
+        self.max_files = max_files
+        self.refs: Dict[int, SpillRef] = {}
+        self._ids = itertools.count(1)
+        self._by_digest: Dict[str, SpillRef] = {}
+        self._digests: Dict[int, str] = {}
+        self._swept = False
+        # In file names: stores in one process (daemon sessions) must not share any
+        self._owner = f"{os.getpid()}-{secrets.token_hex(3)}"
+
+    def spill(self, text: str, label: str = "") -> SpillRef:
+        """Write text to a spill file; identical text reuses the earlier file"""
+        data = text.encode("utf-8", errors="replace")
+        digest = hashlib.sha256(data).hexdigest()
+        existing = self._by_digest.get(digest)
+        if existing is not None and existing.path.exists():
+            return existing
+
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        spill_id = next(self._ids)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = self.spill_dir / f"{stamp}-{self._owner}-{spill_id}.log"
+        with open(path, "wb") as f:
+            f.write(data)
+        ref = SpillRef(spill_id, path, data.count(b"\n") + (0 if data.endswith(b"\n") else 1),
+                       len(data), label)
+        self.refs[spill_id] = ref
+        self._by_digest[digest] = ref
+        self._digests[spill_id] = digest
+        self._prune()
+        if not self._swept:
+            self._swept = True
+            self._sweep()
+        return ref
+
+    def _prune(self):
+        """Drop this store's oldest spills past max_files"""
+        while len(self.refs) > self.max_files:
+            spill_id = next(iter(self.refs))  # Ids only grow: the oldest comes first
+            ref = self.refs.pop(spill_id)
+            digest = self._digests.pop(spill_id)
+            if self._by_digest.get(digest) is ref:
+                del self._by_digest[digest]
+            try:
+                ref.path.unlink()
+            except OSError:
+                pass
+
+    def _sweep(self):
+        """Delete spill files nobody has touched in SPILL_MAX_AGE_DAYS"""
+        cutoff = time.time() - SPILL_MAX_AGE_DAYS * 86400
+        for path in self.spill_dir.glob("*.log"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+    def get(self, spill_id: Optional[int] = None) -> Optional[SpillRef]:
+        """Spill by id, or the most recent one"""
+        if spill_id is None:
+            return self.refs[max(self.refs)] if self.refs else None
+        return self.refs.get(spill_id)
+
+
+class LineIndex:
+    """Memory-mapped file with a lazily built array of line start offsets
+
+    Lines are located by offset, so only the lines being looked at are ever
+    decoded; the index grows in chunks as far as it has been needed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self._starts = array("Q", [0])
+        self._scanned = 0
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def complete(self) -> bool:
+        return self._scanned >= self.size
+
+    def _scan(self, until_line: Optional[int] = None, until_offset: Optional[int] = None):
+        while not self.complete:
+            if until_line is not None and len(self._starts) > until_line + 1:
+                return
+            if until_offset is not None and self._scanned > until_offset:
+                return
+            end = min(self._scanned + _INDEX_CHUNK, self.size)
+            self._starts.extend(m.end() for m in _NEWLINE.finditer(self._map, self._scanned, end))
+            self._scanned = end
+            # A trailing newline doesn't start another line
+            if self.complete and len(self._starts) > 1 and self._starts[-1] == self.size:
+                self._starts.pop()
+
+    def __len__(self) -> int:
+        self._scan()
+        return len(self._starts) if self.size else 0
+
+    def line(self, number: int) -> str:
+        """Line number (0-based) without its newline"""
+        self._scan(until_line=number)
+        if number >= len(self._starts) or not self.size:
+            raise IndexError(number)
+        start = self._starts[number]
+        end = self._starts[number + 1] if number + 1 < len(self._starts) else self.size
+        return self._map[start:end].rstrip(b"\r\n").decode("utf-8", errors="replace")
+
+    def lines(self, start: int, count: int) -> List[str]:
+        result = []
+        for number in range(start, start + count):
+            try:
+                result.append(self.line(number))
+            except IndexError:
+                break
+        return result
+
+    def line_at(self, offset: int) -> int:
+        """Line number containing byte offset"""
+        self._scan(until_offset=offset)
+        return bisect.bisect_right(self._starts, offset) - 1
+
+    def search(self, pattern: Pattern[bytes], from_line: int, backward: bool = False) -> Optional[int]:
+        """Next (or previous) line after from_line matching a bytes regex"""
+        if not self.size:
+            return None
+        if not backward:
+            self._scan(until_line=from_line + 1)
+            if from_line + 1 >= len(self._starts):
+                return None
+            match = pattern.search(self._map, self._starts[from_line + 1])
+            return self.line_at(match.start()) if match else None
+
+        self._scan(until_line=from_line)
+        end = self._starts[min(from_line, len(self._starts) - 1)]
+        while end > 0:
+            start = max(0, end - _INDEX_CHUNK)
+            last = None
+            for last in pattern.finditer(self._map, start, end):
+                pass
+            if last is not None:
+                return self.line_at(last.start())
+            end = start
+        return None
+
+
+def compile_search(text: str) -> Pattern[bytes]:
+    """Case-insensitive unless the pattern has capitals; literal if not valid regex"""
+    flags = re.MULTILINE if any(c.isupper() for c in text) else re.MULTILINE | re.IGNORECASE
+    raw = text.encode("utf-8")
+    try:
+        return re.compile(raw, flags)
+    except re.error:
+        return re.compile(re.escape(raw), flags)
+
+
+def parse_range(spec: str) -> Tuple[int, int]:
+    """'100:120' or '100' (1-based, inclusive) to a 0-based (start, count)"""
+    first, _, last = spec.partition(":")
+    start = max(1, int(first))
+    end = int(last) if last else start + 49
+    return start - 1, max(0, end - start + 1)
@@ -0,0 +1,314 @@
+# nexus_ai/core/tables.py
+import contextlib
+import csv
+import gc
+import io
+import itertools
+import math
+import operator
+import re
+from array import array
+from collections import Counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Lines looked at to pick a format, header and column types
+SAMPLE_LINES = 50
+
+_OPERATORS = {
+    "<": operator.lt, "<=": operator.le, ">": operator.gt,
+    ">=": operator.ge, "==": operator.eq, "!=": operator.ne,
+}
+
+# 1.5G, 512K, 3.2MiB, 10kB: df -h, du -h, docker stats
+_SIZE_RE = re.compile(r"^(\d+(?:\.\d+)?)\s?([KMGTP])(?:i?B)?$", re.IGNORECASE)
+_SIZE_UNITS = {"K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40, "P": 2**50}
+_MISSING = {"", "-", "--", "N/A", "n/a"}
+
+SUMMARY_VALUE_WIDTH = 40
+
+
+def _number(value: str) -> float:
+    """Parse a number, percentage or human-readable size; ValueError otherwise"""
+    try:
+        return float(value)
+    except ValueError:
+        value = value.strip()
+    if value in _MISSING:
+        return math.nan
+    if value.endswith("%"):
+        return float(value[:-1])
+    size = _SIZE_RE.match(value)
+    if size:
+        return float(size.group(1)) * _SIZE_UNITS[size.group(2).upper()]
+    return float(value)
+
+
+def _column(values: List[str]):
+    """Typed column: int64, float64 (NaN for missing), or strings
+
+    NumPy arrays when NumPy is installed; array('q'), array('d') or a
+    list otherwise.
+    """
+    # map() keeps the common case in C; _number handles %, sizes and missing values
+    try:
+        ints = array("q", map(int, values))
+        return np.frombuffer(ints, dtype=np.int64).copy() if np is not None else ints
+    except (ValueError, OverflowError):
+        pass
+    try:
+        floats = array("d", map(_number, values))
+        return np.frombuffer(floats, dtype=np.float64).copy() if np is not None else floats
+    except ValueError:
+        pass
+    return np.array(values, dtype=object) if np is not None else list(values)
+
+
+def _clip(value: str) -> str:
+    return value if len(value) <= SUMMARY_VALUE_WIDTH else value[:SUMMARY_VALUE_WIDTH - 1] + "…"
+
+
+def _cell(value) -> str:
+    if isinstance(value, float) or (np is not None and isinstance(value, np.floating)):
+        return str(int(value)) if value.is_integer() else f"{value:g}"
+    return str(value)
+
+
+def _kind(column) -> str:
+    if np is not None and isinstance(column, np.ndarray):
+        return {"i": "int", "f": "float"}.get(column.dtype.kind, "str")
+    if isinstance(column, array):
+        return "int" if column.typecode == "q" else "float"
+    return "str"
+
+
+class Table:
+    """Named, typed columns parsed from command output
+
+    Columns are NumPy arrays when NumPy is available, so t["cpu"] > 10 is
+    a vectorized mask for filter(); where() and sort() work either way.
+    """
+
+    def __init__(self, columns: Dict[str, Any], source: str = ""):
+        self.columns = columns
+        self.source = source
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.columns)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[key]
+        return {name: column[key] for name, column in self.columns.items()}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self[i] for i in range(len(self)))
+
+    def rows(self) -> Iterator[Tuple]:
+        return zip(*self.columns.values())
+
+    def take(self, indices) -> "Table":
+        """Rows at the given positions, in that order"""
+        if np is not None:
+            indices = np.asarray(indices, dtype=np.intp)
+            return Table({name: column[indices] for name, column in self.columns.items()}, self.source)
+        taken = {}
+        for name, column in self.columns.items():
+            picked = [column[i] for i in indices]
+            taken[name] = array(column.typecode, picked) if isinstance(column, array) else picked
+        return Table(taken, self.source)
+
+    def filter(self, condition: Union[Sequence[bool], Callable[[Dict[str, Any]], bool]]) -> "Table":
+        """Rows where a boolean mask (e.g. t["cpu"] > 10) or a row predicate is true"""
+        if callable(condition):
+            return self.take([i for i, row in enumerate(self) if condition(row)])
+        if np is not None:
+            return self.take(np.flatnonzero(np.asarray(condition, dtype=bool)))
+        kept = {}
+        for name, column in self.columns.items():
+            picked = itertools.compress(column, condition)
+            kept[name] = array(column.typecode, picked) if isinstance(column, array) else list(picked)
+        return Table(kept, self.source)
+
+    def where(self, name: str, op: str, value: Any) -> "Table":
+        """Rows where column <op> value, e.g. where("%CPU", ">", 5)"""
+        compare = _OPERATORS[op]
+        column = self.columns[name]
+        if np is not None:
+            return self.filter(compare(column, value))
+        return self.filter(list(map(compare, column, itertools.repeat(value))))
+
+    def sort(self, name: str, reverse: bool = False) -> "Table":
+        column = self.columns[name]
+        if np is not None:
+            order = np.argsort(column, kind="stable")
+            return self.take(order[::-1] if reverse else order)
+        return self.take(sorted(range(len(column)), key=column.__getitem__, reverse=reverse))
+
+    def head(self, count: int = 10) -> "Table":
+        return self.take(range(min(count, len(self))))
+
+    def summary(self, sample: int = 3) -> str:
+        """Compact description for model context: shape, column stats, a few rows"""
+        lines = [f"Table: {len(self):,} rows × {len(self.columns)} columns"
+                 + (f" from `{self.source}`" if self.source else "")]
+        for name, column in self.columns.items():
+            kind = _kind(column)
+            if kind == "str":
+                counts = Counter(column)
+                top = ", ".join(f"{_clip(str(value))} ({count})" for value, count in counts.most_common(3))
+                lines.append(f"  {name} (str): {len(counts):,} distinct; top: {top}")
+                continue
+            if np is not None:
+                present = column[~np.isnan(column)] if kind == "float" else column
+                stats = (present.min(), present.mean(), present.max()) if len(present) else None
+            else:
+                present = [v for v in column if v == v]  # NaN != NaN
+                stats = (min(present), sum(present) / len(present), max(present)) if present else None
+            if stats is None:
+                lines.append(f"  {name} ({kind}): all missing")
+                continue
+            lines.append(f"  {name} ({kind}): min {stats[0]:g}, mean {stats[1]:g}, max {stats[2]:g}")
+        if sample and len(self):
+            lines.append("  first rows: " + "; ".join(
+                " ".join(_clip(_cell(v)) for v in row) for row in self.head(sample).rows()
+            ))
+        return "\n".join(lines)
+
+    def describe(self) -> str:
+        names = ", ".join(self.columns)
+        return f"Table({len(self):,} rows × {len(self.columns)} columns: {_clip(names)})"
+
+    def __repr__(self) -> str:
+        shown = self.head(10)
+        cells = [list(self.columns)] + [[_cell(v) for v in row] for row in shown.rows()]
+        widths = [min(30, max(len(row[i]) for row in cells)) for i in range(len(self.columns))]
+        lines = ["  ".join(cell[:30].ljust(width) for cell, width in zip(row, widths)).rstrip()
+                 for row in cells]
+        if len(self) > len(shown):
+            lines.append(f"⋯ {len(self) - len(shown):,} more rows")
+        return "\n".join(lines)
+
+
+def _detect(lines: List[str]) -> str:
+    sample = lines[:SAMPLE_LINES]
+    for delimiter, kind in (("\t", "tsv"), (",", "csv")):
+        counts = [line.count(delimiter) for line in sample]
+        if counts[0] and sum(c == counts[0] for c in counts) >= 0.9 * len(counts):
+            return kind
+    return "whitespace"
+
+
+def _looks_numeric(value: str) -> bool:
+    try:
+        _number(value)
+        return value.strip() not in _MISSING
+    except ValueError:
+        return False
+
+
+def _is_header(header: List[str], rows: List[List[str]], default: bool) -> bool:
+    """A header names columns that are numeric in the rows below it
+
+    With no numeric column to tell by, fall back to default.
+    """
+    if not rows or any(_looks_numeric(value) for value in header):
+        return False
+    for index in range(len(header)):
+        values = [row[index] for row in rows[:SAMPLE_LINES] if index < len(row)]
+        if any(v.strip() not in _MISSING for v in values) and all(
+                _looks_numeric(v) or v.strip() in _MISSING for v in values):
+            return True
+    return default
+
+
+def _split_whitespace(lines: List[str]) -> Tuple[Optional[List[str]], List[List[str]]]:
+    sample = lines[:SAMPLE_LINES]
+    # Aligned tables with multi-word headings (docker stats) use 2+ spaces between columns
+    wide = [re.split(r"\s{2,}", line.strip()) for line in sample]
+    if len(wide[0]) > 1 and sum(len(row) == len(wide[0]) for row in wide) >= 0.9 * len(wide):
+        rows = [re.split(r"\s{2,}", line.strip()) for line in lines]
+        return rows[0], rows[1:]
+
+    # Otherwise split on whitespace; the last column keeps its spaces
+    counts = [len(line.split()) for line in sample]
+    if len(counts) > 1 and counts[0] < min(counts[1:]) and any(map(_looks_numeric, lines[0].split())):
+        # A "total 48" line before ls -l rows
+        lines, counts = lines[1:], counts[1:]
+    body = counts[1:] or counts
+    if counts[0] <= min(body):
+        width = counts[0]
+    else:
+        # More headings than fields: a heading has a space in it ("Mounted on")
+        width = Counter(body).most_common(1)[0][0]
+    first = lines[0].split()
+    header = first[:width - 1] + [" ".join(first[width - 1:])] if len(first) > width else first
+    rows = [line.split(None, width - 1) for line in lines]
+    # Headings of command output are upper case: PID, NAME, STATUS
+    if _is_header(header, rows[1:], default=all(name == name.upper() for name in header)):
+        return header, rows[1:]
+    return None, rows
+
+
+@contextlib.contextmanager
+def _no_gc():
+    """Millions of small row lists would otherwise trigger collection after collection"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def parse_table(data, kind: Optional[str] = None, source: str = "") -> Table:
+    """Parse CSV, TSV or whitespace-aligned output (ps, df, ls -l) into a Table
+
+    data may be text, bytes or a CapturedOutput; kind forces "csv",
+    "tsv" or "whitespace" instead of detecting it. Rows short of fields
+    are padded with missing values.
+    """
+    if not isinstance(data, str):
+        source = source or getattr(data, "command", "")
+        data = data.text() if hasattr(data, "text") else bytes(data).decode("utf-8", errors="replace")
+    with _no_gc():
+        return _parse(data, kind, source)
+
+
+def _parse(data: str, kind: Optional[str], source: str) -> Table:
+    lines = [line for line in data.splitlines() if line.strip()]
+    if not lines:
+        return Table({}, source)
+
+    kind = kind or _detect(lines)
+    if kind in ("csv", "tsv"):
+        rows = list(csv.reader(io.StringIO("\n".join(lines)), delimiter="\t" if kind == "tsv" else ","))
+        header = rows[0] if _is_header(rows[0], rows[1:], default=True) else None
+        rows = rows[1:] if header else rows
+    else:
+        header, rows = _split_whitespace(lines)
+
+    width = max(len(header) if header else 0, max(map(len, rows), default=0))
+    rows = [row if len(row) == width else row + [""] * (width - len(row)) for row in rows]
+    values = list(zip(*rows)) if rows else [()] * width
+    names = _unique_names(header or [], width)
+    return Table({name: _column(column) for name, column in zip(names, values)}, source)
+
+
+def _unique_names(header: List[str], width: int) -> List[str]:
+    names, seen = [], Counter()
+    for index in range(width):
+        name = header[index].strip() if index < len(header) and header[index].strip() else f"col{index}"
+        seen[name] += 1
+        names.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+    return names
@@ -0,0 +1,400 @@
+# nexus_ai/core/taskgraph.py
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional
+
+
+# Steps running at once
+TASK_CONCURRENCY = int(os.getenv("NEXUS_TASK_CONCURRENCY", "4"))
+
+TASK_DIR = Path.home() / ".nexus-ai" / "tasks"
+
+# Output kept per step in its task record (the tail); the full output is in the history
+RECORD_OUTPUT_BYTES = 64 * 1024
+
+PLAN_PROMPT = """Break this task into steps that can be run as shell commands or Python code.
+
+Task: {task}
+
+Reply with only a JSON object, no prose:
+{{"steps": [{{"id": "short-kebab-id", "description": "what the step does",
+  "kind": "bash" or "python", "command": "the exact command or code",
+  "depends_on": ["ids of steps that must finish first"]}}]}}
+
+Only list a dependency when the step really needs the other one's result;
+independent steps run in parallel. Commands must be non-interactive."""
+
+PENDING, RUNNING, DONE, FAILED, BLOCKED = "pending", "running", "done", "failed", "blocked"
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+class TaskPlanError(Exception):
+    """The model's plan or a saved task could not be read, or is not a valid graph"""
+
+
+class Step:
+    """One subtask: a command, the steps it waits for, and its last result"""
+
+    def __init__(self, step_id: str, command: str, kind: str = "bash", description: str = "",
+                 depends_on: Optional[List[str]] = None):
+        self.id = step_id
+        self.command = command
+        self.kind = kind
+        self.description = description
+        self.depends_on = list(depends_on or [])
+        self.status = PENDING
+        self.stdout = ""
+        self.stderr = ""
+        self.returncode: Optional[int] = None
+        self.duration = 0.0
+        self.cached = False
+        self.key = ""
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def error(self) -> str:
+        """Last line of stderr, or the exit status"""
+        lines = [line for line in self.stderr.splitlines() if line.strip()]
+        if lines:
+            return lines[-1].strip()[:200]
+        return f"exit status {self.returncode}" if self.returncode else ""
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "kind": self.kind, "command": self.command,
+                "description": self.description, "depends_on": self.depends_on}
+
+    def to_record(self) -> Dict:
+        """to_dict plus the step's state, output tail and timings"""
+        return {**self.to_dict(), "status": self.status, "cached": self.cached,
+                "returncode": self.returncode, "duration": round(self.duration, 3),
+                "started_at": self.started_at, "finished_at": self.finished_at,
+                "stdout": _tail(self.stdout), "stderr": _tail(self.stderr)}
+
+    @classmethod
+    def from_record(cls, data: Dict) -> "Step":
+        step = cls(data["id"], data["command"], data.get("kind", "bash"),
+                   data.get("description", ""), data.get("depends_on"))
+        # A step that was running when the record was last written never finished
+        status = data.get("status", PENDING)
+        step.status = PENDING if status == RUNNING else status
+        step.cached = data.get("cached", False)
+        step.returncode = data.get("returncode")
+        step.duration = data.get("duration", 0.0)
+        step.started_at = data.get("started_at")
+        step.finished_at = data.get("finished_at")
+        step.stdout = data.get("stdout", "")
+        step.stderr = data.get("stderr", "")
+        return step
+
+
+def _tail(text: str) -> str:
+    if len(text) <= RECORD_OUTPUT_BYTES:
+        return text
+    return "⋯\n" + text[-RECORD_OUTPUT_BYTES:]
+
+
+def _new_task_id(task: str) -> str:
+    digest = hashlib.sha256(f"{task}\0{time.time()}".encode()).hexdigest()[:6]
+    return time.strftime("%Y%m%d-%H%M%S-") + digest
+
+
+class TaskGraph:
+    """Subtasks of a task and the order constraints between them"""
+
+    def __init__(self, task: str, steps: List[Step], task_id: Optional[str] = None):
+        self.task = task
+        self.id = task_id or _new_task_id(task)
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.steps: Dict[str, Step] = {}
+        for step in steps:
+            if step.id in self.steps:
+                raise TaskPlanError(f"step id {step.id!r} is used twice")
+            self.steps[step.id] = step
+        for step in steps:
+            unknown = [dep for dep in step.depends_on if dep not in self.steps]
+            if unknown:
+                raise TaskPlanError(f"step {step.id!r} depends on unknown {', '.join(unknown)}")
+        order = list(self._topological())
+        for step in order:
+            step.key = self._key(step)
+
+    def _topological(self) -> Iterator[Step]:
+        """Steps with every dependency before them; TaskPlanError on a cycle"""
+        placed: Dict[str, bool] = {}
+        remaining = list(self.steps.values())
+        while remaining:
+            ready = [step for step in remaining if all(dep in placed for dep in step.depends_on)]
+            if not ready:
+                raise TaskPlanError(f"steps depend on each other in a cycle: "
+                                    f"{', '.join(step.id for step in remaining)}")
+            for step in ready:
+                placed[step.id] = True
+                yield step
+            remaining = [step for step in remaining if step.id not in placed]
+
+    def _key(self, step: Step) -> str:
+        # A step's result can be reused within the same task when it and
+        # everything before it are unchanged
+        hasher = hashlib.sha256(f"{self.task}\0{step.kind}\0{step.command}".encode())
+        for dep in sorted(step.depends_on):
+            hasher.update(self.steps[dep].key.encode())
+        return hasher.hexdigest()[:16]
+
+    def __iter__(self) -> Iterator[Step]:
+        return iter(self.steps.values())
+
+    def ready(self) -> List[Step]:
+        """Pending steps whose dependencies are all done"""
+        return [step for step in self if step.status == PENDING
+                and all(self.steps[dep].status == DONE for dep in step.depends_on)]
+
+    def dependents(self, step_id: str) -> List[Step]:
+        """Steps that depend on step_id, directly or transitively"""
+        found, frontier = [], [step_id]
+        while frontier:
+            current = frontier.pop()
+            for step in self:
+                if current in step.depends_on and step not in found:
+                    found.append(step)
+                    frontier.append(step.id)
+        return found
+
+    def counts(self) -> Dict[str, int]:
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0, BLOCKED: 0}
+        for step in self:
+            counts[step.status] += 1
+        return counts
+
+    def reset_unfinished(self):
+        """Make failed and blocked steps pending again; done steps stay done"""
+        for step in self:
+            if step.status != DONE:
+                step.status = PENDING
+
+    def to_record(self) -> Dict:
+        return {"id": self.id, "task": self.task, "created_at": self.created_at,
+                "updated_at": self.updated_at, "steps": [step.to_record() for step in self]}
+
+    @classmethod
+    def from_record(cls, data: Dict) -> "TaskGraph":
+        graph = cls(data["task"], [Step.from_record(step) for step in data["steps"]], data["id"])
+        graph.created_at = data.get("created_at", graph.created_at)
+        graph.updated_at = data.get("updated_at", graph.created_at)
+        return graph
+
+    def describe(self) -> str:
+        marks = {PENDING: "·", RUNNING: "⋯", DONE: "✓", FAILED: "✗", BLOCKED: "↷"}
+        lines = [f"Task {self.id}: {self.task}"]
+        for step in self:
+            after = f"  (after {', '.join(step.depends_on)})" if step.depends_on else ""
+            command = step.command.strip().splitlines()[0] if step.command.strip() else ""
+            lines.append(f"  {marks[step.status]} {step.id} [{step.kind}] {command[:60]}{after}")
+        return "\n".join(lines)
+
+
+def _extract_json(text: str):
+    candidates = _FENCE_RE.findall(text) + [text]
+    for candidate in candidates:
+        candidate = candidate.strip()
+        start = min((i for i in (candidate.find("{"), candidate.find("[")) if i >= 0), default=-1)
+        if start < 0:
+            continue
+        end = max(candidate.rfind("}"), candidate.rfind("]"))
+        try:
+            return json.loads(candidate[start:end + 1])
+        except ValueError:
+            continue
+    raise TaskPlanError("no JSON plan found in the response")
+
+
+def parse_plan(task: str, response: str) -> TaskGraph:
+    """Build a TaskGraph from the model's JSON reply to PLAN_PROMPT"""
+    data = _extract_json(str(response))
+    raw_steps = data.get("steps") if isinstance(data, dict) else data
+    if not isinstance(raw_steps, list) or not raw_steps:
+        raise TaskPlanError("the plan has no steps")
+    steps = []
+    for index, raw in enumerate(raw_steps, 1):
+        if not isinstance(raw, dict) or not str(raw.get("command", "")).strip():
+            raise TaskPlanError(f"step {index} has no command")
+        kind = str(raw.get("kind", "bash")).lower()
+        if kind not in ("bash", "python"):
+            raise TaskPlanError(f"step {index} has unknown kind {kind!r}")
+        depends_on = raw.get("depends_on") or []
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        steps.append(Step(str(raw.get("id") or f"step-{index}"), str(raw["command"]), kind,
+                          str(raw.get("description", "")), [str(dep) for dep in depends_on]))
+    return TaskGraph(task, steps)
+
+
+class TaskStore:
+    """Task records as JSON files under ~/.nexus-ai/tasks, one per task
+
+    The runner rewrites a task's record each time one of its steps
+    starts or finishes, so a crashed or killed REPL leaves a record that
+    `task resume` can continue from.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory or TASK_DIR)
+
+    def path(self, task_id: str) -> Path:
+        return self.directory / f"{task_id}.json"
+
+    def save(self, graph: TaskGraph):
+        graph.updated_at = time.time()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(graph.id)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(graph.to_record(), f)
+        os.replace(tmp_path, path)
+
+    def load(self, task_id: str) -> TaskGraph:
+        """The task with this id, or the only one it is a prefix of"""
+        path = self.path(task_id)
+        if not path.exists():
+            matches = sorted(self.directory.glob(f"{glob.escape(task_id)}*.json"))
+            if len(matches) != 1:
+                raise TaskPlanError(f"no saved task {task_id!r}" if not matches
+                                    else f"{task_id!r} matches {len(matches)} tasks")
+            path = matches[0]
+        try:
+            with open(path) as f:
+                return TaskGraph.from_record(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise TaskPlanError(f"could not read {path.name}: {e}") from e
+
+    def list(self) -> List[Dict]:
+        """Saved tasks, most recently updated first"""
+        found = []
+        for path in self.directory.glob("*.json"):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                statuses = [step.get("status", PENDING) for step in data["steps"]]
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            found.append({
+                "id": data["id"],
+                "task": data["task"],
+                "updated_at": data.get("updated_at", 0),
+                "steps": len(statuses),
+                "done": statuses.count(DONE),
+                "failed": statuses.count(FAILED),
+            })
+        return sorted(found, key=lambda t: t["updated_at"], reverse=True)
+
+
+# Runs one step: returns (stdout, stderr, ok, returncode)
+StepFunction = Callable[[Step], Awaitable[tuple]]
+
+
+class TaskRunner:
+    """Runs a TaskGraph's steps as their dependencies finish, a few at a time
+
+    Results are cached by step key (the task, its command and those of
+    the steps before it), so running the graph again, or a new plan for
+    the same task sharing steps, only runs what has not succeeded yet.
+    """
+
+    def __init__(self, run_step: StepFunction, concurrency: int = TASK_CONCURRENCY,
+                 on_event: Optional[Callable[[Step, str], None]] = None,
+                 store: Optional[TaskStore] = None):
+        self.run_step = run_step
+        self.concurrency = max(1, concurrency)
+        self.on_event = on_event or (lambda step, event: None)
+        self.store = store
+        self.cache: Dict[str, Dict] = {}
+
+    def _emit(self, graph: TaskGraph, step: Step, event: str):
+        if self.store is not None:
+            try:
+                self.store.save(graph)
+            except OSError as e:
+                print(f"⚠ Could not save task {graph.id}: {e}")
+        self.on_event(step, event)
+
+    def _from_cache(self, step: Step) -> bool:
+        result = self.cache.get(step.key)
+        if result is None:
+            return False
+        step.stdout, step.stderr = result["stdout"], result["stderr"]
+        step.returncode, step.duration = result["returncode"], result["duration"]
+        step.status, step.cached = DONE, True
+        return True
+
+    async def run(self, graph: TaskGraph) -> Dict[str, int]:
+        """Run every pending step; returns the graph's status counts"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        running: Dict[asyncio.Task, Step] = {}
+
+        async def run_one(step: Step):
+            async with semaphore:
+                step.status = RUNNING
+                step.started_at, step.finished_at = time.time(), None
+                self._emit(graph, step, "start")
+                started = time.monotonic()
+                try:
+                    step.stdout, step.stderr, ok, step.returncode = await self.run_step(step)
+                except asyncio.CancelledError:
+                    step.status = PENDING
+                    raise
+                except Exception as e:
+                    step.stderr, ok, step.returncode = f"{type(e).__name__}: {e}", False, None
+                step.duration = time.monotonic() - started
+                step.finished_at = time.time()
+                step.status = DONE if ok else FAILED
+            if ok:
+                self.cache[step.key] = {"stdout": step.stdout, "stderr": step.stderr,
+                                        "returncode": step.returncode, "duration": step.duration}
+            self._emit(graph, step, "done" if ok else "failed")
+
+        def schedule():
+            while True:
+                ready = graph.ready()
+                if not ready:
+                    return
+                for step in ready:
+                    if self._from_cache(step):
+                        self._emit(graph, step, "cached")
+                        continue
+                    step.status = RUNNING  # Claimed; run_one sets it again on start
+                    running[asyncio.ensure_future(run_one(step))] = step
+                if not any(step.status == DONE for step in ready):
+                    return
+
+        try:
+            schedule()
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step = running.pop(task)
+                    task.result()
+                    if step.status == FAILED:
+                        for dependent in graph.dependents(step.id):
+                            if dependent.status == PENDING:
+                                dependent.status = BLOCKED
+                                self._emit(graph, dependent, "blocked")
+                schedule()
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            if self.store is not None:
+                try:
+                    self.store.save(graph)
+                except OSError:
+                    pass
+        return graph.counts()
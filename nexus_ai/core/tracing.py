@@ -0,0 +1,208 @@
+# nexus_ai/core/tracing.py
+import json
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+TRACE_DIR = Path.home() / ".nexus-ai" / "traces"
+
+
+class Span:
+    """One timed operation; children point at their parent by id"""
+
+    __slots__ = ("span_id", "parent_id", "trace_id", "name", "attrs", "start", "end", "events")
+
+    def __init__(self, span_id: int, parent: Optional["Span"], name: str, attrs: Dict):
+        self.span_id = span_id
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else span_id
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.events: List[tuple] = []
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    def event(self, name: str):
+        """Mark a point in time inside the span, e.g. first byte received"""
+        self.events.append((name, time.perf_counter() - self.start))
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace": self.trace_id,
+            "span": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "ms": round(self.duration * 1000, 3),
+            "attrs": self.attrs,
+            "events": [{"name": name, "ms": round(at * 1000, 3)} for name, at in self.events],
+        }
+
+
+class _NullSpan:
+    """Returned while tracing is off: every operation is a no-op"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def event(self, name: str):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict):
+        self.tracer = tracer
+        self.span = Span(tracer._next_id(), tracer._current.get(), name, attrs)
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = self.tracer._current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.end = time.perf_counter()
+        if exc_type is not None:
+            self.span.attrs["error"] = exc_type.__name__
+        self.tracer._current.reset(self.token)
+        self.tracer._finish(self.span)
+        return False
+
+
+class Tracer:
+    """Span tracer with a bounded in-memory buffer and rotating JSONL log
+
+    Disabled by default (set NEXUS_TRACE=1 or run ``trace on``); while
+    disabled, ``span()`` returns a shared no-op context manager.
+    """
+
+    def __init__(self, trace_dir: Optional[Path] = None, buffer_size: int = 5000,
+                 max_bytes: int = 5 * 2**20, backups: int = 3):
+        self.enabled = os.getenv("NEXUS_TRACE", "") not in ("", "0")
+        self.trace_dir = Path(trace_dir or TRACE_DIR)
+        self.buffer: deque = deque(maxlen=buffer_size)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._current: ContextVar[Optional[Span]] = ContextVar("nexus_span", default=None)
+        self._ids = 0
+        self._file = None
+
+    def _next_id(self) -> int:
+        self._ids += 1
+        return self._ids
+
+    def span(self, name: str, **attrs):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(self, name, attrs)
+
+    def event(self, name: str):
+        """Mark an event on the innermost active span"""
+        if self.enabled:
+            span = self._current.get()
+            if span is not None:
+                span.event(name)
+
+    def _finish(self, span: Span):
+        self.buffer.append(span)
+        try:
+            self._write(span)
+        except OSError:
+            pass
+
+    def _write(self, span: Span):
+        path = self.trace_dir / "trace.jsonl"
+        if self._file is None:
+            self.trace_dir.mkdir(parents=True, exist_ok=True)
+            self._file = open(path, "a", encoding="utf-8")
+        self._file.write(json.dumps(span.to_dict(), default=str) + "\n")
+        if span.parent_id is None:
+            self._file.flush()
+            if self._file.tell() > self.max_bytes:
+                self._rotate(path)
+
+    def _rotate(self, path: Path):
+        self._file.close()
+        self._file = None
+        for index in range(self.backups - 1, 0, -1):
+            older = path.with_name(f"trace.{index}.jsonl")
+            if older.exists():
+                os.replace(older, path.with_name(f"trace.{index + 1}.jsonl"))
+        os.replace(path, path.with_name("trace.1.jsonl"))
+
+    def last_trace(self) -> List[Span]:
+        """Spans of the most recently finished top-level operation"""
+        root = next((span for span in reversed(self.buffer) if span.parent_id is None), None)
+        if root is None:
+            return []
+        return [span for span in self.buffer if span.trace_id == root.trace_id]
+
+    def top(self, limit: int = 15) -> List[Dict]:
+        """Aggregate self time (duration minus children) by span name"""
+        child_time: Dict[int, float] = {}
+        for span in self.buffer:
+            if span.parent_id is not None:
+                child_time[span.parent_id] = child_time.get(span.parent_id, 0.0) + span.duration
+
+        totals: Dict[str, Dict] = {}
+        for span in self.buffer:
+            entry = totals.setdefault(span.name, {"name": span.name, "count": 0, "total": 0.0, "self": 0.0})
+            entry["count"] += 1
+            entry["total"] += span.duration
+            entry["self"] += max(0.0, span.duration - child_time.get(span.span_id, 0.0))
+        return sorted(totals.values(), key=lambda entry: entry["self"], reverse=True)[:limit]
+
+
+def format_flame(spans: List[Span], width: int = 30) -> str:
+    """Render a trace as an indented tree with bars scaled to the root span"""
+    if not spans:
+        return "No traces recorded (enable with 'trace on')"
+    children: Dict[Optional[int], List[Span]] = {}
+    for span in spans:
+        children.setdefault(span.parent_id, []).append(span)
+    root = children[None][0] if None in children else spans[0]
+    scale = width / max(root.duration, 1e-9)
+
+    lines = []
+
+    def walk(span: Span, depth: int):
+        offset = int((span.start - root.start) * scale)
+        bar = " " * offset + "█" * max(1, int(span.duration * scale))
+        label = ("  " * depth + span.name)[:36]
+        events = "".join(f"  {name}@{at * 1000:.1f}ms" for name, at in span.events)
+        lines.append(f"{label:<36} {span.duration * 1000:10.2f} ms  {bar:<{width + 1}}{events}")
+        for child in sorted(children.get(span.span_id, []), key=lambda s: s.start):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return "\n".join(lines)
+
+
+def format_top(rows: List[Dict]) -> str:
+    if not rows:
+        return "No traces recorded (enable with 'trace on')"
+    lines = [f"{'span':<30} {'count':>6} {'self ms':>11} {'total ms':>11}"]
+    for row in rows:
+        lines.append(f"{row['name'][:30]:<30} {row['count']:>6} "
+                     f"{row['self'] * 1000:>11.2f} {row['total'] * 1000:>11.2f}")
+    return "\n".join(lines)
+
+
+# Global tracer instance
+tracer = Tracer()
@@ -0,0 +1,292 @@
+# nexus_ai/core/trial.py
+import asyncio
+import gc
+import hashlib
+import os
+import pickle
+import signal
+import sys
+from typing import Callable, Dict, List, Optional
+
+from nexus_ai.core.cells import analyze, by_value
+from nexus_ai.core.rusage import wait_returncode
+
+
+# Changed values larger than this pickled aren't sent back; commit re-runs the cell instead
+TRIAL_MAX_BYTES = int(os.getenv("NEXUS_TRIAL_MAX_BYTES", str(256 * 2**20)))
+# Values read but not assigned are hashed before and after to spot in-place
+# changes, up to this size pickled; larger ones are left unchecked
+TRIAL_DIGEST_BYTES = int(os.getenv("NEXUS_TRIAL_DIGEST_BYTES", str(16 * 2**20)))
+
+
+class TrialError(Exception):
+    """A trial run could not be started or its result read"""
+
+
+class Trial:
+    """Outcome of a cell run in a forked child, waiting to be committed or discarded
+
+    changed holds the pickled values of names the cell bound, assigned
+    to or changed in place; deleted the names it removed; unpicklable the
+    names whose new value could not be sent back (committing then means
+    re-running the cell). unchecked are names the cell used whose values
+    don't pickle or are over TRIAL_DIGEST_BYTES, so in-place changes to
+    them could not be detected.
+    """
+
+    def __init__(self, code: str, output: str, failed: bool, error: str,
+                 changed: Dict[str, bytes], deleted: List[str], unpicklable: Dict[str, str],
+                 unchecked: Optional[List[str]] = None):
+        self.code = code
+        self.output = output
+        self.failed = failed
+        self.error = error
+        self.changed = changed
+        self.deleted = deleted
+        self.unpicklable = unpicklable
+        self.unchecked = unchecked or []
+
+    @property
+    def names(self) -> List[str]:
+        return sorted([*self.changed, *self.unpicklable, *self.deleted])
+
+    def apply(self, namespace: Dict) -> List[str]:
+        """Write the trial's changes into namespace; returns the names updated"""
+        for name, payload in self.changed.items():
+            namespace[name] = pickle.loads(payload)
+        for name in self.deleted:
+            if name in namespace:
+                del namespace[name]
+        return sorted([*self.changed, *self.deleted])
+
+    def describe(self) -> str:
+        size = sum(map(len, self.changed.values()))
+        names = ", ".join(self.names) or "no names"
+        return f"{names} ({size / 2**20:,.1f} MB to apply)" if size >= 2**20 else names
+
+
+def _loaded(namespace: Dict) -> Dict:
+    # dict.items: values a LazyNamespace hasn't loaded stay unloaded
+    return {name: value for name, value in dict.items(namespace) if not name.startswith("__")}
+
+
+class _TooLarge(Exception):
+    pass
+
+
+class _Hasher:
+    """Pickle target that hashes the data instead of keeping it, up to a size"""
+
+    def __init__(self, limit: int):
+        self.hash = hashlib.blake2b(digest_size=16)
+        self.limit = limit
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        if self.size > self.limit:
+            raise _TooLarge()
+        self.hash.update(data)
+        return len(data)
+
+    def buffer(self, buffer: pickle.PickleBuffer) -> bool:
+        # Out of band: array data is sized up before it is copied or hashed
+        self.write(buffer.raw())
+        return False
+
+
+def _digest(value, limit: int) -> Optional[bytes]:
+    """Hash of value's pickle; None if it doesn't pickle or is over limit bytes"""
+    hasher = _Hasher(limit)
+    try:
+        pickle.Pickler(hasher, protocol=5, buffer_callback=hasher.buffer).dump(value)
+    except Exception:
+        return None
+    return hasher.hash.digest()
+
+
+def _digests(code: str, namespace: Dict) -> Dict[str, Optional[bytes]]:
+    """Digests of the existing values a cell may change in place (x.append)
+
+    Names it assigns count as changed anyway and plain immutable data
+    can't change in place, so neither is hashed.
+    """
+    reads, writes = analyze(code)
+    digests = {}
+    for name in reads - writes:
+        if name.startswith("__") or name not in namespace:
+            continue
+        # Indexing loads values a LazyNamespace still has on disk; the cell would anyway
+        value = namespace[name]
+        if not by_value(value):
+            digests[name] = _digest(value, TRIAL_DIGEST_BYTES)
+    return digests
+
+
+def _changes(code: str, namespace: Dict, before: Dict, names_before: set,
+             digests: Dict[str, Optional[bytes]]):
+    """(changed values, deleted names, unchecked names) after a cell ran
+
+    A name changed if it now refers to another object, if the cell
+    assigns to it (x = ..., x.attr = ..., x[k] = ..., x += ...), or if
+    it was read and its pickle is different now (x.append(...)).
+    Values that don't pickle, or are too large to hash, can't be
+    compared: those are unchecked.
+    """
+    _, writes = analyze(code)
+    changed, unchecked = {}, []
+    for name, value in _loaded(namespace).items():
+        if name in writes or (name in before and before[name] is not value) or name not in names_before:
+            changed[name] = value
+        elif name in digests:
+            if digests[name] is None:
+                unchecked.append(name)
+            elif _digest(value, TRIAL_DIGEST_BYTES) != digests[name]:
+                changed[name] = value
+    deleted = [name for name in names_before if name not in namespace]
+    return changed, deleted, sorted(unchecked)
+
+
+class _CappedBuffer(bytearray):
+    """Pickle target that gives up as soon as the data passes a size"""
+
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = limit
+
+    def write(self, data) -> int:
+        if len(self) + len(data) > self.limit:
+            raise _TooLarge()
+        self.extend(data)
+        return len(data)
+
+
+def _dumps(value, limit: int) -> bytes:
+    buffer = _CappedBuffer(limit)
+    try:
+        pickle.Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(value)
+    except _TooLarge:
+        raise ValueError(f"over {limit / 2**20:,.0f} MB pickled") from None
+    return bytes(buffer)
+
+
+def _run_child(code: str, namespace: Dict, run_cell: Callable[[str, Dict], Optional[str]],
+               result_fd: int, output_fd: int):
+    """Body of the forked child; never returns"""
+    status = 1
+    try:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.set_wakeup_fd(-1)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(output_fd, 1)
+        os.dup2(output_fd, 2)
+        # Line-buffered, so output reaches the parent as it is printed
+        sys.stdout = open(1, "w", buffering=1, closefd=False)
+        sys.stderr = open(2, "w", buffering=1, closefd=False)
+        sys.stdin = open(0, "r", closefd=False)
+
+        digests = _digests(code, namespace)
+        before = _loaded(namespace)
+        names_before = {name for name in namespace if not name.startswith("__")}
+        error = run_cell(code, namespace)
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        changed, deleted, unchecked = _changes(code, namespace, before, names_before, digests)
+        payload, unpicklable = {}, {}
+        for name, value in changed.items():
+            try:
+                payload[name] = _dumps(value, TRIAL_MAX_BYTES)
+            except Exception as e:
+                unpicklable[name] = f"{type(e).__name__}: {e}"[:200]
+        result = {"failed": error is not None, "error": error or "", "changed": payload,
+                  "deleted": deleted, "unpicklable": unpicklable, "unchecked": unchecked}
+        with open(result_fd, "wb", closefd=False) as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        status = 0
+    except BaseException as e:
+        try:
+            os.write(2, f"Trial failed: {type(e).__name__}: {e}\n".encode())
+        except OSError:
+            pass
+    finally:
+        # Skip atexit handlers and buffered state inherited from the REPL
+        os._exit(status)
+
+
+async def run_trial(code: str, namespace: Dict, run_cell: Callable[[str, Dict], Optional[str]],
+                    on_output: Optional[Callable[[str], None]] = None) -> Trial:
+    """Run code in a forked copy of this process against namespace
+
+    The child shares the parent's memory copy-on-write, so starting a
+    trial costs a fork, however large the namespace; only pages it
+    writes to are copied. run_cell(code, namespace) runs the cell in the
+    child and returns an error message or None. Output is streamed to
+    on_output as it arrives; the namespace itself is left untouched.
+    Cancelling kills the child.
+    """
+    if not hasattr(os, "fork"):
+        raise TrialError("trial runs need os.fork, which this platform lacks")
+
+    result_read, result_write = os.pipe()
+    output_read, output_write = os.pipe()
+    # Objects already alive are never collected in the child: its GC
+    # would otherwise touch (and so copy) every page of the namespace
+    gc.freeze()
+    try:
+        pid = os.fork()
+    except OSError as e:
+        gc.unfreeze()
+        for fd in (result_read, result_write, output_read, output_write):
+            os.close(fd)
+        raise TrialError(f"fork failed: {e}") from e
+    if pid == 0:
+        os.close(result_read)
+        os.close(output_read)
+        _run_child(code, namespace, run_cell, result_write, output_write)
+    gc.unfreeze()
+    os.close(result_write)
+    os.close(output_write)
+
+    loop = asyncio.get_running_loop()
+    chunks: List[str] = []
+
+    async def read_output():
+        reader = asyncio.StreamReader()
+        transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(output_read, "rb", 0))
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                text = data.decode("utf-8", errors="replace")
+                chunks.append(text)
+                if on_output is not None:
+                    on_output(text)
+        finally:
+            transport.close()
+
+    def read_result() -> bytes:
+        with open(result_read, "rb") as f:
+            return f.read()
+
+    try:
+        _, raw = await asyncio.gather(read_output(), loop.run_in_executor(None, read_result))
+        _, status = await loop.run_in_executor(None, os.waitpid, pid, 0)
+    except BaseException:
+        try:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        except (ChildProcessError, ProcessLookupError):
+            pass
+        raise
+
+    exit_code = wait_returncode(status)
+    if exit_code != 0 or not raw:
+        how = f"killed by signal {-exit_code}" if exit_code < 0 else f"exit status {exit_code}"
+        raise TrialError(f"the trial process ended without a result ({how})")
+    result = pickle.loads(raw)
+    return Trial(code, "".join(chunks), result["failed"], result["error"], result["changed"],
+                 result["deleted"], result["unpicklable"], result["unchecked"])
@@ -0,0 +1,219 @@
+# nexus_ai/core/vscreen.py
+import re
+from collections import deque
+from typing import Dict, List, Optional
+
+
+# One token per control sequence, control character or run of plain text
+_TOKEN_RE = re.compile(
+    r"\x1b\[([0-9;?]*)[ -/]*([@-~])"         # CSI: params, final byte
+    r"|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)?"  # OSC (window title etc.)
+    r"|\x1b[()][0-9A-Za-z]"                 # charset selection
+    r"|\x1b.?"                              # other two-byte escapes
+    r"|[\x00-\x1f\x7f]"                     # single control characters
+    r"|[^\x00-\x1f\x7f\x1b]+"               # printable run
+)
+
+
+class TranscriptBuffer:
+    """Ring buffer of raw terminal output, bounded by total bytes
+
+    Appending is O(1) so the PTY relay can tee every chunk for free; the
+    oldest chunks are dropped once max_bytes is exceeded.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024):
+        self.max_bytes = max_bytes
+        self.chunks: deque = deque()
+        self.size = 0
+        self.total = 0
+
+    def append(self, data: bytes):
+        self.chunks.append(data)
+        self.size += len(data)
+        self.total += len(data)
+        while self.size > self.max_bytes and len(self.chunks) > 1:
+            self.size -= len(self.chunks.popleft())
+
+    @property
+    def dropped(self) -> int:
+        return self.total - self.size
+
+    def getvalue(self) -> bytes:
+        return b"".join(self.chunks)
+
+
+class VirtualScreen:
+    """Minimal terminal model: enough to resolve redraws into final text
+
+    Handles printable text with line wrap, CR, LF, BS, TAB, cursor movement
+    (CSI A B C D G H f d), erase in line/display (K, J) and the alternate
+    screen. Colors and other attributes (SGR) are dropped. Lines that
+    scroll off the top go to a bounded scrollback.
+    """
+
+    def __init__(self, columns: int = 80, rows: int = 24, scrollback: int = 2000):
+        self.columns = max(1, columns)
+        self.rows = max(1, rows)
+        self.scrollback: deque = deque(maxlen=scrollback)
+        self.scrolled = 0
+        self.screen = self._blank()
+        self.x = self.y = 0
+        self._saved_main: Optional[tuple] = None
+
+    def _blank(self) -> List[List[str]]:
+        return [[] for _ in range(self.rows)]
+
+    def feed(self, data: bytes):
+        text = data.decode("utf-8", errors="replace")
+        for match in _TOKEN_RE.finditer(text):
+            token = match.group()
+            if token[0] == "\x1b":
+                if match.group(2) is not None:
+                    self._csi(match.group(1), match.group(2))
+            elif len(token) == 1 and (token < " " or token == "\x7f"):
+                self._control(token)
+            else:
+                self._write(token)
+
+    def _write(self, text: str):
+        while text:
+            if self.x >= self.columns:
+                self.x = 0
+                self._line_feed()
+            room = self.columns - self.x
+            chunk, text = text[:room], text[room:]
+            row = self.screen[self.y]
+            if len(row) < self.x:
+                row.extend(" " * (self.x - len(row)))
+            row[self.x:self.x + len(chunk)] = chunk
+            self.x += len(chunk)
+
+    def _control(self, char: str):
+        if char == "\n":
+            self._line_feed()
+        elif char == "\r":
+            self.x = 0
+        elif char == "\b":
+            self.x = max(0, self.x - 1)
+        elif char == "\t":
+            self.x = min(self.columns - 1, (self.x // 8 + 1) * 8)
+
+    def _line_feed(self):
+        if self.y < self.rows - 1:
+            self.y += 1
+            return
+        top = self.screen.pop(0)
+        if self._saved_main is None:
+            self.scrollback.append("".join(top).rstrip())
+            self.scrolled += 1
+        self.screen.append([])
+
+    def _csi(self, params: str, final: str):
+        private = params.startswith("?")
+        values = [int(p) if p.isdigit() else 0 for p in params.lstrip("?").split(";")] if params else []
+        first = values[0] if values else 0
+        count = max(1, first)
+
+        if private:
+            if final in "hl" and set(values) & {47, 1047, 1049}:
+                self._alternate_screen(final == "h")
+        elif final == "A":
+            self.y = max(0, self.y - count)
+        elif final == "B":
+            self.y = min(self.rows - 1, self.y + count)
+        elif final == "C":
+            self.x = min(self.columns - 1, self.x + count)
+        elif final == "D":
+            self.x = max(0, min(self.x, self.columns) - count)
+        elif final == "G":
+            self.x = min(self.columns - 1, count - 1)
+        elif final == "d":
+            self.y = min(self.rows - 1, count - 1)
+        elif final in "Hf":
+            row = values[0] if values else 1
+            column = values[1] if len(values) > 1 else 1
+            self.y = min(self.rows - 1, max(1, row) - 1)
+            self.x = min(self.columns - 1, max(1, column) - 1)
+        elif final == "K":
+            row = self.screen[self.y]
+            if first == 0:
+                del row[self.x:]
+            elif first == 1:
+                row[:self.x + 1] = " " * min(len(row), self.x + 1)
+            else:
+                row.clear()
+        elif final == "J":
+            if first == 0:
+                del self.screen[self.y][self.x:]
+                for row in self.screen[self.y + 1:]:
+                    row.clear()
+            elif first == 1:
+                for row in self.screen[:self.y]:
+                    row.clear()
+            else:
+                self.screen = self._blank()
+
+    def _alternate_screen(self, enter: bool):
+        """Full-screen programs (vim, less) draw on a screen that is thrown away"""
+        if enter and self._saved_main is None:
+            self._saved_main = (self.screen, self.x, self.y)
+            self.screen = self._blank()
+        elif not enter and self._saved_main is not None:
+            self.screen, self.x, self.y = self._saved_main
+            self._saved_main = None
+
+    def screen_lines(self) -> List[str]:
+        lines = ["".join(row).rstrip() for row in self.screen]
+        while lines and not lines[-1]:
+            lines.pop()
+        return lines
+
+
+def summarize(buffer: TranscriptBuffer, columns: int = 80, rows: int = 24,
+              max_scrollback: int = 100) -> Dict:
+    """Resolve a raw transcript to final-screen text plus scrollback tail
+
+    Only the tail that can still reach the result is replayed: cursor
+    movement is confined to the screen, so anything more than
+    max_scrollback + 2 * rows line feeds before the end is skipped.
+    """
+    data = buffer.getvalue()
+    cut = len(data)
+    for _ in range(max_scrollback + 2 * rows):
+        cut = data.rfind(b"\n", 0, cut)
+        if cut < 0:
+            cut = 0
+            break
+    if cut:
+        # Don't start inside a full-screen program's alternate screen
+        entered = data.rfind(b"\x1b[?1049h", 0, cut)
+        if entered > data.rfind(b"\x1b[?1049l", 0, cut):
+            cut = entered
+        else:
+            cut += 1
+
+    screen = VirtualScreen(columns, rows)
+    screen.feed(data[cut:])
+
+    scrollback = list(screen.scrollback)[-max_scrollback:]
+    omitted = data.count(b"\n", 0, cut) + screen.scrolled - len(scrollback)
+    lines = []
+    skipped = []
+    if buffer.dropped:
+        skipped.append(f"{buffer.dropped / 2**20:.1f} MB of earlier output")
+    if omitted > 0:
+        skipped.append(f"{omitted:,} scrolled lines")
+    if skipped:
+        lines.append(f"⋯ {' and '.join(skipped)} not kept")
+    lines.extend(scrollback)
+    lines.extend(screen.screen_lines())
+    # Drop runs of identical lines left behind by redraws
+    compact = [line for index, line in enumerate(lines) if index == 0 or line != lines[index - 1]]
+    return {
+        "text": "\n".join(compact),
+        "bytes": buffer.total,
+        "dropped_bytes": buffer.dropped,
+        "scrollback_lines": len(scrollback) + omitted,
+        "screen_lines": len(screen.screen_lines()),
+    }
@@ -0,0 +1,264 @@
+# nexus_ai/core/watch.py
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import fnmatch
+import glob
+import os
+import re
+import struct
+from typing import Awaitable, Callable, Dict, List, Optional, Pattern, Set
+
+
+# Quiet time after the last change before the command runs again
+WATCH_DEBOUNCE = float(os.getenv("NEXUS_WATCH_DEBOUNCE", "0.2"))
+
+# Never descended into when watching a tree
+IGNORED_DIRS = {".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", "venv",
+                ".mypy_cache", ".pytest_cache", ".tox", ".nexus-ai"}
+# Editor swap and backup files
+IGNORED_FILES = ("*.swp", "*.swx", "*~", ".#*", "4913")
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+# A file counts as changed once its writer closes it, not on every write()
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_ONLYDIR)
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; then len bytes of name
+_GLOB_TOKEN_RE = re.compile(r"\*\*/?|\*|\?|\[!?\]?[^\]]*\]|[^*?\[]+|\[")
+
+_libc = None
+
+
+class WatchError(Exception):
+    """Paths could not be watched"""
+
+
+def _inotify():
+    global _libc
+    if _libc is None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise WatchError("watch needs inotify, which this platform lacks")
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        _libc = libc
+    return _libc
+
+
+def pattern_regex(pattern: str) -> Pattern:
+    """Regex for an absolute glob: * and ? stay within a directory, ** crosses them"""
+    parts = []
+    for token in _GLOB_TOKEN_RE.findall(pattern):
+        if token == "**/":
+            parts.append("(?:.*/)?")
+        elif token == "**":
+            parts.append(".*")
+        elif token == "*":
+            parts.append("[^/]*")
+        elif token == "?":
+            parts.append("[^/]")
+        elif token.startswith("[") and len(token) > 1:
+            body = token[1:-1]
+            parts.append("[^" + body[1:] + "]" if body.startswith("!") else "[" + body + "]")
+        else:
+            parts.append(re.escape(token))
+    return re.compile("".join(parts) + r"\Z", re.DOTALL)
+
+
+class _Target:
+    """One path or glob: the directory to watch, how deep, and what in it counts"""
+
+    def __init__(self, pattern: str, cwd: str):
+        path = os.path.normpath(os.path.join(cwd, os.path.expanduser(pattern)))
+        components = path.split(os.sep)
+        magic = [i for i, part in enumerate(components) if glob.has_magic(part)]
+        if magic:
+            self.base = os.sep.join(components[:magic[0]]) or os.sep
+            # Recursive unless only the last component has wildcards
+            self.recursive = magic[0] < len(components) - 1 or "**" in path
+            self.regex = pattern_regex(path)
+        elif os.path.isdir(path):
+            self.base, self.recursive = path, True
+            self.regex = re.compile(re.escape(path.rstrip(os.sep)) + "/.*", re.DOTALL)
+        else:
+            # A single file: watch its directory, so editors that replace the file are seen
+            self.base, self.recursive = os.path.dirname(path) or os.sep, False
+            self.regex = re.compile(re.escape(path) + r"\Z")
+        if not os.path.isdir(self.base):
+            raise WatchError(f"{pattern}: no directory {self.base}")
+
+    def covers(self, directory: str) -> bool:
+        """Whether directory is watched for this target"""
+        if directory == self.base:
+            return True
+        return self.recursive and directory.startswith(self.base.rstrip(os.sep) + os.sep)
+
+
+class Watcher:
+    """inotify watches over paths and globs, read from the event loop
+
+    The inotify descriptor is registered with loop.add_reader, so an idle
+    watcher costs no CPU however large the tree: the kernel wakes it only
+    when something it watches changes. Recursive targets get one watch
+    per directory (subject to fs.inotify.max_user_watches); directories
+    created later are added as they appear.
+    """
+
+    def __init__(self, patterns: List[str], cwd: Optional[str] = None):
+        cwd = cwd or os.getcwd()
+        self.patterns = list(patterns)
+        self.targets = [_Target(pattern, cwd) for pattern in patterns]
+        self.directories: Dict[int, str] = {}
+        self.changed: Set[str] = set()
+        self._fd = -1
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event = asyncio.Event()
+
+    def start(self):
+        """Create the watches and start reading events; must run on the loop"""
+        libc = _inotify()
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise WatchError(f"inotify_init1: {os.strerror(ctypes.get_errno())}")
+        self._fd = fd
+        try:
+            for target in self.targets:
+                self._add_tree(target.base, target.recursive)
+        except BaseException:
+            self.close()
+            raise
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(fd, self._read)
+
+    def close(self):
+        if self._fd < 0:
+            return
+        if self._loop is not None:
+            self._loop.remove_reader(self._fd)
+        os.close(self._fd)
+        self._fd = -1
+        self.directories.clear()
+
+    def _add(self, directory: str):
+        wd = _inotify().inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise WatchError(f"out of inotify watches at {directory}; raise "
+                                 f"fs.inotify.max_user_watches or watch a narrower path")
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                return  # Removed before we got to it
+            raise WatchError(f"cannot watch {directory}: {os.strerror(error)}")
+        self.directories[wd] = directory
+
+    def _add_tree(self, top: str, recursive: bool):
+        self._add(top)
+        if not recursive:
+            return
+        for directory, subdirs, _ in os.walk(top):
+            subdirs[:] = [name for name in subdirs if name not in IGNORED_DIRS]
+            for name in subdirs:
+                self._add(os.path.join(directory, name))
+
+    def _matches(self, path: str) -> bool:
+        name = os.path.basename(path)
+        if any(fnmatch.fnmatch(name, ignored) for ignored in IGNORED_FILES):
+            return False
+        return any(target.regex.match(path) for target in self.targets)
+
+    def _read(self):
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            self.close()
+            return
+        found = False
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                found = True  # Events were lost; assume something relevant changed
+                continue
+            directory = self.directories.get(wd)
+            if mask & IN_IGNORED:
+                self.directories.pop(wd, None)
+                continue
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and name not in IGNORED_DIRS and any(
+                        target.recursive and target.covers(directory) for target in self.targets):
+                    try:
+                        self._add_tree(path, True)
+                    except WatchError:
+                        pass
+                continue
+            if self._matches(path):
+                self.changed.add(path)
+                found = True
+        if found:
+            self._event.set()
+
+    async def wait(self):
+        """Wait until a matching change has happened since the last settle()"""
+        await self._event.wait()
+
+    async def settle(self, quiet: float = WATCH_DEBOUNCE) -> Set[str]:
+        """Wait for changes to stop for `quiet` seconds; returns the paths that changed"""
+        await self._event.wait()
+        while True:
+            self._event.clear()
+            try:
+                await asyncio.wait_for(self._event.wait(), quiet)
+            except asyncio.TimeoutError:
+                break
+        changed, self.changed = self.changed, set()
+        return changed
+
+
+async def watch_loop(watcher: Watcher, run: Callable[[Set[str]], Awaitable],
+                     debounce: float = WATCH_DEBOUNCE,
+                     on_restart: Optional[Callable[[], None]] = None):
+    """run(changed) once, then after every burst of changes, until cancelled
+
+    A change arriving while run is still going cancels it (on_restart is
+    called), and it starts over once the files settle.
+    """
+    changed: Set[str] = set()
+    while True:
+        running = asyncio.ensure_future(run(changed))
+        waiting = asyncio.ensure_future(watcher.wait())
+        try:
+            done, _ = await asyncio.wait({running, waiting}, return_when=asyncio.FIRST_COMPLETED)
+            if running in done:
+                running.result()
+                await waiting
+            else:
+                running.cancel()
+                await asyncio.gather(running, return_exceptions=True)
+                if on_restart is not None:
+                    on_restart()
+            changed = await watcher.settle(debounce)
+        finally:
+            for task in (running, waiting):
+                task.cancel()
+
@@ -3,9 +3,9 @@
 import asyncio
 import argparse
 import sys
-from nexus_ai.core.session import Session
-from nexus_ai.repl.prompt_toolkit_repl import NexusPromptToolkitREPL
-from nexus_ai.models import ModelType, ExecutionMode
+
+# The REPL, session and model imports are deferred into the code paths that
+# need them, so `nexus --attach` starts without loading anthropic/prompt_toolkit.
 
 
 def create_parser():
@@ -21,6 +21,8 @@ Examples:
   nexus-ai --model gemini-local    # Start with Gemini local execution
   nexus-ai --model gemini-api      # Start with Gemini API
   nexus-ai --session-id test       # Start with specific session ID
+  nexus --daemon                   # Run the resident NEXUS daemon
+  nexus --attach --session-id work # Attach to (or create) a daemon session
   nexus --help                     # Show help (same as nexus-ai)
         """
     )
@@ -39,6 +41,49 @@ Examples:
         help='Default AI model to use (default: claude-local)'
     )
     
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='Run the resident NEXUS daemon hosting many sessions'
+    )
+    
+    parser.add_argument(
+        '--attach', '-a',
+        action='store_true',
+        help='Attach to a daemon-hosted session (starts the daemon if needed)'
+    )
+    
+    parser.add_argument(
+        '--list-sessions',
+        action='store_true',
+        help='List sessions hosted by the daemon'
+    )
+    
+    parser.add_argument(
+        '--stop-daemon',
+        action='store_true',
+        help='Write daemon sessions to disk and stop the daemon'
+    )
+    
+    parser.add_argument(
+        '--socket',
+        type=str,
+        help='Daemon socket path (default: ~/.nexus-ai/nexus.sock)'
+    )
+    
+    parser.add_argument(
+        '--rpc-port',
+        type=int,
+        help='Also serve the JSON-RPC API on 127.0.0.1:<port> (daemon mode)'
+    )
+    
+    parser.add_argument(
+        '--idle-timeout',
+        type=float,
+        default=1800,
+        help='Seconds before an idle detached session is evicted to disk (default: 1800)'
+    )
+    
     parser.add_argument(
         '--version', '-v',
         action='version',
@@ -48,8 +93,10 @@ Examples:
     return parser
 
 
-def parse_model_selection(model_str: str) -> tuple[ModelType, ExecutionMode]:
+def parse_model_selection(model_str: str) -> "tuple[ModelType, ExecutionMode]":
     """Parse model string into ModelType and ExecutionMode"""
+    from nexus_ai.models import ModelType, ExecutionMode
+    
     if model_str == 'claude-local':
         return ModelType.CLAUDE, ExecutionMode.LOCAL
     elif model_str == 'claude-api':
@@ -68,6 +115,30 @@ def main():
     parser = create_parser()
     args = parser.parse_args()
     
+    if args.attach or args.list_sessions or args.stop_daemon:
+        from nexus_ai.server import client
+        
+        if args.list_sessions:
+            sys.exit(client.list_sessions(args.socket))
+        if args.stop_daemon:
+            sys.exit(client.stop_daemon(args.socket))
+        sys.exit(client.attach(args.session_id, args.socket))
+    
+    if args.daemon:
+        from nexus_ai.models import model_factory
+        from nexus_ai.server.daemon import NexusDaemon
+        
+        model_type, execution_mode = parse_model_selection(args.model)
+        model_factory.set_default_model(model_type)
+        model_factory.set_default_mode(execution_mode)
+        
+        daemon = NexusDaemon(args.socket, idle_timeout=args.idle_timeout, rpc_port=args.rpc_port)
+        asyncio.run(daemon.serve())
+        return
+    
+    from nexus_ai.core.session import Session
+    from nexus_ai.repl.prompt_toolkit_repl import NexusPromptToolkitREPL
+    
     try:
         # Parse model selection
         model_type, execution_mode = parse_model_selection(args.model)
@@ -1,7 +1,10 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from enum import Enum
 
+from nexus_ai.core.tracing import tracer
+
 
 class ModelType(Enum):
     """Supported model types"""
@@ -45,6 +48,41 @@ class ModelInterface(ABC):
         """
         pass
     
+    async def _communicate(self, process: asyncio.subprocess.Process,
+                           input_bytes: bytes) -> Tuple[bytes, bytes]:
+        """Like process.communicate(), but marks the first byte of the reply in traces
+        
+        Args:
+            process: Subprocess started with stdin/stdout/stderr pipes
+            input_bytes: Prompt to write to stdin
+            
+        Returns:
+            Tuple of (stdout bytes, stderr bytes)
+        """
+        async def feed():
+            process.stdin.write(input_bytes)
+            try:
+                await process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            process.stdin.close()
+        
+        async def read_stdout():
+            chunks = []
+            while True:
+                chunk = await process.stdout.read(65536)
+                if not chunk:
+                    return b''.join(chunks)
+                if not chunks:
+                    tracer.event("first_byte")
+                chunks.append(chunk)
+        
+        _, stdout_bytes, stderr_bytes = await asyncio.gather(
+            feed(), read_stdout(), process.stderr.read()
+        )
+        await process.wait()
+        return stdout_bytes, stderr_bytes
+    
     @property
     def name(self) -> str:
         """Get human-readable model name"""
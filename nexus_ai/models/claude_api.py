@@ -2,6 +2,7 @@ import anthropic
 from anthropic import BadRequestError
 from typing import Optional
 
+from nexus_ai.core.tracing import tracer
 from .base import ModelInterface, ModelType, ExecutionMode, ModelUnavailableError, ModelExecutionError
 
 
@@ -33,7 +34,8 @@ class ClaudeAPI(ModelInterface):
             ModelUnavailableError: If API key not available
             ModelExecutionError: If API call fails
         """
-        return self.get_response_sync(message, context)
+        with tracer.span("model.response", model=self.name):
+            return self.get_response_sync(message, context)
     
     def get_response_sync(self, message: str, context: str = "") -> str:
         """Get response from Claude API (synchronous)
@@ -4,6 +4,7 @@ import shutil
 from typing import Optional
 
 from .base import ModelInterface, ModelType, ExecutionMode, ModelUnavailableError, ModelExecutionError
+from nexus_ai.core.tracing import tracer
 
 
 class ClaudeLocal(ModelInterface):
@@ -40,22 +41,24 @@ class ClaudeLocal(ModelInterface):
         
         try:
             # Execute claude -p with the prompt via stdin (handles multiline properly)
-            process = await asyncio.create_subprocess_exec(
-                "claude", "-p",
-                stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
+            with tracer.span("model.spawn", model=self.name):
+                process = await asyncio.create_subprocess_exec(
+                    "claude", "-p",
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
             
             # Encode the input as bytes
             input_bytes = full_prompt.encode('utf-8')
             
             # Add timeout to prevent hanging
             try:
-                stdout_bytes, stderr_bytes = await asyncio.wait_for(
-                    process.communicate(input=input_bytes), 
-                    timeout=60
-                )
+                with tracer.span("model.response", model=self.name, prompt_bytes=len(input_bytes)):
+                    stdout_bytes, stderr_bytes = await asyncio.wait_for(
+                        self._communicate(process, input_bytes),
+                        timeout=60
+                    )
             except asyncio.TimeoutError:
                 # Kill the process if it times out
                 process.kill()
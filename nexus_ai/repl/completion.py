@@ -0,0 +1,176 @@
+# nexus_ai/repl/completion.py
+import bisect
+import builtins
+import inspect
+import json
+import keyword
+import os
+import re
+import threading
+import time
+import types
+from collections import ChainMap
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from prompt_toolkit.completion import Completer, Completion
+
+
+CACHE_FILE = Path.home() / ".nexus-ai" / "path_index.json"
+
+# Trailing dotted expression before the cursor, e.g. "df.col" or "os.path.jo"
+_ATTRIBUTE_RE = re.compile(r"([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)\.(\w*)$")
+_NAME_RE = re.compile(r"([A-Za-z_]\w*)$")
+
+
+class ExecutableIndex:
+    """Executables on $PATH, cached on disk and refreshed by directory mtime"""
+
+    def __init__(self, cache_file: Optional[Path] = None):
+        self.cache_file = Path(cache_file or CACHE_FILE)
+        self._dirs: Dict[str, Dict] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @staticmethod
+    def _scan(directory: str) -> List[str]:
+        names = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and os.access(entry.path, os.X_OK):
+                            names.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return names
+
+    def refresh(self):
+        """Rescan only the PATH directories whose mtime changed"""
+        if not self._loaded:
+            try:
+                with open(self.cache_file) as f:
+                    self._dirs = json.load(f).get("dirs", {})
+            except (OSError, ValueError):
+                self._dirs = {}
+
+        dirs: Dict[str, Dict] = {}
+        changed = False
+        for directory in dict.fromkeys(os.environ.get("PATH", "").split(os.pathsep)):
+            if not directory:
+                continue
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue
+            cached = self._dirs.get(directory)
+            if cached is not None and cached["mtime"] == mtime:
+                dirs[directory] = cached
+            else:
+                dirs[directory] = {"mtime": mtime, "names": self._scan(directory)}
+                changed = True
+        changed = changed or dirs.keys() != self._dirs.keys()
+
+        if changed or not self._loaded:
+            names = sorted({name for info in dirs.values() for name in info["names"]})
+            with self._lock:
+                self._dirs, self._names = dirs, names
+        if changed:
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.cache_file.with_suffix(".tmp")
+                with open(tmp_file, "w") as f:
+                    json.dump({"dirs": dirs}, f)
+                os.replace(tmp_file, self.cache_file)
+            except OSError:
+                pass
+        self._loaded = True
+
+    def complete(self, prefix: str, limit: int = 200) -> List[str]:
+        with self._lock:
+            start = bisect.bisect_left(self._names, prefix)
+            matches = []
+            for name in self._names[start:start + limit]:
+                if not name.startswith(prefix):
+                    break
+                matches.append(name)
+        return matches
+
+
+_MISSING = object()
+
+
+def _loaded_value(namespace: Mapping, name: str) -> Any:
+    """A name's value if it's already in memory, without loading lazy values"""
+    for mapping in namespace.maps if isinstance(namespace, ChainMap) else [namespace]:
+        if isinstance(mapping, dict):
+            # dict's own lookup skips LazyNamespace.__missing__
+            if dict.__contains__(mapping, name):
+                return dict.__getitem__(mapping, name)
+            if name in mapping:  # Pending, not loaded yet
+                return _MISSING
+        elif name in mapping:
+            return mapping[name]
+    return getattr(builtins, name, _MISSING)
+
+
+def _static_attribute(obj: Any, name: str) -> Any:
+    """An attribute looked up without running properties or __getattr__"""
+    value = inspect.getattr_static(obj, name)
+    if isinstance(value, (types.GetSetDescriptorType, types.MemberDescriptorType)):
+        # C-level fields and __slots__ read a value without calling Python code
+        return value if isinstance(obj, type) else value.__get__(obj, type(obj))
+    if hasattr(type(value), "__get__") and hasattr(type(value), "__set__"):
+        raise AttributeError(name)  # A property or other data descriptor would run code
+    return value
+
+
+def namespace_completions(text: str, namespace: Mapping) -> Iterable[Completion]:
+    """Complete names and attributes against a live Python namespace
+
+    Attribute chains are resolved statically: checkpointed values that
+    aren't loaded yet, properties and __getattr__ are never run.
+    """
+    match = _ATTRIBUTE_RE.search(text)
+    if match:
+        path, prefix = match.group(1).split("."), match.group(2)
+        obj = _loaded_value(namespace, path[0])
+        if obj is _MISSING or obj is None:
+            return
+        try:
+            for part in path[1:]:
+                obj = _static_attribute(obj, part)
+            names = dir(obj)
+        except Exception:
+            return
+        for name in sorted(names):
+            if name.startswith(prefix) and (prefix.startswith("_") or not name.startswith("_")):
+                yield Completion(name, start_position=-len(prefix))
+        return
+
+    match = _NAME_RE.search(text)
+    if not match:
+        return
+    prefix = match.group(1)
+    candidates = set(namespace) | set(dir(builtins)) | set(keyword.kwlist)
+    for name in sorted(candidates):
+        if name.startswith(prefix) and name != prefix and not name.startswith("__"):
+            yield Completion(name, start_position=-len(prefix))
+
+
+class BudgetedCompleter(Completer):
+    """Stop yielding completions once a per-keystroke time budget is spent"""
+
+    def __init__(self, completer: Completer, budget: float = 0.05):
+        self.completer = completer
+        self.budget = budget
+
+    def get_completions(self, document, complete_event):
+        deadline = time.monotonic() + self.budget
+        for completion in self.completer.get_completions(document, complete_event):
+            yield completion
+            if time.monotonic() > deadline:
+                return
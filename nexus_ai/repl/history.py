@@ -0,0 +1,197 @@
+# nexus_ai/repl/history.py
+import bisect
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from prompt_toolkit.auto_suggest import AutoSuggest, Suggestion
+from prompt_toolkit.history import History
+
+
+# Frecency: each use counts once, halving in weight every week
+HALF_LIFE_SECONDS = 7 * 24 * 3600
+
+# Upper bound on prefix candidates scored per keystroke
+MAX_SUGGEST_CANDIDATES = 256
+
+
+class HistoryIndex:
+    """Unique commands with use counts, kept in a sorted list for prefix lookup"""
+
+    def __init__(self):
+        # command -> [count, last_used epoch seconds]
+        self.entries: Dict[str, List[float]] = {}
+        self._sorted: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, command: str, timestamp: Optional[float] = None, count: int = 1):
+        """Record a use of command, collapsing duplicates"""
+        timestamp = timestamp or time.time()
+        with self._lock:
+            entry = self.entries.get(command)
+            if entry is None:
+                self.entries[command] = [count, timestamp]
+                bisect.insort(self._sorted, command)
+            else:
+                entry[0] += count
+                entry[1] = max(entry[1], timestamp)
+
+    @staticmethod
+    def score(entry: List[float], now: float) -> float:
+        count, last_used = entry
+        return count * 0.5 ** (max(0.0, now - last_used) / HALF_LIFE_SECONDS)
+
+    def best_match(self, prefix: str, now: Optional[float] = None) -> Optional[str]:
+        """Highest-frecency command that extends prefix
+
+        Only the first MAX_SUGGEST_CANDIDATES commands in sorted order are
+        scored, so lookups cost the same however large the history grows.
+        """
+        now = now or time.time()
+        best, best_score = None, -1.0
+        with self._lock:
+            start = bisect.bisect_left(self._sorted, prefix)
+            for command in self._sorted[start:start + MAX_SUGGEST_CANDIDATES]:
+                if not command.startswith(prefix):
+                    break
+                if command == prefix:
+                    continue
+                score = self.score(self.entries[command], now)
+                if score > best_score:
+                    best, best_score = command, score
+        return best
+
+    def retain(self, entries: Iterable[Tuple[str, List[float]]]):
+        """Keep only these entries, dropping every other command"""
+        with self._lock:
+            self.entries = {command: entry for command, entry in entries}
+            self._sorted = sorted(self.entries)
+
+    def by_recency(self) -> List[Tuple[str, List[float]]]:
+        with self._lock:
+            return sorted(self.entries.items(), key=lambda item: item[1][1], reverse=True)
+
+    def top(self, limit: int, now: Optional[float] = None) -> List[Tuple[str, List[float]]]:
+        """The limit highest-frecency entries, most recently used first"""
+        now = now or time.time()
+        with self._lock:
+            items = list(self.entries.items())
+        if len(items) > limit:
+            items.sort(key=lambda item: self.score(item[1], now), reverse=True)
+            items = items[:limit]
+        items.sort(key=lambda item: item[1][1], reverse=True)
+        return items
+
+
+def _parse_history_file(path: str) -> Iterable[Tuple[str, float, int]]:
+    """Yield (command, timestamp, count) from a FileHistory-format file
+
+    Compacted files annotate the timestamp comment with ``x<count>``; plain
+    prompt_toolkit FileHistory files simply count each occurrence once.
+    """
+    lines: List[str] = []
+    timestamp, count = 0.0, 1
+
+    def flush():
+        if lines:
+            yield "".join(lines)[:-1], timestamp, count
+
+    with open(path, "rb") as f:
+        for raw in f:
+            line = raw.decode("utf-8", errors="replace")
+            if line.startswith("+"):
+                lines.append(line[1:])
+            elif line.startswith("#"):
+                yield from flush()
+                lines = []
+                fields = line[1:].split()
+                count = 1
+                try:
+                    timestamp = datetime.fromisoformat(" ".join(fields[:2])).timestamp()
+                except ValueError:
+                    pass
+                if len(fields) > 2 and fields[2].startswith("x") and fields[2][1:].isdigit():
+                    count = int(fields[2][1:])
+            else:
+                yield from flush()
+                lines = []
+    yield from flush()
+
+
+def _format_entry(command: str, timestamp: float, count: int = 1) -> str:
+    stamp = datetime.fromtimestamp(timestamp)
+    suffix = f" x{count}" if count > 1 else ""
+    body = "".join(f"+{line}\n" for line in command.split("\n"))
+    return f"\n# {stamp}{suffix}\n{body}"
+
+
+class IndexedHistory(History):
+    """Bounded, deduplicated command history with a frecency index
+
+    The file stays in prompt_toolkit's FileHistory format. Wrap instances
+    in ``ThreadedHistory`` so the file is read off the event loop.
+    """
+
+    def __init__(self, filename: str, max_entries: int = 10000):
+        super().__init__()
+        self.filename = filename
+        self.max_entries = max_entries
+        self.index = HistoryIndex()
+        self.loaded = threading.Event()
+        self._file_entries = 0
+
+    def load_history_strings(self) -> Iterable[str]:
+        if os.path.exists(self.filename):
+            for command, timestamp, count in _parse_history_file(self.filename):
+                self.index.add(command, timestamp, count)
+                self._file_entries += 1
+        self.loaded.set()
+
+        if self._file_entries > 2 * self.max_entries:
+            self.compact()
+
+        # Newest first, one entry per unique command
+        return [command for command, _ in self.index.by_recency()]
+
+    def store_string(self, string: str):
+        now = time.time()
+        self.index.add(string, now)
+        with open(self.filename, "a", encoding="utf-8") as f:
+            f.write(_format_entry(string, now))
+        self._file_entries += 1
+
+        # Appends are cheap; rewrite only once duplicates double the file
+        if self.loaded.is_set() and self._file_entries > 2 * self.max_entries:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the file and the index with the top max_entries commands"""
+        entries = self.index.top(self.max_entries)
+        self.index.retain(entries)
+        tmp_name = f"{self.filename}.tmp"
+        with open(tmp_name, "w", encoding="utf-8") as f:
+            for command, (count, timestamp) in reversed(entries):
+                f.write(_format_entry(command, timestamp, int(count)))
+        os.replace(tmp_name, self.filename)
+        self._file_entries = len(entries)
+
+
+class FrecencyAutoSuggest(AutoSuggest):
+    """Suggest the highest-frecency history entry for the current line"""
+
+    def __init__(self, history: IndexedHistory):
+        self.history = history
+
+    def get_suggestion(self, buffer, document) -> Optional[Suggestion]:
+        text = document.text.rsplit("\n", 1)[-1]
+        if not text.strip() or not self.history.loaded.is_set():
+            return None
+        match = self.history.index.best_match(text)
+        if match is None:
+            return None
+        return Suggestion(match[len(text):])
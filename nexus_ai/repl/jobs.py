@@ -0,0 +1,77 @@
+# nexus_ai/repl/jobs.py
+import asyncio
+import time
+from typing import Awaitable, Dict, List, Optional
+
+
+class Job:
+    """A command running as an asyncio task behind the prompt"""
+
+    def __init__(self, job_id: int, command: str, task: asyncio.Task):
+        self.job_id = job_id
+        self.command = command
+        self.task = task
+        self.started = time.monotonic()
+        # Optional (done, total) pair for jobs that can report progress
+        self.progress: Optional[tuple] = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def describe(self, width: int = 40) -> str:
+        command = self.command if len(self.command) <= width else self.command[:width - 1] + "…"
+        progress = ""
+        if self.progress:
+            done, total = self.progress
+            progress = f" {done}/{total}" if total else f" {done}"
+        return f"[{self.job_id}] {command}{progress} ({self.elapsed:.0f}s)"
+
+
+class JobManager:
+    """Tracks background commands so the prompt stays live while they run"""
+
+    def __init__(self):
+        self.jobs: Dict[int, Job] = {}
+        self._next_id = 1
+
+    def start(self, command: str, coro: Awaitable) -> Job:
+        """Schedule coro as a background job"""
+        job_id = self._next_id
+        self._next_id += 1
+        job = Job(job_id, command, asyncio.ensure_future(coro))
+        self.jobs[job_id] = job
+        job.task.add_done_callback(lambda task: self._finished(job))
+        return job
+
+    def _finished(self, job: Job):
+        self.jobs.pop(job.job_id, None)
+        if job.task.cancelled():
+            print(f"[{job.job_id}] Cancelled: {job.command}")
+        elif job.task.exception() is not None:
+            print(f"[{job.job_id}] Failed: {job.command}: {job.task.exception()}")
+        else:
+            print(f"[{job.job_id}] Done: {job.command} ({job.elapsed:.1f}s)")
+
+    def running(self) -> List[Job]:
+        return list(self.jobs.values())
+
+    def cancel(self, job_id: int) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None:
+            return False
+        job.task.cancel()
+        return True
+
+    def cancel_all(self):
+        for job in self.running():
+            job.task.cancel()
+
+    def toolbar_text(self) -> str:
+        """Short summary of running jobs for the bottom toolbar"""
+        jobs = self.running()
+        if not jobs:
+            return ""
+        if len(jobs) == 1:
+            return f"Job: {jobs[0].describe(24)} | "
+        return f"Jobs: {len(jobs)} running | "
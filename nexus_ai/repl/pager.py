@@ -0,0 +1,206 @@
+# nexus_ai/repl/pager.py
+import re
+from typing import List, Optional, Pattern, Tuple
+
+from prompt_toolkit.application import Application
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.filters import Condition
+from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.layout import ConditionalContainer, HSplit, Layout, Window
+from prompt_toolkit.layout.controls import BufferControl, FormattedTextControl
+from prompt_toolkit.styles import Style
+
+from nexus_ai.core.spill import LineIndex, compile_search
+
+
+# Escape sequences and other control characters would garble the screen
+_CONTROL_RE = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]|\x1b[@-_]|[\x00-\x08\x0b-\x1f\x7f]")
+
+PAGER_STYLE = Style.from_dict({
+    "status": "reverse",
+    "match": "bg:ansiyellow fg:ansiblack",
+    "prompt": "bold",
+})
+
+
+class Pager:
+    """Full-screen, read-only view over a LineIndex
+
+    Only the rows on screen are decoded and rendered, so paging a
+    multi-gigabyte spill file costs the same as paging a short one.
+    Keys follow less: j/k, space/b, g/G, /pattern ?pattern, n/N, q.
+    """
+
+    def __init__(self, index: LineIndex, title: str = ""):
+        self.index = index
+        self.title = title
+        self.top = 0
+        self.left = 0
+        self.pattern: Optional[Pattern[bytes]] = None
+        self._text_pattern: Optional[Pattern[str]] = None
+        self.backward = False
+        self.message = ""
+        self.searching = False
+        self.search_buffer = Buffer(multiline=False, accept_handler=self._accept_search)
+
+        self.body = Window(FormattedTextControl(self._render_lines, focusable=True), wrap_lines=False)
+        status = Window(FormattedTextControl(self._render_status), height=1, style="class:status")
+        search = ConditionalContainer(
+            Window(BufferControl(self.search_buffer), height=1,
+                   get_line_prefix=lambda *_: [("class:prompt", "?" if self.backward else "/")]),
+            filter=Condition(lambda: self.searching),
+        )
+        self.app = Application(
+            layout=Layout(HSplit([self.body, status, search]), focused_element=self.body),
+            key_bindings=self._key_bindings(),
+            style=PAGER_STYLE,
+            full_screen=True,
+        )
+
+    @property
+    def rows(self) -> int:
+        return max(1, self.app.output.get_size().rows - 1 - int(self.searching))
+
+    @property
+    def columns(self) -> int:
+        return self.app.output.get_size().columns
+
+    def scroll(self, lines: int):
+        top = max(0, self.top + lines)
+        # Indexes only as far as the new last row; past the end it is complete
+        if not self.index.lines(top + self.rows - 1, 1):
+            top = max(0, min(top, len(self.index) - self.rows))
+        self.top = top
+
+    def goto_end(self):
+        self.top = max(0, len(self.index) - self.rows)
+
+    def _render_lines(self) -> List[Tuple[str, str]]:
+        fragments: List[Tuple[str, str]] = []
+        width = self.columns
+        for line in self.index.lines(self.top, self.rows):
+            line = _CONTROL_RE.sub("", line.expandtabs())[self.left:self.left + width]
+            fragments.extend(self._highlight(line))
+            fragments.append(("", "\n"))
+        return fragments
+
+    def _highlight(self, line: str) -> List[Tuple[str, str]]:
+        if self._text_pattern is None:
+            return [("", line)]
+        fragments, position = [], 0
+        for match in self._text_pattern.finditer(line):
+            if match.start() == match.end():
+                continue
+            fragments.append(("", line[position:match.start()]))
+            fragments.append(("class:match", match.group()))
+            position = match.end()
+        fragments.append(("", line[position:]))
+        return fragments
+
+    def _render_status(self) -> str:
+        total = f"{len(self.index):,}" if self.index.complete else "?"
+        last = self.top + self.rows
+        percent = f" {min(100, 100 * last // max(1, len(self.index)))}%" if self.index.complete else ""
+        status = f" {self.title}  lines {self.top + 1:,}-{last:,}/{total}{percent}"
+        if self.message:
+            status += f"  {self.message}"
+        return status + "   (q quit, / search, n/N next/prev)"
+
+    def _accept_search(self, buffer: Buffer) -> bool:
+        self.searching = False
+        text = buffer.text
+        if text:
+            self.pattern = compile_search(text)
+            flags = self.pattern.flags & (re.IGNORECASE | re.MULTILINE)
+            try:
+                self._text_pattern = re.compile(text, flags)
+            except re.error:
+                self._text_pattern = re.compile(re.escape(text), flags)
+            self.search(self.backward)
+        self.app.layout.focus(self.body)
+        return False
+
+    def search(self, backward: bool):
+        if self.pattern is None:
+            return
+        found = self.index.search(self.pattern, self.top, backward=backward)
+        if found is None:
+            self.message = "Pattern not found"
+        else:
+            self.top, self.message = found, ""
+
+    def _key_bindings(self) -> KeyBindings:
+        bindings = KeyBindings()
+        browsing = Condition(lambda: not self.searching)
+
+        @bindings.add("q", filter=browsing)
+        @bindings.add("escape", filter=browsing)
+        @bindings.add("c-c")
+        def _quit(event):
+            event.app.exit()
+
+        @bindings.add("j", filter=browsing)
+        @bindings.add("down", filter=browsing)
+        @bindings.add("enter", filter=browsing)
+        def _down(event):
+            self.scroll(1)
+
+        @bindings.add("k", filter=browsing)
+        @bindings.add("up", filter=browsing)
+        def _up(event):
+            self.scroll(-1)
+
+        @bindings.add("space", filter=browsing)
+        @bindings.add("f", filter=browsing)
+        @bindings.add("pagedown", filter=browsing)
+        def _page_down(event):
+            self.scroll(self.rows)
+
+        @bindings.add("b", filter=browsing)
+        @bindings.add("pageup", filter=browsing)
+        def _page_up(event):
+            self.scroll(-self.rows)
+
+        @bindings.add("g", filter=browsing)
+        @bindings.add("home", filter=browsing)
+        def _home(event):
+            self.top = 0
+
+        @bindings.add("G", filter=browsing)
+        @bindings.add("end", filter=browsing)
+        def _end(event):
+            self.goto_end()
+
+        @bindings.add("right", filter=browsing)
+        def _right(event):
+            self.left += max(8, self.columns // 2)
+
+        @bindings.add("left", filter=browsing)
+        def _left(event):
+            self.left = max(0, self.left - max(8, self.columns // 2))
+
+        @bindings.add("/", filter=browsing)
+        @bindings.add("?", filter=browsing)
+        def _start_search(event):
+            self.backward = event.data == "?"
+            self.searching = True
+            self.search_buffer.reset()
+            event.app.layout.focus(self.search_buffer)
+
+        @bindings.add("escape", filter=Condition(lambda: self.searching))
+        def _cancel_search(event):
+            self.searching = False
+            event.app.layout.focus(self.body)
+
+        @bindings.add("n", filter=browsing)
+        def _next(event):
+            self.search(self.backward)
+
+        @bindings.add("N", filter=browsing)
+        def _previous(event):
+            self.search(not self.backward)
+
+        return bindings
+
+    async def run_async(self):
+        await self.app.run_async()
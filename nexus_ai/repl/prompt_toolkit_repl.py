@@ -1,34 +1,82 @@
 # nexus_ai/repl/prompt_toolkit_repl.py
 import asyncio
+import re
+import shlex
+import signal
 import sys
+import threading
 import os
-from typing import Optional, List, Dict, Any
+import time
+from collections import ChainMap
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Set, Tuple
 from prompt_toolkit import PromptSession
-from prompt_toolkit.history import FileHistory
-from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
-from prompt_toolkit.completion import Completer, Completion
+from prompt_toolkit.history import ThreadedHistory
+from prompt_toolkit.completion import Completer, Completion, PathCompleter, ThreadedCompleter
+from prompt_toolkit.document import Document
 from prompt_toolkit.lexers import PygmentsLexer
 from prompt_toolkit.styles import Style
 from prompt_toolkit.filters import Condition
 from prompt_toolkit.formatted_text import HTML
+from prompt_toolkit.patch_stdout import patch_stdout
 from pygments.lexers import PythonLexer, BashLexer
 
 from nexus_ai.core.session import Session
-from nexus_ai.core.executor import CodeExecutor
+from nexus_ai.core.output import route_task_output
+from nexus_ai.core.executor import CodeExecutor, live_echo, no_terminal
+from nexus_ai.core.tracing import format_flame, format_top, tracer
+from nexus_ai.core.profiling import (
+    MAGICS, Measurement, Timer, format_command_memory, format_memory, format_profile,
+    format_timing, note_usage
+)
+from nexus_ai.core.spill import LineIndex, parse_range
+from nexus_ai.core.capture import capture
+from nexus_ai.core.cells import Cell
+from nexus_ai.core.checkpoint import NamespaceCheckpointer, checkpoint_dir, list_checkpoints
+from nexus_ai.core.trial import Trial, TrialError
+from nexus_ai.core import pmap as process_map
+from nexus_ai.core.taskgraph import (
+    DONE, PLAN_PROMPT, Step, TaskGraph, TaskPlanError, TaskRunner, TaskStore, parse_plan
+)
+from nexus_ai.core.rundiff import RUN_DIFF, RunDiffer, run_diffs
+from nexus_ai.core.rusage import PREDICT_MIN_SECONDS, Estimate, Usage, format_duration
+from nexus_ai.core.watch import Watcher, WatchError, watch_loop
 from nexus_ai.claude.client import ClaudeClient
 from nexus_ai.models import model_factory, ModelType, ExecutionMode, ModelUnavailableError, ModelExecutionError
+from nexus_ai.repl.completion import BudgetedCompleter, ExecutableIndex, namespace_completions
+from nexus_ai.repl.history import FrecencyAutoSuggest, IndexedHistory
+from nexus_ai.repl.jobs import JobManager
+from nexus_ai.repl.pager import Pager
 from anthropic import BadRequestError
 
 
+# "!cmd |> name" streams the command's stdout into a Python variable;
+# "|> name:table" parses it into typed columns
+CAPTURE_RE = re.compile(r'^!(?:[ic] )?(.+?)\s*\|>\s*([A-Za-z_]\w*)(:table)?$')
+
+# "%pmap [-u] [-c N] func iterable [-> name]"
+PMAP_RE = re.compile(r'^(?:(-u)\s+)?(?:-c\s+(\d+)\s+)?(\S+)\s+(.+?)(?:\s*->\s*([A-Za-z_]\w*))?$')
+
+# "watch <path or glob>... -- <command>"; 'watch -n 1 date' is left to watch(1)
+WATCH_RE = re.compile(r'^watch\s+([^-\s].*?)\s+--\s+(.+)$')
+
+
 class NexusCompleter(Completer):
     """Custom completer for NEXUS commands"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[Session] = None,
+                 executables: Optional[ExecutableIndex] = None):
+        # Live namespace for Python completion and $PATH index for bash
+        self.session = session
+        self.executables = executables
+        self.path_completer = PathCompleter(expanduser=True)
+        
         self.nexus_commands = [
             '> ',  # Python
             '!',   # Bash
             '!i ', # Interactive bash
             '!c ', # Captured bash
+            '|> ', # Capture stdout into a Python variable
             '??',  # Claude query
             'claude ',  # Claude API query (backward compatibility)
             'claude -p ',  # Claude local query
@@ -36,6 +84,30 @@ class NexusCompleter(Completer):
             'gemini -p ',  # Gemini local query
             'model ',   # Model commands
             'task:',    # Task
+            '%time ',   # Time any command
+            '%prof ',   # Profile a Python cell
+            '%mem ',    # Memory use of any command
+            '%pmap ',   # Map a function over worker processes
+            'trace ',   # Span tracing
+            'view ',    # Page through spilled output
+            'checkpoint',  # Save the Python namespace
+            'cells',       # Python cells and their names
+            'deps ',       # What a cell reads from and feeds
+            'rerun',       # Re-run changed cells
+            'commit',      # Keep a >? trial's changes
+            'task plan ',  # Plan a task as a step graph
+            'task run',    # Run the planned steps
+            'task retry',  # Re-run failed steps
+            'task show',   # Step status
+            'task list',   # Saved tasks
+            'task resume ',  # Continue a saved task
+            'discard',     # Drop a >? trial's changes
+            'restore ',    # Lazily restore a saved namespace
+            'watch ',   # Re-run a command on file changes
+            'watch list',  # Active watchers
+            'watch stop',  # Stop watchers
+            'jobs',     # Background jobs
+            'kill %',   # Cancel a background job
             'exit',     # Exit
             'quit',     # Quit
             'help',     # Help
@@ -73,8 +145,15 @@ class NexusCompleter(Completer):
                 if cmd.startswith(text):
                     yield Completion(cmd, start_position=-len(text))
         
-        # Complete Python keywords after >
+        # Complete Python names and attributes after >
         elif text.startswith('>'):
+            if self.session is not None:
+                # A ChainMap looks names up one at a time, so completing
+                # never loads every lazily restored value
+                namespace = ChainMap(self.session.python_locals, self.session.python_globals)
+                yield from namespace_completions(text[1:], namespace)
+                return
+            
             python_code = text[1:].strip()
             last_word = python_code.split()[-1] if python_code.split() else ''
             
@@ -82,14 +161,21 @@ class NexusCompleter(Completer):
                 if keyword.startswith(last_word):
                     yield Completion(keyword, start_position=-len(last_word))
         
-        # Complete bash commands after !
-        elif text.startswith('!') and not text.startswith('!i ') and not text.startswith('!c '):
-            bash_command = text[1:].strip()
-            last_word = bash_command.split()[-1] if bash_command.split() else bash_command
+        # Complete executables, then filenames, after !, !i and !c
+        elif text.startswith('!'):
+            bash_command = text[3:] if text.startswith(('!i ', '!c ')) else text[1:]
+            words = bash_command.split()
             
-            for cmd in self.bash_commands:
-                if cmd.startswith(last_word):
+            if len(words) <= 1 and not bash_command.endswith(' '):
+                last_word = words[0] if words else ''
+                commands = self.executables.complete(last_word) if self.executables else []
+                for cmd in commands or [c for c in self.bash_commands if c.startswith(last_word)]:
                     yield Completion(cmd, start_position=-len(last_word))
+            else:
+                last_word = '' if bash_command.endswith(' ') else words[-1]
+                yield from self.path_completer.get_completions(
+                    Document(last_word, len(last_word)), complete_event
+                )
         
         # Complete model commands after 'model '
         elif text.startswith('model '):
@@ -117,12 +203,26 @@ class NexusPromptToolkitREPL:
     
     def __init__(self, session: Optional[Session] = None, 
                  default_model: ModelType = ModelType.CLAUDE, 
-                 default_mode: ExecutionMode = ExecutionMode.LOCAL):
+                 default_mode: ExecutionMode = ExecutionMode.LOCAL,
+                 headless: bool = False):
         # Initialize session and components
         self.session = session or Session()
         self.executor = CodeExecutor(self.session)
         self.output_manager = self.session.output_manager
         
+        # Namespace checkpoints; incremental against the last one saved or restored
+        self.checkpointer = NamespaceCheckpointer(checkpoint_dir(self.session.session_id))
+        
+        # Result of the last '>?' trial run, until 'commit' or 'discard'
+        self.trial: Optional[Trial] = None
+        
+        # Model-planned task graphs: 'task plan', 'task run', 'task retry';
+        # each run is saved to ~/.nexus-ai/tasks as its steps finish
+        self.task_graph: Optional[TaskGraph] = None
+        self.task_store = TaskStore()
+        self.task_runner = TaskRunner(self.run_task_step, on_event=self.show_task_event,
+                                      store=self.task_store)
+        
         # Initialize model factory and backward compatibility
         self.model_factory = model_factory
         
@@ -141,6 +241,11 @@ class NexusPromptToolkitREPL:
         self.current_mode = "nexus"
         self.last_input = ""
         
+        # Commands sent to the background with a trailing '&'
+        self.jobs = JobManager()
+        # 'watch' jobs by job id: (watcher, command)
+        self.watchers: Dict[int, Tuple[Watcher, str]] = {}
+        
         # Default model settings from CLI arguments
         self.default_model = default_model
         self.default_execution_mode = default_mode
@@ -149,11 +254,31 @@ class NexusPromptToolkitREPL:
         self.model_factory.set_default_model(default_model)
         self.model_factory.set_default_mode(default_mode)
         
+        # Headless instances (daemon-hosted sessions) only use the router
+        self.headless = headless
+        if headless:
+            self.executor.allow_interactive = False
+        
+        # Deduplicated, size-capped history; loaded off the event loop so
+        # the first prompt doesn't wait for it
+        self.history = IndexedHistory(
+            os.path.expanduser(os.getenv('NEXUS_HISTORY_FILE', '~/.nexus_history')),
+            max_entries=int(os.getenv('NEXUS_MAX_HISTORY', '10000')),
+        )
+        
+        # $PATH index warms up in the background; completion runs in a
+        # thread with a per-keystroke budget so typing never waits on it
+        self.executables = ExecutableIndex()
+        if not headless:
+            threading.Thread(target=self.executables.refresh, daemon=True).start()
+        
         # Create prompt session with rich features
-        self.prompt_session = PromptSession(
-            history=FileHistory(os.path.expanduser('~/.nexus_history')),
-            auto_suggest=AutoSuggestFromHistory(),
-            completer=NexusCompleter(),
+        self.prompt_session = None if headless else PromptSession(
+            history=ThreadedHistory(self.history),
+            auto_suggest=FrecencyAutoSuggest(self.history),
+            completer=ThreadedCompleter(BudgetedCompleter(
+                NexusCompleter(self.session, self.executables)
+            )),
             style=self.create_style(),
             multiline=False,  # We'll handle multiline manually
             prompt_continuation="... ",
@@ -161,6 +286,7 @@ class NexusPromptToolkitREPL:
             enable_suspend=True,
             enable_open_in_editor=True,
             bottom_toolbar=self.get_bottom_toolbar,
+            refresh_interval=0.5,  # Keep job timers in the toolbar current
         )
     
     def create_style(self) -> Style:
@@ -198,6 +324,8 @@ class NexusPromptToolkitREPL:
              f' NEXUS | Session: {session_id} | '
              f'Outputs: {outputs_count} | '
              f'Mode: {self.current_mode} | '
+             f'{self.jobs.toolbar_text()}'
+             f'{process_map.toolbar_text()}'
              f'Ctrl+C: exit, Ctrl+D: EOF ')
         ]
     
@@ -224,6 +352,7 @@ class NexusPromptToolkitREPL:
     !i <command>      - Force interactive bash command
     !c <command>      - Force captured bash command
     ?? <query> or claude <query> - Ask AI (uses default model)
+    <command> &       - Run any command in the background
     help             - Show all commands"""
         print(intro)
     
@@ -231,37 +360,94 @@ class NexusPromptToolkitREPL:
         """Main async event loop"""
         self.print_intro()
         
-        while True:
-            try:
-                # Get user input
-                line = await self.get_input()
-                
-                if not line.strip():
+        # Output from background jobs is drawn above the live prompt
+        with patch_stdout(raw=True):
+            while True:
+                try:
+                    # Get user input
+                    line = await self.get_input()
+                    
+                    if not line.strip():
+                        continue
+                    
+                    # Update mode based on input
+                    self.update_mode(line)
+                    
+                    # Parse and execute command, in the background on a trailing '&'
+                    command, background = self.split_background(line)
+                    if background:
+                        self.start_background(command)
+                    else:
+                        await self.run_foreground(command)
+                    
+                except EOFError:
+                    print("\nGoodbye!")
+                    break
+                except KeyboardInterrupt:
+                    print("\nUse Ctrl+D or type 'exit' to quit")
                     continue
-                
-                # Update mode based on input
-                self.update_mode(line)
-                
-                # Parse and execute command
-                await self.parse_command(line)
-                
-            except EOFError:
-                print("\nGoodbye!")
-                break
-            except KeyboardInterrupt:
-                print("\nUse Ctrl+D or type 'exit' to quit")
-                continue
-            except Exception as e:
-                print(f"Error: {str(e)}")
-                continue
+                except Exception as e:
+                    print(f"Error: {str(e)}")
+                    continue
+            
+            self.jobs.cancel_all()
+            process_map.shutdown_pool(kill=True)
     
     async def get_input(self) -> str:
-        """Get user input with proper async handling"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, 
-            lambda: self.prompt_session.prompt("🔮 ")
-        )
+        """Get user input without blocking the event loop"""
+        return await self.prompt_session.prompt_async("🔮 ")
+    
+    async def confirm(self, question: str) -> bool:
+        """Ask a yes/no question; no where there is no terminal to ask at"""
+        if self.headless or no_terminal.get():
+            return False
+        try:
+            answer = await self.prompt_session.prompt_async(f"{question} [y/N] ")
+        except (EOFError, KeyboardInterrupt):
+            return False
+        return answer.strip().lower() in ('y', 'yes')
+    
+    @staticmethod
+    def split_background(line: str) -> Tuple[str, bool]:
+        """Split a trailing '&' (but not '&&') off a command line"""
+        stripped = line.rstrip()
+        if stripped.endswith('&') and not stripped.endswith('&&') and len(stripped) > 1:
+            return stripped[:-1].rstrip(), True
+        return line, False
+    
+    def start_background(self, line: str):
+        """Run a command as a background job while the prompt stays live"""
+        if line.startswith('!i '):
+            print("✗ Interactive commands need the terminal and can't run in the background")
+            return
+        
+        async def run_job():
+            # Context is per task: only this job loses access to the terminal
+            no_terminal.set(True)
+            await self.parse_command(line)
+        
+        job = self.jobs.start(line, run_job())
+        print(f"[{job.job_id}] Started: {line}")
+    
+    async def run_foreground(self, line: str):
+        """Run a command while the prompt waits; Ctrl+C cancels just this command"""
+        task = asyncio.ensure_future(self.parse_command(line))
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGINT, task.cancel)
+        except (NotImplementedError, RuntimeError):
+            pass
+        try:
+            await task
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            print("\n✗ Command interrupted by user")
+        finally:
+            try:
+                loop.remove_signal_handler(signal.SIGINT)
+            except (NotImplementedError, RuntimeError):
+                pass
     
     def update_mode(self, line: str):
         """Update current mode based on input"""
@@ -277,22 +463,44 @@ class NexusPromptToolkitREPL:
             self.current_mode = "model_config"
         elif line.startswith('task:'):
             self.current_mode = "task"
+        elif line.startswith(MAGICS):
+            self.current_mode = "profile"
         else:
             self.current_mode = "nexus"
     
     async def parse_command(self, line: str):
         """Parse and route commands to appropriate handlers"""
+        with tracer.span("command", line=line.strip()[:80]):
+            await self.route_command(line)
+    
+    async def route_command(self, line: str):
+        """Route one command line to its handler"""
         
         # Strip and check for empty
         line = line.strip()
         if not line:
             return
         
+        # Trial run in a forked copy of the session with >?
+        if line.startswith('>?'):
+            await self.handle_trial(line[2:].strip())
+        
+        elif line in ('commit', 'commit rerun'):
+            await self.handle_commit(rerun=line == 'commit rerun')
+        
+        elif line == 'discard':
+            self.handle_discard()
+        
         # Python execution with >
-        if line.startswith('>'):
+        elif line.startswith('>'):
             code = line[1:].strip()
             await self.handle_python(code)
         
+        # Capture stdout into a Python variable with !cmd |> name
+        elif CAPTURE_RE.match(line):
+            command, name, table = CAPTURE_RE.match(line).groups()
+            await self.handle_capture(command.strip(), name, as_table=bool(table))
+        
         # Interactive bash with !i
         elif line.startswith('!i '):
             command = line[3:].strip()
@@ -337,6 +545,26 @@ class NexusPromptToolkitREPL:
         elif line.startswith('model '):
             await self.handle_model_config(line[6:].strip())
         
+        # Map a function over an iterable in worker processes
+        elif line == '%pmap' or line.startswith('%pmap '):
+            await self.handle_pmap(line[5:].strip())
+        
+        # Profiling magics wrap any other command
+        elif line.split(maxsplit=1)[0] in MAGICS:
+            await self.handle_magic(line)
+        
+        # Re-run a command when files change
+        elif WATCH_RE.match(line):
+            patterns, command = WATCH_RE.match(line).groups()
+            self.start_watch(shlex.split(patterns), command.strip())
+        
+        elif line in ('watch list', 'watch stop') or line.startswith('watch stop '):
+            self.handle_watch_command(line[6:].strip())
+        
+        # Planned, parallel task steps
+        elif line == 'task' or line.startswith('task '):
+            await self.handle_task_command(line[4:].strip())
+        
         # Task execution
         elif line.startswith('task:'):
             task = line[5:].strip()
@@ -350,48 +578,241 @@ class NexusPromptToolkitREPL:
         elif line == 'help':
             self.show_help()
         
+        # Span tracing
+        elif line == 'trace' or line.startswith('trace '):
+            self.handle_trace(line[5:].strip())
+        
+        # Page through spilled output
+        elif line == 'view' or line.startswith('view '):
+            await self.handle_view(line[4:].strip())
+        
+        # Python cell graph
+        elif line == 'cells':
+            self.show_cells()
+        
+        elif re.match(r'^deps \d+$', line):
+            self.show_deps(int(line[5:]))
+        
+        elif line == 'rerun' or re.match(r'^rerun \d+$', line):
+            await self.handle_rerun(int(line[6:]) if line != 'rerun' else None)
+        
+        # Namespace checkpoints
+        elif line == 'checkpoint' or line.startswith('checkpoint '):
+            self.handle_checkpoint(line[10:].strip())
+        
+        elif line == 'restore' or line.startswith('restore '):
+            self.handle_restore(line[7:].strip())
+        
+        # Background job control
+        elif line == 'jobs':
+            self.show_jobs()
+        
+        elif re.match(r'^kill %\d+$', line):
+            job_id = int(line[6:])
+            if not self.jobs.cancel(job_id):
+                print(f"No such job: %{job_id}")
+        
         # Default to bash
         else:
             await self.handle_bash(line)
     
+    async def run_python(self, code: str, cell: Optional[Cell] = None) -> Tuple[str, str]:
+        """Execute Python code and store its output, returning (stdout, stderr)"""
+        # Runs on this loop, so cells can await (and Ctrl+C cancels them)
+        stdout, stderr = await self.executor.execute_python_async(code, cell=cell)
+        
+        # Store output (large output is spilled and comes back as a preview)
+        if stdout:
+            stdout = self.output_manager.store_output("python_stdout", stdout, label=code)
+        if stderr:
+            stderr = self.output_manager.store_output("python_stderr", stderr, label=code)
+        
+        return stdout, stderr
+    
+    async def run_bash(self, command: str, mode: Optional[str] = None,
+                       diff: bool = False) -> Tuple[str, str]:
+        """Execute a bash command and store its output, returning (stdout, stderr)
+        
+        With diff, a command already run in this directory comes back as a
+        diff of its stdout against the previous run, and isn't echoed live.
+        """
+        diff = diff and RUN_DIFF and run_diffs.get()
+        repeat = diff and self.output_manager.runs.seen(command)
+        token = live_echo.set(False) if repeat else None
+        estimate = self.predict_duration(command)
+        try:
+            stdout, stderr = await self.executor.execute_bash_async(command, mode=mode)
+        finally:
+            if token is not None:
+                live_echo.reset(token)
+        usage = self.check_duration(command, estimate)
+        
+        # Store normalized output (large output is spilled and comes back as a preview);
+        # the run's resource usage goes with its first entry
+        data = {"usage": usage.to_dict()} if usage is not None else None
+        # A PTY run's output is its transcript; its stdout only says how it ended
+        in_pty = self.store_transcript(command, data, diff=diff)
+        if in_pty:
+            data = None
+        elif stdout:
+            stdout = self.output_manager.store_command_output("bash_stdout", stdout, command,
+                                                              diff=diff, data=data)
+            data = None
+        if stderr:
+            stderr = self.output_manager.store_command_output("bash_stderr", stderr, command,
+                                                              data=data)
+            data = None
+        if data is not None:
+            self.output_manager.store_output(
+                "bash_run", f"Executed: {command} (exit {usage.returncode}, no output)",
+                data=data, label=command
+            )
+        
+        return stdout, stderr
+    
+    def store_transcript(self, command: str, data: Optional[Dict] = None, diff: bool = False):
+        """Store what an interactive command left on screen, if it ran in a PTY
+        
+        With diff, a rerun is stored as a diff against its last run, as in run_bash.
+        """
+        transcript = self.executor.take_transcript()
+        if transcript is None:
+            return False
+        text = transcript.pop("text")
+        # Normalized and filtered like captured output: pip, npm and the
+        # like usually run here, in the PTY
+        self.output_manager.store_command_output(
+            "bash_interactive", f"Executed: {command}\n{text}" if text else f"Executed: {command}",
+            command, diff=diff, data={**(data or {}), "transcript": transcript}
+        )
+        return True
+    
+    def predict_duration(self, command: str) -> Optional[Estimate]:
+        """Say how long command usually takes, if that's long; the estimate is for check_duration"""
+        estimate = self.executor.stats.estimate(command)
+        if estimate is not None and estimate.mean >= PREDICT_MIN_SECONDS:
+            print(f"⋯ Usually takes {estimate.describe()}")
+        return estimate
+    
+    def check_duration(self, command: str, estimate: Optional[Estimate]) -> Optional[Usage]:
+        """Take the usage of command's run and warn if it was much slower than usual"""
+        usage = self.executor.take_usage(command)
+        note_usage(usage)
+        if usage is not None and estimate is not None and estimate.is_slow(usage.wall):
+            print(f"⚠ Took {format_duration(usage.wall)}, usually {estimate.describe()}")
+        return usage
+    
+    async def ask_model(self, query: str, model_name: Optional[str] = None,
+                        execution_mode: Optional[str] = None) -> Tuple[str, str]:
+        """Query a model with session context and store the response
+        
+        Returns:
+            Tuple of (model name, response)
+        """
+        # Map execution mode string to enum
+        mode = ExecutionMode(execution_mode) if execution_mode else None
+        
+        # Get model instance from factory
+        model = self.model_factory.get_model(model_name, mode)
+        
+        # Get context from output manager
+        context = self.output_manager.get_recent_context()
+        
+        # Get response from model
+        response = await model.get_response(query, context)
+        
+        # Store response
+        response = self.output_manager.store_output(f"{model.name}_response", response, label=query)
+        
+        return model.name, response
+    
     async def handle_python(self, code: str):
-        """Execute Python code (synchronously for now)"""
+        """Execute Python code, awaiting it if it uses top-level await"""
         try:
-            # Execute Python code using the existing executor
-            stdout, stderr = self.executor.execute_python(code)
-            
-            if stdout:
-                print(stdout)
-            if stderr:
-                print(stderr, file=sys.stderr)
+            stdout, stderr = await self.run_python(code)
             
-            # Store output
-            if stdout:
-                self.output_manager.store_output("python_stdout", stdout)
-            if stderr:
-                self.output_manager.store_output("python_stderr", stderr)
+            with tracer.span("print"):
+                if stdout:
+                    print(stdout)
+                if stderr:
+                    print(stderr, file=sys.stderr)
                 
         except Exception as e:
             error_msg = f"Error executing Python code: {str(e)}"
             print(error_msg, file=sys.stderr)
             self.output_manager.store_output("python_error", error_msg)
     
+    async def handle_trial(self, code: str):
+        """Run a cell in a forked copy of the session; keep its changes only on 'commit'"""
+        if self.trial is not None:
+            print(f"⚠ Discarding the previous trial ({self.trial.describe()})")
+            self.trial = None
+        
+        def show(text: str):
+            print(text, end="", flush=True)
+        
+        try:
+            trial = await self.executor.execute_python_trial(code, on_output=show)
+        except TrialError as e:
+            print(f"✗ Trial not run: {e}")
+            return
+        
+        if trial.output:
+            self.output_manager.store_output("python_trial", trial.output, label=code)
+        if trial.failed:
+            print("✗ Trial failed; the namespace is unchanged")
+            return
+        if trial.unchecked:
+            print(f"⚠ {', '.join(trial.unchecked)} can't be pickled or is too large to hash, so "
+                  f"in-place changes to {'it' if len(trial.unchecked) == 1 else 'them'} aren't detected")
+        if not trial.names:
+            print("✓ Trial changed no names; nothing to commit")
+            return
+        self.trial = trial
+        if trial.unpicklable:
+            print(f"⋯ Trial changed {trial.describe()}: 'commit rerun' re-runs the cell here "
+                  f"to keep its changes, 'discard' to drop")
+        else:
+            print(f"⋯ Trial changed {trial.describe()}: 'commit' to keep, 'discard' to drop")
+    
+    async def handle_commit(self, rerun: bool = False):
+        """Apply the pending trial's changes to the namespace"""
+        trial = self.trial
+        if trial is None:
+            print("No trial to commit (run one with >? <code>)")
+            return
+        if trial.unpicklable:
+            # Functions, open files, sockets... can't cross the process boundary
+            if not rerun:
+                print(f"✗ {', '.join(sorted(trial.unpicklable))} can't be sent back from the trial; "
+                      f"keeping the changes means re-running the cell here, repeating its side effects "
+                      f"(file writes, network calls). 'commit rerun' to do that, 'discard' to drop")
+                return
+            self.trial = None
+            await self.handle_python(trial.code)
+            return
+        self.trial = None
+        names = self.executor.commit_trial(trial)
+        print(f"✓ Committed {', '.join(names)}")
+    
+    def handle_discard(self):
+        """Drop the pending trial"""
+        trial, self.trial = self.trial, None
+        if trial is None:
+            print("No trial to discard")
+            return
+        print(f"✓ Discarded changes to {', '.join(trial.names)}")
+    
     async def handle_bash(self, command: str):
         """Execute bash command with auto-detection"""
         try:
-            # Use async subprocess handling
-            stdout, stderr = await self.executor.execute_bash_async(command)
+            stdout, stderr = await self.run_bash(command, diff=True)
             
-            if stdout:
-                print(stdout)
-            if stderr:
-                print(stderr, file=sys.stderr)
-            
-            # Store output
-            if stdout:
-                self.output_manager.store_output("bash_stdout", stdout)
-            if stderr:
-                self.output_manager.store_output("bash_stderr", stderr)
+            with tracer.span("print"):
+                if stdout:
+                    print(stdout)
+                if stderr:
+                    print(stderr, file=sys.stderr)
                 
         except Exception as e:
             error_msg = f"Error executing bash command: {str(e)}"
@@ -402,15 +823,20 @@ class NexusPromptToolkitREPL:
         """Force interactive mode for bash command"""
         try:
             # Use async subprocess handling with forced interactive mode
+            estimate = self.predict_duration(command)
             stdout, stderr = await self.executor.execute_bash_async(command, mode='interactive')
+            usage = self.check_duration(command, estimate)
             
             if stdout:
                 print(stdout)
             if stderr:
                 print(stderr, file=sys.stderr)
             
-            # Store minimal output info for interactive commands
-            self.output_manager.store_output("bash_interactive", f"Executed: {command}")
+            # Store the screen transcript, or minimal info if there was none
+            data = {"usage": usage.to_dict()} if usage is not None else None
+            if not self.store_transcript(command, data):
+                self.output_manager.store_output("bash_interactive", f"Executed: {command}",
+                                                 data=data)
                 
         except Exception as e:
             error_msg = f"Error in interactive mode: {str(e)}"
@@ -420,25 +846,155 @@ class NexusPromptToolkitREPL:
     async def handle_bash_captured(self, command: str):
         """Force captured mode for bash command"""
         try:
-            # Use async subprocess handling with forced captured mode
-            stdout, stderr = await self.executor.execute_bash_async(command, mode='captured')
-            
-            if stdout:
-                print(stdout)
-            if stderr:
-                print(stderr, file=sys.stderr)
+            # Forced captured mode stores the full output
+            stdout, stderr = await self.run_bash(command, mode='captured', diff=True)
             
-            # Store full output
-            if stdout:
-                self.output_manager.store_output("bash_stdout", stdout)
-            if stderr:
-                self.output_manager.store_output("bash_stderr", stderr)
+            with tracer.span("print"):
+                if stdout:
+                    print(stdout)
+                if stderr:
+                    print(stderr, file=sys.stderr)
                 
         except Exception as e:
             error_msg = f"Error in captured mode: {str(e)}"
             print(error_msg, file=sys.stderr)
             self.output_manager.store_output("bash_captured_error", error_msg)
     
+    async def handle_capture(self, command: str, name: str, as_table: bool = False):
+        """Stream a command's stdout, undecoded, into a Python variable (or a Table)"""
+        try:
+            estimate = self.predict_duration(command)
+            with tracer.span("capture", command=command[:80]):
+                captured = await capture(command)
+            if captured.usage is not None:
+                self.executor.record_usage(command, captured.usage)
+            usage = self.check_duration(command, estimate)
+            if as_table:
+                with tracer.span("capture.table"):
+                    value = captured.table()
+        except Exception as e:
+            error_msg = f"Error capturing command output: {str(e)}"
+            print(error_msg, file=sys.stderr)
+            self.output_manager.store_output("bash_error", error_msg)
+            return
+        
+        if captured.stderr:
+            print(captured.stderr.rstrip('\n'), file=sys.stderr)
+        mark = "✓" if captured.returncode == 0 else "✗"
+        data = {"name": name, "bytes": len(captured), "returncode": captured.returncode}
+        usage_data = {"usage": usage.to_dict()} if usage is not None else {}
+        
+        if as_table:
+            # Model context gets the column summary instead of the raw rows
+            self.session.python_locals[name] = value
+            print(f"{mark} {name} = {value.describe()}  (.where(), .sort(), .summary())")
+            self.output_manager.store_output(
+                "bash_table", f"Captured: {command} |> {name}\n{value.summary()}",
+                data={"capture": {**data, "rows": len(value)}, **usage_data}, label=command
+            )
+            return
+        
+        self.session.python_locals[name] = captured
+        print(f"{mark} {name} = {captured.describe()}  (.text(), .lines(), .view(), .table())")
+        
+        # History gets a note, not the output: the variable is the record
+        self.output_manager.store_output(
+            "bash_capture", f"Captured: {command} |> {name} = {captured.describe()}",
+            data={"capture": data, **usage_data}, label=command
+        )
+    
+    async def handle_pmap(self, args: str):
+        """%pmap [-u] [-c N] <func> <iterable> [-> name] - map func over iterable on the process pool"""
+        match = PMAP_RE.match(args)
+        if not match:
+            print("Usage: %pmap [-u] [-c N] <func> <iterable> [-> name]   e.g. %pmap parse files -> parsed")
+            return
+        unordered, chunksize, func, iterable, name = match.groups()
+        # The namespace cells run in, so the names resolve as they would in a cell
+        namespace = self.executor.namespace()
+        try:
+            fn = eval(func, namespace)
+            items = eval(iterable, namespace)
+        except Exception as e:
+            print(f"✗ {type(e).__name__}: {e}")
+            return
+        
+        mapping = process_map.pmap(fn, items, ordered=not unordered,
+                                   chunksize=int(chunksize) if chunksize else None)
+        timer = Timer()
+        try:
+            results = await mapping
+        except process_map.PMapError as e:
+            print(f"✗ {e}")
+            return
+        except Exception as e:
+            print(f"✗ {func} failed in a worker: {type(e).__name__}: {e}")
+            return
+        timing = timer.stop()
+        
+        name = name or '_'
+        namespace[name] = results
+        summary = (f"✓ {len(results):,} results in {timing['wall']:.2f}s "
+                   f"({mapping.workers} worker{'s' if mapping.workers != 1 else ''}, "
+                   f"chunks of {mapping.chunksize}) → {name}")
+        errors = mapping.errors
+        if errors:
+            summary += (f"\n⚠ {len(errors):,} item{'s' if len(errors) != 1 else ''} failed "
+                        f"(an ItemError in place of each result); first: item #{errors[0].index} "
+                        f"{errors[0].item}: {errors[0].error}")
+        print(summary)
+        data = {"errors": [{"index": e.index, "item": e.item, "error": e.error,
+                            "traceback": e.traceback} for e in errors[:100]]} if errors else None
+        self.output_manager.store_output("pmap", summary, data=data, label=f"%pmap {args}")
+    
+    async def handle_magic(self, line: str):
+        """Run a command under %time, %prof or %mem and store the measurements"""
+        parts = line.split(maxsplit=1)
+        magic, command = parts[0], parts[1].strip() if len(parts) > 1 else ''
+        
+        limit = 20
+        match = re.match(r'^-n\s+(\d+)\s+(.*)$', command)
+        if match:
+            limit, command = int(match.group(1)), match.group(2).strip()
+        
+        if not command:
+            print(f"Usage: {magic} <command>   e.g. {magic} > sum(range(10**6))")
+            return
+        
+        is_python = command.startswith('>')
+        if magic == '%prof' and not is_python:
+            print("%prof profiles Python cells (> code); timing the command instead")
+            magic = '%time'
+        
+        data: Dict[str, Any] = {"magic": magic, "command": command}
+        timer = Timer()
+        # Profiler and memory tracer run only around the cell's own code
+        with Measurement(magic, limit) as measurement:
+            await self.parse_command(command)
+        data["timing"] = timer.stop()
+        
+        if magic == '%prof':
+            if measurement.ran:
+                table, rows = format_profile(measurement.profiler, limit)
+                data["profile"] = rows
+            else:
+                table = "(no Python code ran)"
+            summary = f"{format_timing(data['timing'])}\n{table}"
+        elif magic == '%mem' and is_python:
+            if measurement.memory is not None:
+                data["memory"] = measurement.memory
+                summary = format_memory(data["memory"])
+            else:
+                summary = "🧠 No Python code ran"
+        elif magic == '%mem':
+            data["usage"] = [usage.to_dict() for usage in measurement.usages]
+            summary = format_command_memory(measurement.usages)
+        else:
+            summary = format_timing(data["timing"])
+        
+        print(summary)
+        self.output_manager.store_output("profile", f"{magic} {command}\n{summary}", data=data)
+    
     async def handle_claude(self, query: str):
         """Process Claude queries - uses the configured default model and mode"""
         try:
@@ -459,11 +1015,14 @@ class NexusPromptToolkitREPL:
                 else:
                     raise ModelUnavailableError(f"Default model unavailable: {str(e)}")
             
-            print(f"\n{model_name} response:")
-            print(response)
-            
             # Store response with model info
-            self.output_manager.store_output(f"{model_name.lower().replace('-', '_')}_response", response)
+            response = self.output_manager.store_output(
+                f"{model_name.lower().replace('-', '_')}_response", response, label=query
+            )
+            
+            with tracer.span("print"):
+                print(f"\n{model_name} response:")
+                print(response)
             
         except ModelUnavailableError as e:
             print(f"\nError: {str(e)}")
@@ -501,39 +1060,182 @@ class NexusPromptToolkitREPL:
                 else:
                     raise Exception("No AI model available for task assistance")
             
+            # Store task and response
+            self.output_manager.store_output("task", task)
+            response = self.output_manager.store_output(f"{model_name}_task_response", response, label=task)
+            
             print(f"\n📋 Task: {task}")
             print(f"\n{model_name.title()} assistance:")
             print(response)
-            
-            # Store task and response
-            self.output_manager.store_output("task", task)
-            self.output_manager.store_output(f"{model_name}_task_response", response)
+            # Advice only: nothing ran, so there is no step state to save or resume
+            print(f"\n⋯ 'task plan {task}' turns it into saved steps that 'task resume' can continue")
             
         except Exception as e:
             error_msg = f"Error processing task: {str(e)}"
             print(error_msg, file=sys.stderr)
             self.output_manager.store_output("task_error", error_msg)
     
+    async def handle_task_command(self, args: str):
+        """task plan|run|retry|show|list|resume - model-planned steps run in parallel where independent"""
+        action, _, description = args.partition(' ')
+        description = description.strip()
+        
+        if action == 'plan' and description:
+            graph = await self.plan_task(description)
+            if graph is not None:
+                print(graph.describe())
+                print("⋯ 'task run' runs it")
+        elif action == 'run' and description:
+            # The plan's commands come from the model: nothing runs until they are seen
+            graph = await self.plan_task(description)
+            if graph is None:
+                return
+            print(graph.describe())
+            if not await self.confirm("Run this plan?"):
+                print("⋯ Not run: 'task run' runs this plan once you have checked it")
+                return
+            await self.run_task_graph(graph)
+        elif action == 'run':
+            if self.task_graph is None:
+                print("No planned task (use 'task plan <description>' or 'task run <description>')")
+                return
+            await self.run_task_graph(self.task_graph)
+        elif action == 'retry' and not description:
+            if self.task_graph is None:
+                print("No task to retry")
+                return
+            self.task_graph.reset_unfinished()
+            await self.run_task_graph(self.task_graph)
+        elif action == 'show' and not description:
+            print(self.task_graph.describe() if self.task_graph else "No planned task")
+        elif action == 'list' and not description:
+            self.list_tasks()
+        elif action == 'resume' and description:
+            await self.resume_task(description)
+        else:
+            print("Usage: task plan <description> | task run [description] | task retry | task show\n"
+                  "       task list | task resume <id>")
+    
+    async def plan_task(self, description: str) -> Optional[TaskGraph]:
+        """Ask the model for a step graph for description"""
+        print(f"⋯ Planning: {description}")
+        try:
+            _, response = await self.ask_model(PLAN_PROMPT.format(task=description))
+            graph = parse_plan(description, str(response))
+        except TaskPlanError as e:
+            print(f"✗ Could not use the plan: {e}")
+            return None
+        except (ModelUnavailableError, ModelExecutionError) as e:
+            print(f"✗ No model to plan with: {e}")
+            return None
+        self.task_graph = graph
+        return graph
+    
+    def list_tasks(self):
+        """Print saved tasks, most recent first"""
+        tasks = self.task_store.list()
+        if not tasks:
+            print("No saved tasks")
+        for saved in tasks:
+            when = datetime.fromtimestamp(saved['updated_at']).strftime('%Y-%m-%d %H:%M')
+            state = "✓" if saved['done'] == saved['steps'] else "✗" if saved['failed'] else "⋯"
+            print(f"  {state} {saved['id']}  {when}  {saved['done']}/{saved['steps']} steps  "
+                  f"{saved['task'][:50]}")
+    
+    async def resume_task(self, task_id: str):
+        """Continue a saved task, keeping the steps it already finished"""
+        try:
+            graph = self.task_store.load(task_id)
+        except TaskPlanError as e:
+            print(f"✗ {e}")
+            return
+        counts = graph.counts()
+        if counts['done'] == len(graph.steps):
+            print(f"✓ Task {graph.id} already finished")
+            return
+        if self.task_graph is None or self.task_graph.id != graph.id:
+            if any(step.kind == 'python' and step.status == DONE for step in graph):
+                print("⚠ Python steps that already ran are not re-run; names they defined "
+                      "are only there if this session still has them")
+        print(f"↻ Resuming {graph.id}: {counts['done']} of {len(graph.steps)} steps already done")
+        graph.reset_unfinished()
+        await self.run_task_graph(graph)
+    
+    def record_task(self, graph: TaskGraph):
+        """Mirror a task's state into the session (saved with it by the daemon)"""
+        counts = graph.counts()
+        self.session.task_status[graph.id] = {
+            "task": graph.task, "updated_at": graph.updated_at, **counts,
+        }
+        self.session.subtasks = [step.to_record() for step in graph]
+    
+    async def run_task_graph(self, graph: TaskGraph):
+        """Run a graph's pending steps and print a summary"""
+        self.task_graph = graph
+        pending = graph.counts()['pending']
+        print(f"⋯ Task {graph.id}: {pending} step{'s' if pending != 1 else ''} to run, "
+              f"up to {self.task_runner.concurrency} at a time")
+        self.record_task(graph)
+        started = time.monotonic()
+        try:
+            counts = await self.task_runner.run(graph)
+        finally:
+            self.record_task(graph)
+        elapsed = time.monotonic() - started
+        cached = sum(step.cached for step in graph)
+        
+        if counts['failed'] or counts['blocked']:
+            summary = (f"✗ {counts['failed']} failed, {counts['blocked']} blocked, "
+                       f"{counts['done']} done in {elapsed:.1f}s; 'task retry' "
+                       f"(or 'task resume {graph.id}') re-runs the rest")
+        else:
+            summary = (f"✓ {counts['done']} steps done in {elapsed:.1f}s"
+                       + (f" ({cached} from cache)" if cached else ""))
+        print(summary)
+        self.output_manager.store_output("task_summary", f"{graph.describe()}\n{summary}",
+                                         label=graph.task)
+    
+    async def run_task_step(self, step: Step) -> Tuple[str, str, bool, Optional[int]]:
+        """Run one task step through the executor, storing its output"""
+        if step.kind == 'python':
+            cell = self.executor.new_cell(step.command)
+            stdout, stderr = await self.executor.execute_python_async(step.command, cell=cell)
+            ok, returncode = not cell.failed, None
+        else:
+            stdout, stderr, returncode = await self.executor.run_command(step.command)
+            ok = returncode == 0
+        usage = self.executor.take_usage(step.command) if step.kind == 'bash' else None
+        
+        output = stdout + (f"\n{stderr}" if stderr else "")
+        if output.strip():
+            self.output_manager.store_command_output(
+                "task_step", output, step.command if step.kind == 'bash' else "",
+                data={"usage": usage.to_dict()} if usage is not None else None
+            )
+        return stdout, stderr, ok, returncode
+    
+    def show_task_event(self, step: Step, event: str):
+        """Stream a step's status as the runner reports it"""
+        command = step.command.strip().splitlines()[0][:60] if step.command.strip() else ""
+        if event == 'start':
+            print(f"⋯ [{step.id}] {command}")
+        elif event == 'done':
+            print(f"✓ [{step.id}] {step.duration:.1f}s")
+        elif event == 'cached':
+            print(f"✓ [{step.id}] cached")
+        elif event == 'failed':
+            print(f"✗ [{step.id}] {step.error or 'failed'}")
+        elif event == 'blocked':
+            print(f"↷ [{step.id}] blocked by a failed step")
+    
     async def handle_model_query(self, model_name: str, execution_mode: str, query: str):
         """Handle AI model queries with specified execution mode"""
         try:
-            # Map execution mode string to enum
-            mode = ExecutionMode.LOCAL if execution_mode == 'local' else ExecutionMode.API
+            name, response = await self.ask_model(query, model_name, execution_mode)
             
-            # Get model instance from factory
-            model = self.model_factory.get_model(model_name, mode)
-            
-            # Get context from output manager
-            context = self.output_manager.get_recent_context()
-            
-            # Get response from model
-            response = await model.get_response(query, context)
-            
-            print(f"\n{model.name.title()} response:")
-            print(response)
-            
-            # Store response
-            self.output_manager.store_output(f"{model.name}_response", response)
+            with tracer.span("print"):
+                print(f"\n{name.title()} response:")
+                print(response)
             
         except ModelUnavailableError as e:
             error_msg = f"Model unavailable: {str(e)}"
@@ -626,16 +1328,271 @@ class NexusPromptToolkitREPL:
                     else:
                         print(f"    Usage: {model_name} <query>")
     
+    async def handle_view(self, args: str):
+        """Page through a spilled output (or any file) in a searchable viewer"""
+        parts = args.split()
+        spills = self.output_manager.spills
+        
+        if parts[:1] == ['list']:
+            if not spills.refs:
+                print("No spilled outputs this session")
+            for ref in spills.refs.values():
+                print(ref.describe())
+            return
+        
+        # view [N|path] [start[:end]]
+        line_range = None
+        if len(parts) == 2 or (parts and re.match(r'^\d+:\d*$', parts[-1])):
+            line_range = parts.pop()
+            if not re.match(r'^\d+(:\d*)?$', line_range):
+                print("Usage: view [N|path] [start[:end]]")
+                return
+        target = parts[0] if parts else None
+        if target is None or target.isdigit():
+            ref = spills.get(int(target) if target else None)
+            if ref is None:
+                print(f"No spilled output {'#' + target if target else 'yet'} (see 'view list')")
+                return
+            path, title = ref.path, f"#{ref.spill_id} {ref.label[:40]}"
+        else:
+            path = title = os.path.expanduser(target)
+        
+        try:
+            index = LineIndex(path)
+        except OSError as e:
+            print(f"✗ Cannot open {path}: {e.strerror}")
+            return
+        
+        with index:
+            if line_range or self.headless:
+                start, count = parse_range(line_range or '1')
+                for number, text in enumerate(index.lines(start, count), start + 1):
+                    print(f"{number:>8}  {text}")
+            else:
+                await Pager(index, title).run_async()
+    
+    def show_cells(self):
+        """List recorded Python cells with the names each reads and writes"""
+        graph = self.executor.cells
+        if not graph.cells:
+            print("No Python cells run yet")
+            return
+        for cell in graph.cells.values():
+            print(cell.describe())
+    
+    def show_deps(self, number: int):
+        """Show which cells feed cell N and which cells it feeds"""
+        graph = self.executor.cells
+        if graph.get(number) is None:
+            print(f"No cell [{number}] (see 'cells')")
+            return
+        upstream = graph.upstream(number)
+        downstream = graph.downstream(number)
+        print(graph.get(number).describe())
+        for name, source in sorted(upstream.items()):
+            print(f"  ← {name} from [{source}]")
+        print(f"  → feeds {', '.join(f'[{n}]' for n in downstream)}" if downstream else "  → feeds nothing")
+    
+    async def handle_rerun(self, number: Optional[int]):
+        """Re-run cell N and whatever depends on it (or every stale cell), skipping unchanged inputs"""
+        graph = self.executor.cells
+        if number is not None and graph.get(number) is None:
+            print(f"No cell [{number}] (see 'cells')")
+            return
+        
+        namespace = ChainMap(self.session.python_locals, self.session.python_globals)
+        ran = skipped = 0
+        for cell, changed in graph.plan(namespace, number):
+            if not changed and cell.number != number:
+                skipped += 1
+                continue
+            code = cell.code.strip().splitlines()[0][:60]
+            print(f"↻ [{cell.number}] {code}" + (f"  (changed: {', '.join(changed)})" if changed else ""))
+            stdout, stderr = await self.run_python(cell.code, cell=cell)
+            ran += 1
+            if stdout:
+                print(stdout)
+            if stderr:
+                print(stderr, file=sys.stderr)
+            if cell.failed:
+                print(f"✗ Cell [{cell.number}] failed; later cells not re-run")
+                return
+        print(f"✓ Re-ran {ran} cell{'s' if ran != 1 else ''}, skipped {skipped} with unchanged inputs")
+    
+    def handle_checkpoint(self, args: str):
+        """checkpoint [list] - save changed Python names to disk, or list checkpoints"""
+        if args == 'list':
+            checkpoints = list_checkpoints()
+            if not checkpoints:
+                print("No checkpoints saved")
+            for saved in checkpoints:
+                when = datetime.fromtimestamp(saved['saved_at']).strftime('%Y-%m-%d %H:%M')
+                print(f"  {saved['name']:<28} {when}  {saved['names']:>4} names  "
+                      f"{saved['bytes'] / 2**20:>8.1f} MB")
+            return
+        if args:
+            print("Usage: checkpoint [list]")
+            return
+        
+        with tracer.span("checkpoint.save"):
+            report = self.checkpointer.save(self.session.python_locals, self.session.python_globals,
+                                            cells=self.executor.cells)
+        print(f"✓ Checkpoint {self.checkpointer.directory.name}: wrote {report['written']} "
+              f"({report['bytes_written'] / 2**20:.1f} MB), {report['unchanged']} unchanged, "
+              f"{report['modules']} modules")
+        for name, reason in report['unpicklable'].items():
+            print(f"⚠ Not saved: {name} ({reason})")
+    
+    def handle_restore(self, name: str):
+        """restore [name] - lazily load a checkpoint (default: the newest) into the namespace"""
+        if not name:
+            checkpoints = list_checkpoints()
+            if not checkpoints:
+                print("No checkpoints saved")
+                return
+            name = checkpoints[0]['name']
+        checkpointer = NamespaceCheckpointer(checkpoint_dir(name))
+        try:
+            namespace, globals_ns, failed = checkpointer.restore()
+        except FileNotFoundError:
+            print(f"✗ No checkpoint named {name} (see 'checkpoint list')")
+            return
+        
+        # Names defined since are kept unless the checkpoint has them too;
+        # ones still pending from an earlier restore stay unloaded
+        restored = len(namespace.pending())
+        namespace.keep_missing(self.session.python_locals)
+        self.session.python_locals = namespace
+        self.session.python_globals.update(globals_ns)
+        self.checkpointer = checkpointer
+        print(f"✓ Restored {restored} names from {name} (loaded on first use)")
+        for key, reason in failed.items():
+            print(f"⚠ Could not restore global {key} ({reason})")
+    
+    def handle_trace(self, command: str):
+        """trace on|off|last|top|clear - control and inspect span tracing"""
+        if command == 'on':
+            tracer.enabled = True
+            print(f"Tracing on (spans logged to {tracer.trace_dir / 'trace.jsonl'})")
+        elif command == 'off':
+            tracer.enabled = False
+            print("Tracing off")
+        elif command in ('', 'last'):
+            print(format_flame(tracer.last_trace()))
+        elif command == 'top':
+            print(format_top(tracer.top()))
+        elif command == 'clear':
+            tracer.buffer.clear()
+            print("Trace buffer cleared")
+        else:
+            print("Usage: trace on|off|last|top|clear")
+    
+    def start_watch(self, patterns: List[str], command: str):
+        """Run command now and whenever files matching patterns change, as a job"""
+        if not patterns:
+            print("Usage: watch <path or glob>... -- <command>")
+            return
+        try:
+            watcher = Watcher(patterns)
+        except WatchError as e:
+            print(f"✗ {e}")
+            return
+        
+        async def run_watch():
+            # job is bound below, before this coroutine first runs
+            job_id = job.job_id
+            no_terminal.set(True)
+            # The whole command's output is diffed here, not each bash run inside it
+            live_echo.set(False)
+            run_diffs.set(False)
+            try:
+                watcher.start()
+            except WatchError as e:
+                print(f"✗ [watch {job_id}] {e}")
+                return
+            print(f"⋯ [watch {job_id}] {len(watcher.directories)} director"
+                  f"{'ies' if len(watcher.directories) != 1 else 'y'} watched; "
+                  f"'{command}' re-runs on change")
+            differ = RunDiffer()
+            
+            async def run(changed: Set[str]):
+                if changed:
+                    names = sorted(os.path.relpath(path) for path in changed)
+                    more = f" (+{len(names) - 3})" if len(names) > 3 else ""
+                    print(f"↻ [watch {job_id}] {', '.join(names[:3])}{more} changed")
+                collected: List[str] = []
+                started = time.monotonic()
+                with route_task_output(lambda stream, data: collected.append(data)):
+                    await self.parse_command(command)
+                elapsed = time.monotonic() - started
+                output = "".join(collected)
+                run = differ.compare(command, output)
+                if run is None:
+                    print(output, end="" if output.endswith("\n") or not output else "\n")
+                else:
+                    print(run.render())
+                print(f"✓ [watch {job_id}] ran in {elapsed:.1f}s")
+            
+            def restarted():
+                print(f"↷ [watch {job_id}] changed again; restarting '{command}'")
+            
+            try:
+                await watch_loop(watcher, run, on_restart=restarted)
+            finally:
+                watcher.close()
+                self.watchers.pop(job_id, None)
+        
+        job = self.jobs.start(f"watch {' '.join(patterns)} -- {command}", run_watch())
+        self.watchers[job.job_id] = (watcher, command)
+        print(f"[{job.job_id}] Watching {', '.join(patterns)}")
+    
+    def handle_watch_command(self, args: str):
+        """watch list | watch stop [N|all]"""
+        if args == 'list':
+            if not self.watchers:
+                print("No watchers")
+            for job_id, (watcher, command) in sorted(self.watchers.items()):
+                print(f"  [{job_id}] {', '.join(watcher.patterns)} -- {command}  "
+                      f"({len(watcher.directories)} dirs)")
+            return
+        
+        target = args[4:].strip()
+        if target in ('', 'all'):
+            stopping = list(self.watchers)
+        elif target.lstrip('%').isdigit() and int(target.lstrip('%')) in self.watchers:
+            stopping = [int(target.lstrip('%'))]
+        else:
+            print(f"No such watcher: {target}")
+            return
+        if not stopping:
+            print("No watchers")
+        for job_id in stopping:
+            self.jobs.cancel(job_id)
+    
+    def show_jobs(self):
+        """List running background jobs"""
+        jobs = self.jobs.running()
+        if not jobs:
+            print("No background jobs")
+            return
+        for job in jobs:
+            print(f"  {job.describe(60)}")
+    
     def show_help(self):
         """Show help information"""
         model_display = f"{self.default_model.value}-{self.default_execution_mode.value}"
         
         help_text = f"""
 Available Commands:
-  > <code>           - Execute Python code
+  > <code>           - Execute Python code (top-level await runs on the REPL loop)
+  >? <code>          - Trial run in a forked copy of the session; then
+                       'commit' keeps its changes, 'discard' drops them
+                       ('commit rerun' when they must be re-created here)
   ! <command>        - Execute bash command (auto-detect interactive)
   !i <command>       - Force interactive bash command  
   !c <command>       - Force captured bash command
+  !<command> |> var  - Stream stdout as bytes into Python variable var
+  !<cmd> |> var:table- Parse stdout (CSV/TSV/aligned columns) into a typed table
   ?? <query>         - Ask AI (uses current default: {model_display})
   claude <query>     - Ask Claude (uses current default mode)  
   claude -p <query>  - Ask Claude (explicit local mode)
@@ -644,7 +1601,42 @@ Available Commands:
   model status       - Show model configuration
   model set <model>  - Set default model
   model mode <mode>  - Set default execution mode
-  task: <description>- Start a new task
+  task: <description>- Ask the model how to go about a task (runs nothing)
+  task plan <desc>   - Ask the model for steps (commands + dependencies)
+  task run [desc]    - Run the planned steps, independent ones in parallel;
+                       with a description, plans and asks before running
+                       (NEXUS_TASK_CONCURRENCY at a time, default 4)
+  task retry         - Re-run failed and blocked steps; finished ones are cached
+  task show          - Status of each step
+  task list          - Saved tasks (~/.nexus-ai/tasks), most recent first
+  task resume <id>   - Continue a saved task after a crash or restart;
+                       finished steps are not run again
+  <command> &        - Run any command as a background job
+  %time <command>    - Wall, user and sys time of any command
+  %prof [-n N] > code- cProfile a Python cell (top N functions)
+  %mem <command>     - tracemalloc peak/diff, or the command's peak RSS
+  %pmap f xs [-> r]  - Map f over xs in worker processes (-u: unordered,
+                       -c N: chunk size); results in r (default _).
+                       In cells: await pmap(f, xs), async for r in pmap(...)
+  trace on|off       - Record spans for every command
+  trace last|top     - Flame view of the last command / top spans by self time
+  view [N|path]      - Page through spilled output #N (or a file); / to search
+  view N 100:150     - Print a line range of a spilled output
+  view list          - List outputs spilled to ~/.nexus-ai/spill
+  cells              - List Python cells with the names they read and write
+  deps N             - Cells that cell N reads from and feeds
+  rerun [N]          - Re-run cell N and its dependents (or all stale cells),
+                       skipping cells whose inputs are unchanged
+  checkpoint         - Save changed Python names to ~/.nexus-ai/checkpoints
+  checkpoint list    - List saved checkpoints
+  restore [name]     - Restore a checkpoint (default: newest); loads lazily
+  watch <glob>... -- <cmd>
+                     - Re-run any command when matching files change (inotify),
+                       printing only what changed in its output
+  watch list         - Active watchers
+  watch stop [N|all] - Stop watcher N, or all of them
+  jobs               - List background jobs
+  kill %<n>          - Cancel background job n
   help               - Show this help
   exit/quit          - Exit NEXUS
 
@@ -666,7 +1658,8 @@ Special Features:
   - Command history with Up/Down arrows
   - Multi-line support for complex commands
   - Real-time output for interactive commands
-  - Bottom toolbar shows session information
+  - Bottom toolbar shows session information and running jobs
+  - Prompt stays live while background jobs run
   - CLI model selection on startup
 """
         print(help_text)
\ No newline at end of file
@@ -2,6 +2,7 @@
 from typing import Dict, List
 from nexus_ai.core.session import Session
 from nexus_ai.claude.client import ClaudeClient
+from nexus_ai.core.taskgraph import TaskPlanError, parse_plan
 
 
 class TaskREPL:
@@ -31,7 +32,13 @@ class TaskREPL:
 
     def parse_subtasks(self, response: str) -> List[Dict]:
         """Parse Claude's response into subtasks"""
-        # Basic implementation - extract numbered items
+        # A JSON step plan (see nexus_ai.core.taskgraph) keeps commands and dependencies
+        try:
+            return [{**step.to_dict(), 'completed': False} for step in parse_plan("", response)]
+        except TaskPlanError:
+            pass
+        
+        # Otherwise extract numbered items
         lines = response.split('\n')
         subtasks = []
         
@@ -50,7 +57,8 @@ class TaskREPL:
         print("\n📝 Subtasks to complete:")
         
         for i, subtask in enumerate(subtasks, 1):
-            print(f"{i}. {subtask['description']}")
+            print(f"{i}. {subtask['description'] or subtask.get('command', '')}")
         
-        print("\nYou can now work through these subtasks in NEXUS.")
+        print("\nYou can now work through these subtasks in NEXUS,")
+        print("or let 'task run <description>' plan and run them in parallel.")
         print("Use 'task: <description>' for help with specific subtasks.")
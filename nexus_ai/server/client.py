@@ -0,0 +1,178 @@
+# nexus_ai/server/client.py
+#
+# Thin attach client. Keep imports light: this runs on every `nexus --attach`
+# and must not pull in prompt_toolkit, anthropic or the model backends.
+import json
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+DEFAULT_SOCKET = Path.home() / ".nexus-ai" / "nexus.sock"
+
+
+class DaemonConnection:
+    """Line-delimited JSON connection to a running NEXUS daemon"""
+
+    def __init__(self, socket_path: Path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(str(socket_path))
+        self.reader = self.sock.makefile("rb")
+
+    def send(self, message: Dict):
+        self.sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+
+    def receive(self) -> Optional[Dict]:
+        raw = self.reader.readline()
+        return json.loads(raw) if raw else None
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+def start_daemon(socket_path: Path, timeout: float = 10.0):
+    """Spawn a detached daemon and wait for its socket to appear"""
+    log_path = socket_path.parent / "daemon.log"
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "ab") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "nexus_ai.main", "--daemon", "--socket", str(socket_path)],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return DaemonConnection(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            time.sleep(0.05)
+    raise ConnectionError(f"NEXUS daemon did not start (see {log_path})")
+
+
+def connect(socket_path: Optional[str] = None, autostart: bool = True) -> DaemonConnection:
+    path = Path(socket_path or DEFAULT_SOCKET)
+    try:
+        return DaemonConnection(path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        if not autostart:
+            raise
+        return start_daemon(path)
+
+
+def _write_output(message: Dict):
+    stream = sys.stderr if message.get("stream") == "stderr" else sys.stdout
+    stream.write(message.get("data", ""))
+    stream.flush()
+
+
+def _wait_for_done(conn: DaemonConnection) -> bool:
+    """Relay output until the running command finishes; False if the daemon went away"""
+    while True:
+        try:
+            message = conn.receive()
+        except KeyboardInterrupt:
+            conn.send({"type": "interrupt"})
+            continue
+        if message is None:
+            return False
+        kind = message.get("type")
+        if kind == "output":
+            _write_output(message)
+        elif kind == "done":
+            return True
+        elif kind == "error":
+            print(f"Error: {message.get('message')}", file=sys.stderr)
+            return True
+
+
+def list_sessions(socket_path: Optional[str] = None) -> int:
+    """Print the sessions hosted by the daemon"""
+    try:
+        conn = connect(socket_path, autostart=False)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print("NEXUS daemon is not running")
+        return 1
+    conn.send({"type": "list"})
+    reply = conn.receive() or {}
+    conn.close()
+    for info in reply.get("sessions", []):
+        if info.get("evicted"):
+            print(f"  {info['session_id']}  (on disk)")
+        else:
+            state = "attached" if info["attached"] else "detached"
+            busy = ", busy" if info["busy"] else ""
+            print(f"  {info['session_id']}  ({state}{busy}, {info['outputs']} outputs, idle {info['idle']}s)")
+    return 0
+
+
+def attach(session_id: Optional[str] = None, socket_path: Optional[str] = None) -> int:
+    """Attach the terminal to a daemon-hosted session"""
+    try:
+        conn = connect(socket_path)
+    except ConnectionError as e:
+        print(f"Error: {e}")
+        return 1
+
+    conn.send({"type": "attach", "session_id": session_id})
+    reply = conn.receive()
+    if not reply or reply.get("type") != "attached":
+        print("Error: NEXUS daemon refused the attach request")
+        return 1
+
+    state = "restored" if reply["restored"] else "attached"
+    print(f"🔗 {state} session {reply['session_id']} ({reply['outputs']} outputs)")
+    print("   exit/quit or Ctrl+D detaches; the session keeps running in the daemon")
+    for message in reply.get("backlog", []):
+        _write_output(message)
+    if reply.get("running") and not _wait_for_done(conn):
+        print("\nNEXUS daemon closed the connection")
+        return 1
+
+    try:
+        while True:
+            try:
+                line = input("🔮 ")
+            except KeyboardInterrupt:
+                print("\nUse Ctrl+D or type 'exit' to detach")
+                continue
+
+            if not line.strip():
+                continue
+            if line.strip() in ("exit", "quit", "exit()", "quit()", "detach"):
+                break
+
+            conn.send({"type": "command", "line": line})
+            if not _wait_for_done(conn):
+                print("\nNEXUS daemon closed the connection")
+                return 1
+    except EOFError:
+        print()
+    finally:
+        try:
+            conn.send({"type": "detach"})
+        except OSError:
+            pass
+        conn.close()
+
+    print(f"Detached from {reply['session_id']}")
+    return 0
+
+
+def stop_daemon(socket_path: Optional[str] = None) -> int:
+    """Ask a running daemon to write its sessions to disk and exit"""
+    try:
+        conn = connect(socket_path, autostart=False)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print("NEXUS daemon is not running")
+        return 1
+    conn.send({"type": "shutdown"})
+    conn.close()
+    print("NEXUS daemon stopping")
+    return 0
@@ -0,0 +1,315 @@
+# nexus_ai/server/daemon.py
+import asyncio
+import json
+import os
+import pickle
+import re
+import signal
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from nexus_ai.core.checkpoint import NamespaceCheckpointer
+from nexus_ai.core.output import route_task_output
+from nexus_ai.core.rusage import set_session_count
+from nexus_ai.core.session import Session
+from nexus_ai.repl.prompt_toolkit_repl import NexusPromptToolkitREPL
+
+
+STATE_DIR = Path.home() / ".nexus-ai"
+DEFAULT_SOCKET = STATE_DIR / "nexus.sock"
+
+# Output produced while no client is attached, replayed on reattach
+BACKLOG_LIMIT = 2000
+
+
+def encode_message(message: Dict) -> bytes:
+    """Encode a protocol message as one line of JSON"""
+    return (json.dumps(message) + "\n").encode("utf-8")
+
+
+class SessionHost:
+    """A daemon-hosted session with its own executor, namespace and router"""
+
+    def __init__(self, session: Session, restored: bool = False):
+        self.session = session
+        self.repl = NexusPromptToolkitREPL(session, headless=True)
+        self.restored = restored
+        self.client: Optional[asyncio.StreamWriter] = None
+        self.backlog: deque = deque(maxlen=BACKLOG_LIMIT)
+        self.current: Optional[asyncio.Task] = None
+        # JSON-RPC calls running on this session
+        self.requests = 0
+        self.last_active = time.monotonic()
+
+    @property
+    def busy(self) -> bool:
+        """Running anything: a command, a background job or watcher, an RPC call"""
+        return ((self.current is not None and not self.current.done())
+                or self.requests > 0
+                or bool(self.repl.jobs.running() or self.repl.watchers))
+
+    @contextmanager
+    def serving(self):
+        """Count an RPC call as activity while it runs"""
+        self.requests += 1
+        try:
+            yield self
+        finally:
+            self.requests -= 1
+            self.last_active = time.monotonic()
+
+    def emit(self, message: Dict):
+        """Send a message to the attached client, or keep it for reattach"""
+        if self.client is not None and not self.client.is_closing():
+            self.client.write(encode_message(message))
+        elif message.get("type") == "output":
+            self.backlog.append(message)
+
+    def info(self) -> Dict:
+        return {
+            "session_id": self.session.session_id,
+            "attached": self.client is not None,
+            "busy": self.busy,
+            "outputs": len(self.session.output_history),
+            "idle": round(time.monotonic() - self.last_active, 1),
+        }
+
+
+class SessionManager:
+    """Registry of live sessions, evicting idle ones to disk"""
+
+    def __init__(self, state_dir: Optional[Path] = None, idle_timeout: float = 1800):
+        self.state_dir = Path(state_dir or STATE_DIR) / "sessions"
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.idle_timeout = idle_timeout
+        self.hosts: Dict[str, SessionHost] = {}
+
+    def _state_file(self, session_id: str) -> Path:
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id)
+        return self.state_dir / f"{safe_id}.pkl"
+
+    def get(self, session_id: Optional[str] = None) -> SessionHost:
+        """Return the live host for session_id, restoring or creating it"""
+        if session_id and session_id in self.hosts:
+            host = self.hosts[session_id]
+            host.last_active = time.monotonic()
+            return host
+
+        session = None
+        if session_id:
+            session = self._restore(session_id)
+        else:
+            session_id = self._new_id()
+        host = SessionHost(session or Session(session_id), restored=session is not None)
+        self.hosts[session_id] = host
+        set_session_count(len(self.hosts))
+        if session is not None:
+            # Only once the session is live: until then the file is its only copy
+            self._state_file(session_id).unlink()
+        return host
+
+    def _new_id(self) -> str:
+        """An id no live or evicted session has"""
+        while True:
+            session_id = f"session_{uuid.uuid4().hex}"
+            if session_id not in self.hosts and not self._state_file(session_id).exists():
+                return session_id
+
+    def list(self) -> List[Dict]:
+        live = [host.info() for host in self.hosts.values()]
+        live_ids = set(self.hosts)
+        evicted = [
+            {"session_id": path.stem, "evicted": True}
+            for path in sorted(self.state_dir.glob("*.pkl"))
+            if path.stem not in live_ids
+        ]
+        return live + evicted
+
+    def _namespace_dir(self, session_id: str) -> Path:
+        return self._state_file(session_id).with_suffix(".namespace")
+
+    def evict(self, host: SessionHost):
+        """Write a session to disk and drop it from memory"""
+        session = host.session
+        # Incremental: values unchanged since the last eviction aren't rewritten
+        NamespaceCheckpointer(self._namespace_dir(session.session_id)).save(
+            session.python_locals, session.python_globals
+        )
+
+        path = self._state_file(session.session_id)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"session": session.to_dict()}, f)
+        os.replace(tmp_path, path)
+        self.hosts.pop(session.session_id, None)
+        set_session_count(len(self.hosts))
+
+    def _restore(self, session_id: str) -> Optional[Session]:
+        path = self._state_file(session_id)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as e:
+            print(f"Warning: Could not restore session {session_id}: {e}")
+            return None
+        session = Session.from_dict(state["session"])
+        try:
+            # The namespace stays on disk: values load on first access
+            namespace, globals_ns, _ = NamespaceCheckpointer(self._namespace_dir(session_id)).restore()
+            session.python_locals = namespace
+            session.python_globals.update(globals_ns)
+        except FileNotFoundError:
+            pass
+        # State files from before namespace checkpoints carry it inline
+        session.python_locals.update(state.get("namespace", {}))
+        return session
+
+    def evict_idle(self):
+        now = time.monotonic()
+        for host in list(self.hosts.values()):
+            if host.client is None and not host.busy and now - host.last_active > self.idle_timeout:
+                self.evict(host)
+
+    def evict_all(self):
+        for host in list(self.hosts.values()):
+            if host.current is not None:
+                host.current.cancel()
+            self.evict(host)
+
+
+class NexusDaemon:
+    """Resident NEXUS process serving thin clients over a Unix socket"""
+
+    def __init__(self, socket_path: Optional[str] = None, idle_timeout: float = 1800,
+                 state_dir: Optional[Path] = None, rpc_socket: Optional[str] = None,
+                 rpc_port: Optional[int] = None):
+        self.socket_path = Path(socket_path or DEFAULT_SOCKET)
+        self.sessions = SessionManager(state_dir, idle_timeout)
+        self.rpc_socket = rpc_socket
+        self.rpc_port = rpc_port
+        self._stopping: Optional[asyncio.Event] = None
+
+    async def serve(self):
+        """Serve clients until stopped by SIGTERM/SIGINT or a shutdown message"""
+        self._stopping = asyncio.Event()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+        server = await asyncio.start_unix_server(self._handle_client, path=str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+
+        # Imported here: rpc builds on the session registry defined above
+        from nexus_ai.server.rpc import JSONRPCServer
+        rpc_servers = await JSONRPCServer(self.sessions).start(self.rpc_socket, self.rpc_port)
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self._stopping.set)
+
+        evictor = asyncio.create_task(self._evict_loop())
+        print(f"NEXUS daemon listening on {self.socket_path}")
+        try:
+            async with server:
+                await self._stopping.wait()
+        finally:
+            for rpc_server in rpc_servers:
+                rpc_server.close()
+            evictor.cancel()
+            self.sessions.evict_all()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+            print("NEXUS daemon stopped")
+
+    async def _evict_loop(self):
+        while True:
+            await asyncio.sleep(min(60, self.sessions.idle_timeout))
+            self.sessions.evict_idle()
+
+    async def _run_command(self, host: SessionHost, line: str):
+        """Run one command through the session's router, streaming its output"""
+        def sink(stream: str, data: str):
+            host.emit({"type": "output", "stream": stream, "data": data})
+
+        try:
+            with route_task_output(sink):
+                await host.repl.parse_command(line)
+        except asyncio.CancelledError:
+            sink("stderr", "\n✗ Command interrupted by user\n")
+        except EOFError:
+            pass
+        except Exception as e:
+            sink("stderr", f"Error: {str(e)}\n")
+        finally:
+            host.last_active = time.monotonic()
+            host.emit({"type": "done"})
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        host: Optional[SessionHost] = None
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                try:
+                    message = json.loads(raw)
+                except json.JSONDecodeError:
+                    writer.write(encode_message({"type": "error", "message": "Invalid JSON"}))
+                    continue
+                kind = message.get("type")
+
+                if kind == "attach":
+                    if host is not None and host.client is writer:
+                        host.client = None
+                    host = self.sessions.get(message.get("session_id"))
+                    if host.client is not None and host.client is not writer:
+                        # A newer client wins; the old one is usually a dead SSH session
+                        host.client.close()
+                    host.client = writer
+                    backlog = list(host.backlog)
+                    host.backlog.clear()
+                    writer.write(encode_message({
+                        "type": "attached",
+                        "session_id": host.session.session_id,
+                        "restored": host.restored,
+                        "outputs": len(host.session.output_history),
+                        "running": host.busy,
+                        "backlog": backlog,
+                    }))
+                elif kind == "command":
+                    if host is None:
+                        writer.write(encode_message({"type": "error", "message": "Not attached"}))
+                    elif host.busy:
+                        writer.write(encode_message({"type": "error", "message": "A command is already running"}))
+                    else:
+                        host.last_active = time.monotonic()
+                        host.current = asyncio.create_task(
+                            self._run_command(host, message.get("line", ""))
+                        )
+                elif kind == "interrupt":
+                    if host is not None and host.busy:
+                        host.current.cancel()
+                elif kind == "list":
+                    writer.write(encode_message({"type": "sessions", "sessions": self.sessions.list()}))
+                elif kind == "detach":
+                    break
+                elif kind == "shutdown":
+                    self._stopping.set()
+                    break
+                else:
+                    writer.write(encode_message({"type": "error", "message": f"Unknown message: {kind}"}))
+
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if host is not None and host.client is writer:
+                host.client = None
+                host.last_active = time.monotonic()
+            writer.close()
@@ -0,0 +1,217 @@
+# nexus_ai/server/rpc.py
+import asyncio
+import inspect
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from nexus_ai.core.output import current_output_sink, route_task_output
+from nexus_ai.server.daemon import STATE_DIR, SessionHost, SessionManager
+
+
+DEFAULT_RPC_SOCKET = STATE_DIR / "rpc.sock"
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+# Session used by calls that don't name one, so they share a namespace
+DEFAULT_SESSION = "default"
+
+
+class RPCError(Exception):
+    """Error returned to the caller as a JSON-RPC error object"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class JSONRPCServer:
+    """Line-delimited JSON-RPC 2.0 API over the NEXUS command router
+
+    Every request runs as its own task, so one connection can keep many
+    operations in flight per session. Output printed while a request runs
+    is streamed back as ``output`` notifications tagged with the request id.
+    """
+
+    def __init__(self, sessions: SessionManager):
+        self.sessions = sessions
+        self.methods: Dict[str, Callable] = {
+            "session.open": self.session_open,
+            "session.list": self.session_list,
+            "nexus.execute": self.nexus_execute,
+            "python.execute": self.python_execute,
+            "bash.execute": self.bash_execute,
+            "model.ask": self.model_ask,
+            "history.query": self.history_query,
+        }
+
+    async def start(self, socket_path: Optional[str] = None,
+                    port: Optional[int] = None) -> List[asyncio.AbstractServer]:
+        """Listen on a Unix socket and, optionally, on localhost TCP"""
+        servers = []
+        path = Path(socket_path or DEFAULT_RPC_SOCKET)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            path.unlink()
+        servers.append(await asyncio.start_unix_server(self._handle_connection, path=str(path)))
+        os.chmod(path, 0o600)
+
+        if port is not None:
+            servers.append(await asyncio.start_server(self._handle_connection, "127.0.0.1", port))
+        return servers
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        def send(message: Dict):
+            if not writer.is_closing():
+                writer.write((json.dumps(message, default=str) + "\n").encode("utf-8"))
+
+        pending = set()
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                try:
+                    request = json.loads(raw)
+                except json.JSONDecodeError:
+                    send(self._error(None, PARSE_ERROR, "Parse error"))
+                    continue
+
+                task = asyncio.create_task(self._dispatch(request, send))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            writer.close()
+
+    @staticmethod
+    def _error(request_id: Any, code: int, message: str) -> Dict:
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+    async def _dispatch(self, request: Any, send: Callable[[Dict], None]):
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            send(self._error(None, INVALID_REQUEST, "Invalid request"))
+            return
+
+        request_id = request.get("id")
+        params = request.get("params") or {}
+        method = self.methods.get(request["method"])
+        try:
+            if method is None:
+                raise RPCError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+            if not isinstance(params, dict):
+                raise RPCError(INVALID_PARAMS, "params must be an object")
+            try:
+                inspect.signature(method).bind(**params)
+            except TypeError as e:
+                raise RPCError(INVALID_PARAMS, str(e))
+
+            def notify(stream: str, data: str):
+                send({
+                    "jsonrpc": "2.0",
+                    "method": "output",
+                    "params": {"request_id": request_id, "stream": stream, "data": data},
+                })
+
+            with route_task_output(notify):
+                result = await method(**params)
+        except RPCError as e:
+            response = self._error(request_id, e.code, e.message)
+        except Exception as e:
+            response = self._error(request_id, SERVER_ERROR, str(e))
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+        # Requests without an id are notifications and get no response
+        if request_id is not None:
+            send(response)
+
+    def _host(self, session_id: Optional[str]) -> SessionHost:
+        return self.sessions.get(session_id or DEFAULT_SESSION)
+
+    async def session_open(self, session_id: Optional[str] = None) -> Dict:
+        """Open (or restore) a session; without an id, a new one with a fresh id"""
+        host = self.sessions.get(session_id)
+        return {"session_id": host.session.session_id, "restored": host.restored}
+
+    async def session_list(self) -> List[Dict]:
+        return self.sessions.list()
+
+    async def nexus_execute(self, line: str, session_id: Optional[str] = None) -> Dict:
+        """Route a line exactly as if it was typed at the prompt"""
+        host = self._host(session_id)
+        collected = {"stdout": [], "stderr": []}
+        notify = current_output_sink()
+
+        def tee(stream: str, data: str):
+            collected[stream].append(data)
+            if notify is not None:
+                notify(stream, data)
+
+        with host.serving(), route_task_output(tee):
+            try:
+                await host.repl.parse_command(line)
+            except EOFError:
+                pass
+        return {"stdout": "".join(collected["stdout"]), "stderr": "".join(collected["stderr"])}
+
+    async def python_execute(self, code: str, session_id: Optional[str] = None) -> Dict:
+        host = self._host(session_id)
+        with host.serving():
+            stdout, stderr = await host.repl.run_python(code)
+        return {"stdout": stdout, "stderr": stderr}
+
+    async def bash_execute(self, command: str, session_id: Optional[str] = None,
+                           mode: str = "captured") -> Dict:
+        if mode not in ("captured", "background"):
+            raise RPCError(INVALID_PARAMS, "mode must be 'captured' or 'background'")
+        host = self._host(session_id)
+        with host.serving():
+            stdout, stderr = await host.repl.run_bash(command, mode=mode)
+        return {"stdout": stdout, "stderr": stderr}
+
+    async def model_ask(self, query: str, session_id: Optional[str] = None,
+                        model: Optional[str] = None, mode: Optional[str] = None) -> Dict:
+        host = self._host(session_id)
+        with host.serving():
+            name, response = await host.repl.ask_model(query, model, mode)
+        return {"model": name, "response": response}
+
+    async def history_query(self, session_id: Optional[str] = None, type: Optional[str] = None,
+                            contains: Optional[str] = None, limit: int = 20,
+                            after: Optional[int] = None) -> List[Dict]:
+        """Return the most recent output entries, newest last
+
+        Entries carry a seq that stays the same as older entries are
+        trimmed; pass the last one seen as `after` to get only newer ones.
+        """
+        host = self._host(session_id)
+        matches = []
+        for entry in reversed(host.session.output_history):
+            if after is not None and entry.seq <= after:
+                break
+            if type is not None and entry["type"] != type:
+                continue
+            if contains is not None and contains not in entry["content"]:
+                continue
+            matches.append({
+                "seq": entry.seq,
+                "timestamp": entry["timestamp"].isoformat(),
+                "type": entry["type"],
+                "content": str(entry["content"]),
+            })
+            if len(matches) >= limit:
+                break
+        matches.reverse()
+        return matches
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for top-level await in Python cells and per-task output capture
+"""
+
+import asyncio
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.executor import CodeExecutor
+from nexus_ai.core.session import Session
+
+
+def test_top_level_await():
+    """Cells can await, and functions they define see the cell namespace"""
+    async def run():
+        executor = CodeExecutor(Session())
+        await executor.execute_python_async("import asyncio")
+        await executor.execute_python_async(
+            "async def double(i):\n    await asyncio.sleep(0.05)\n    return i * 2")
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        stdout, stderr = await executor.execute_python_async(
+            "results = await asyncio.gather(*(double(i) for i in range(200)))\nprint(sum(results))")
+        assert (stdout, stderr) == ("39800\n", "")
+        # Concurrent, not one after another
+        assert loop.time() - started < 1.0
+
+        assert (await executor.execute_python_async("await asyncio.sleep(0, 'ok')"))[0] == "ok\n"
+        _, stderr = await executor.execute_python_async("await missing()")
+        assert "name 'missing' is not defined" in stderr
+        assert executor.cells.get(5).failed
+    asyncio.run(run())
+
+    # The synchronous path still rejects await rather than leaking a coroutine
+    _, stderr = CodeExecutor(Session()).execute_python("await something()")
+    assert "outside function" in stderr
+    print("✓ Cells support top-level await")
+
+
+def test_output_is_captured_per_task():
+    """Cells running at the same time keep their own output"""
+    async def run():
+        executor = CodeExecutor(Session())
+        await executor.execute_python_async("import asyncio")
+        code = "for _ in range(3):\n    print({tag!r})\n    await asyncio.sleep(0.01)"
+        first, second = await asyncio.gather(
+            executor.execute_python_async(code.format(tag="a")),
+            executor.execute_python_async(code.format(tag="b")),
+        )
+        assert first == ("a\na\na\n", "") and second == ("b\nb\nb\n", "")
+
+        # Cancelling a cell (Ctrl+C) marks it failed
+        task = asyncio.ensure_future(executor.execute_python_async("await asyncio.sleep(10)"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        assert executor.cells.latest().failed
+    asyncio.run(run())
+    print("✓ Output is captured per task")
+
+
+if __name__ == "__main__":
+    test_top_level_await()
+    test_output_is_captured_per_task()
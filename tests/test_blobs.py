@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for output history storage: records and content-addressed blobs
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.blobs import BlobRef, BlobStore
+from nexus_ai.core.output import OutputRecord
+from nexus_ai.core.session import Session
+from nexus_ai.core.spill import SpillStore
+
+
+def test_identical_outputs_share_one_compressed_blob():
+    """Re-running a command stores its output once, compressed"""
+    session = Session()
+    manager = session.output_manager
+    diff = "".join(f"+ changed line {i}\n" for i in range(300))
+    for _ in range(50):
+        manager.store_output("bash_stdout", diff)
+    manager.store_output("bash_stdout", "short")
+
+    contents = [entry["content"] for entry in session.output_history]
+    assert all(content is contents[0] for content in contents[:50])
+    assert isinstance(contents[0], BlobRef) and contents[0].compressed
+    assert contents[-1] == "short" and isinstance(contents[-1], str)
+
+    stats = manager.blobs.stats()
+    assert stats["blobs"] == 1 and stats["references"] == 50
+    assert stats["stored_bytes"] < len(diff) // 5
+
+    # Reads inflate lazily and behave like the original string
+    assert contents[0] == diff and str(contents[0]) == diff
+    assert "changed line 299" in contents[0]
+    assert manager.get_recent_context(limit=1).endswith("bash_stdout: short")
+
+    # Outputs big enough to spill are deduplicated too: same file, same preview
+    log = "".join(f"build step {i}\n" for i in range(5000))
+    with tempfile.TemporaryDirectory() as tmp:
+        manager.spills = SpillStore(tmp)
+        first = manager.store_output("bash_stdout", log)
+        assert manager.store_output("bash_stdout", log) == first
+        assert session.output_history[-1]["content"] is session.output_history[-2]["content"]
+        assert len(os.listdir(tmp)) == 1
+    print("✓ Outputs deduplicated and compressed")
+
+
+def test_trimmed_entries_release_blobs_and_pickle_as_text():
+    """Blobs are freed with their last entry; pickles carry plain text"""
+    session = Session()
+    manager = session.output_manager
+    manager.max_history = 3
+    for i in range(10):
+        manager.store_output("bash_stdout", f"run {i}\n" * 100)
+    assert manager.blobs.stats()["blobs"] == 3
+
+    restored = Session.from_dict(pickle.loads(pickle.dumps(session.to_dict())))
+    entry = restored.output_history[-1]
+    assert isinstance(entry["content"], BlobRef)
+    assert entry["content"] == "run 9\n" * 100
+
+    store = BlobStore()
+    blob = store.put("x" * 1000)
+    store.put("x" * 1000)
+    store.release(blob)
+    assert store.stats()["blobs"] == 1
+    store.release(blob)
+    assert store.stats()["blobs"] == 0
+    print("✓ Blob references released")
+
+
+def test_history_records_read_like_dicts():
+    """Compact records keep the dict-style access older code relies on"""
+    session = Session()
+    session.add_output("bash_stdout", "hello")
+    session.output_manager.store_output("profile", "timing", data={"wall": 1.0})
+    plain, profiled = session.output_history
+
+    assert isinstance(plain, OutputRecord)
+    assert plain["type"] == "bash_stdout" and plain["content"] == "hello"
+    assert "data" not in plain and plain.get("data") is None
+    assert profiled["data"] == {"wall": 1.0}
+    assert plain["timestamp"].year >= 2024
+    assert plain.to_dict()["content"] == "hello"
+    assert session.output_manager.get_recent_context(1) == f"[{profiled['timestamp']}] profile: timing"
+
+    # Sessions saved with dict entries still load
+    legacy = session.to_dict()
+    legacy["output_history"] = [record.to_dict() for record in session.output_history]
+    restored = Session.from_dict(pickle.loads(pickle.dumps(legacy)))
+    assert [r.type for r in restored.output_history] == ["bash_stdout", "profile"]
+    print("✓ History records compatible")
+
+
+if __name__ == "__main__":
+    test_identical_outputs_share_one_compressed_blob()
+    test_trimmed_entries_release_blobs_and_pickle_as_text()
+    test_history_records_read_like_dicts()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for capturing command output into Python variables
+"""
+
+import asyncio
+import os
+import pickle
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.capture import CapturedOutput, capture
+from nexus_ai.repl.prompt_toolkit_repl import CAPTURE_RE
+
+
+def test_small_capture_is_a_bytearray():
+    """Small outputs come back as bytes in memory, decoded only on request"""
+    captured = asyncio.run(capture("printf 'a\\nb\\r\\nc'; echo oops >&2; exit 3"))
+    assert isinstance(captured.data, bytearray) and not captured.mapped
+    assert bytes(captured) == b"a\nb\r\nc"
+    assert list(captured) == ["a", "b\r", "c"]
+    assert captured.text() == "a\nb\r\nc"
+    assert captured.returncode == 3 and captured.stderr == "oops\n"
+    assert captured.view()[:1] == b"a"
+
+    restored = pickle.loads(pickle.dumps(captured, protocol=5))
+    assert isinstance(restored, CapturedOutput) and bytes(restored) == bytes(captured)
+    print("✓ Small capture works")
+
+
+def test_large_capture_spills_to_a_mapping():
+    """Past the spill threshold the output is a memory-mapped, already unlinked file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        captured = asyncio.run(capture("seq 1 200000", spill_bytes=64 * 1024, spill_dir=tmp))
+        assert captured.mapped and captured.spilled
+        assert sum(1 for _ in captured.byte_lines()) == 200000
+        assert captured[:4] == b"1\n2\n"
+        assert os.listdir(tmp) == []
+    print("✓ Large capture spills")
+
+
+def test_capture_syntax():
+    """Only a trailing |> name is a capture"""
+    assert CAPTURE_RE.match("!zcat big.gz |> log").groups() == ("zcat big.gz", "log", None)
+    assert CAPTURE_RE.match("!c ps aux|>procs:table").groups() == ("ps aux", "procs", ":table")
+    assert CAPTURE_RE.match("!echo 'a |> b' x") is None
+    assert CAPTURE_RE.match("> x |> y") is None
+    print("✓ Capture syntax parsed")
+
+
+if __name__ == "__main__":
+    test_small_capture_is_a_bytearray()
+    test_large_capture_spills_to_a_mapping()
+    test_capture_syntax()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for Python cell dependency tracking and incremental re-runs
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.cells import CellGraph, analyze
+from nexus_ai.core.executor import CodeExecutor
+from nexus_ai.core.session import Session
+
+
+def test_analyze_reads_and_writes():
+    """Reads are names used before being written; locals of nested scopes don't count"""
+    assert analyze("y = x + 1") == ({"x"}, {"y"})
+    assert analyze("x = 1\ny = x") == (frozenset(), {"x", "y"})
+    assert analyze("total += step") == ({"total", "step"}, {"total"})
+    assert analyze("df.col = 1\nd[k] = v") == ({"df", "d", "k", "v"}, {"df", "d"})
+    assert analyze("def f(a):\n    b = a * scale\n    return b") == ({"scale"}, {"f"})
+    assert analyze("squares = [i * i for i in items if i > limit]") == ({"items", "limit"}, {"squares"})
+    assert analyze("import numpy as np, os.path") == (frozenset(), {"np", "os"})
+    assert analyze("def broken(:") == (frozenset(), frozenset())
+    print("✓ Cell reads and writes are found")
+
+
+def test_rerun_skips_unchanged_cells():
+    """Changing an input makes only its dependents stale, in run order"""
+    executor = CodeExecutor(Session())
+    for code in ("n = 5", "data = list(range(n))", "total = sum(data)", "label = 'x'", "counter = 0"):
+        executor.execute_python(code)
+    executor.execute_python("counter += 1")
+    graph = executor.cells
+
+    assert graph.upstream(3) == {"data": 2}
+    assert graph.downstream(1) == [2, 3]
+    assert graph.cells[2].reads == {"n"}  # list and range are builtins, not inputs
+
+    namespace = executor.session.python_locals
+    # Nothing changed; a cell updating its own input isn't stale either
+    assert all(not changed for _, changed in graph.plan(namespace))
+
+    executor.execute_python("n = 10")
+    rerun = []
+    for cell, changed in graph.plan(namespace):
+        if changed:
+            rerun.append((cell.number, changed))
+            executor.execute_python(cell.code, cell)
+    assert rerun == [(2, ["n"]), (3, ["data"])]
+    assert namespace["total"] == 45 and graph.cells[3].runs == 2
+    print("✓ Re-runs skip cells with unchanged inputs")
+
+
+def test_superseded_cells_are_dropped():
+    """Overwritten cells nobody read from go; the graph stays bounded"""
+    graph = CellGraph(max_cells=5)
+    namespace = {}
+    for code in ("x = 1", "x = 2", "y = x", "x = 3", "z = y"):
+        graph.finish(graph.begin(code, namespace), namespace)
+    # [1] was overwritten unread; [2] fed [3], so it stays though overwritten
+    assert sorted(graph.cells) == [2, 3, 4, 5]
+    assert graph.downstream(2) == [3, 5] and graph.upstream(5) == {"y": 3}
+
+    for i in range(10):
+        graph.finish(graph.begin(f"print({i})", namespace), namespace)
+    assert len(graph) == 5 and graph.latest().number == 15
+    assert graph.get(2) is None and graph.downstream(3) == []
+    print("✓ Superseded and old cells are dropped")
+
+
+def test_failed_cells_write_nothing():
+    """A cell that raised doesn't replace the cell whose value is live"""
+    executor = CodeExecutor(Session())
+    executor.execute_python("x = 1")
+    executor.execute_python("x = 1 / 0")
+    executor.execute_python("y = x")
+    graph = executor.cells
+    assert sorted(graph.cells) == [1, 2, 3] and graph.cells[2].failed
+    assert graph.upstream(3) == {"x": 1} and graph.downstream(1) == [3]
+
+    # Until it runs cleanly; a later cell that finished first keeps its names
+    first, second = graph.begin("x = 2", {}), graph.begin("x = 3", {})
+    graph.finish(second, {})
+    graph.finish(first, {})
+    assert graph.last_writer["x"] == second.number and first.number not in graph.cells
+    print("✓ Failed cells don't become writers")
+
+
+if __name__ == "__main__":
+    test_analyze_reads_and_writes()
+    test_rerun_skips_unchanged_cells()
+    test_superseded_cells_are_dropped()
+    test_failed_cells_write_nothing()
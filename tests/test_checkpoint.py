@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental namespace checkpoints and lazy restore
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core import checkpoint as checkpoint_module
+from nexus_ai.core.checkpoint import LazyNamespace, NamespaceCheckpointer
+from nexus_ai.core.executor import CodeExecutor
+from nexus_ai.core.session import Session
+
+
+def test_checkpoint_is_incremental():
+    """Unchanged names are not rewritten and unpicklable ones are reported"""
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpointer = NamespaceCheckpointer(tmp)
+        data = bytearray(os.urandom(256 * 1024))
+        namespace = {"array": pickle.PickleBuffer(data), "rows": [1, 2, 3],
+                     "os": os, "lock": threading.Lock()}
+
+        report = checkpointer.save(namespace, {"__builtins__": {}, "setting": 1})
+        assert report["written"] == 3 and report["modules"] == 1
+        assert list(report["unpicklable"]) == ["lock"]
+        # The array's buffer is written raw, beside its pickle stream
+        assert any(name.endswith(".0.buf") for name in os.listdir(checkpointer.objects))
+
+        namespace["rows"].append(4)
+        report = checkpointer.save(namespace)
+        assert report["written"] == 1 and report["unchanged"] == 1
+
+        del namespace["array"]
+        checkpointer.save(namespace)
+        assert not any(name.endswith(".buf") for name in os.listdir(checkpointer.objects))
+    print("✓ Checkpoints are incremental")
+
+
+def test_restore_is_lazy():
+    """Restored values load on first access, including name lookups from exec"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = bytearray(os.urandom(256 * 1024))
+        NamespaceCheckpointer(tmp).save({"array": pickle.PickleBuffer(data), "n": 41, "os": os},
+                                        {"setting": 1})
+
+        checkpointer = NamespaceCheckpointer(tmp)
+        namespace, globals_ns, failed = checkpointer.restore()
+        assert isinstance(namespace, LazyNamespace) and globals_ns == {"setting": 1} and not failed
+        assert sorted(namespace) == ["array", "n", "os"] and "n" in namespace
+        assert not dict.__contains__(namespace, "n")
+
+        exec("m = n + 1", {}, namespace)
+        assert namespace["m"] == 42 and dict.__contains__(namespace, "n")
+        assert bytes(namespace["array"]) == bytes(data)
+        assert namespace["os"] is os
+        assert sorted(namespace.pending()) == []
+
+        # Names still pending are carried over without being loaded
+        namespace, _, _ = checkpointer.restore()
+        namespace["n"] = 7
+        report = checkpointer.save(namespace)
+        assert report["written"] == 1 and report["unchanged"] == 2
+
+        # Restoring another checkpoint keeps names it lacks, pending ones unloaded
+        with tempfile.TemporaryDirectory() as other:
+            NamespaceCheckpointer(other).save({"n": 1})
+            replacement, _, _ = NamespaceCheckpointer(other).restore()
+            namespace, _, _ = checkpointer.restore()
+            namespace["extra"] = "kept"
+            replacement.keep_missing(namespace)
+            assert sorted(replacement) == ["array", "extra", "n", "os"]
+            assert sorted(replacement.pending()) == ["array", "n", "os"]
+            assert replacement["n"] == 1 and bytes(replacement["array"]) == bytes(data)
+    print("✓ Restore is lazy")
+
+
+def test_only_touched_values_are_repickled():
+    """With the session's cells, values no cell touched since the last save aren't pickled"""
+    executor = CodeExecutor(Session())
+    executor.execute_python("big = {i: str(i) for i in range(1000)}\nrows = [1]\nalias = rows\n"
+                            "def add():\n    rows.append(2)")
+    namespace = executor.namespace()
+    pickled = []
+    dumps = checkpoint_module.pickle.dumps
+
+    def counting_dumps(value, *args, **kwargs):
+        pickled.append(value)
+        return dumps(value, *args, **kwargs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpointer = NamespaceCheckpointer(tmp)
+        checkpointer.save(namespace, cells=executor.cells)
+        checkpoint_module.pickle.dumps = counting_dumps
+        try:
+            executor.execute_python("add()")
+            report = checkpointer.save(namespace, cells=executor.cells)
+        finally:
+            checkpoint_module.pickle.dumps = dumps
+        # add() changed rows (and alias) without a cell naming them
+        assert any(value is namespace["rows"] for value in pickled)
+        assert not any(value is namespace["big"] for value in pickled)
+        assert sum(value is namespace["rows"] for value in pickled) == 2  # As rows and as alias
+        assert report["written"] == 1  # One object, stored once by digest
+        assert NamespaceCheckpointer(tmp).restore()[0]["alias"] == [1, 2]
+    print("✓ Checkpoints re-pickle only what cells touched")
+
+
+if __name__ == "__main__":
+    test_checkpoint_is_incremental()
+    test_restore_is_lazy()
+    test_only_touched_values_are_repickled()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for completion: the $PATH index, live namespaces and the time budget
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import ChainMap
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_toolkit.completion import CompleteEvent, Completer, Completion
+from prompt_toolkit.document import Document
+
+from nexus_ai.core.checkpoint import LazyNamespace
+from nexus_ai.core.session import Session
+from nexus_ai.repl.completion import BudgetedCompleter, ExecutableIndex, namespace_completions
+from nexus_ai.repl.prompt_toolkit_repl import NexusCompleter
+
+
+def _texts(completions):
+    return [completion.text for completion in completions]
+
+
+def test_namespace_completions():
+    """Names and attribute chains come from the live namespace"""
+    class Frame:
+        columns = ["a"]
+        _private = 1
+
+        @property
+        def shape(self):
+            raise RuntimeError("not loaded")
+
+    namespace = {"frame": Frame(), "frames": [], "count": 3}
+    assert _texts(namespace_completions("fr", namespace)) == ["frame", "frames", "from", "frozenset"]
+    assert "while" in _texts(namespace_completions("wh", namespace))
+    assert _texts(namespace_completions("x = frame.co", namespace)) == ["columns"]
+    assert _texts(namespace_completions("frame._p", namespace)) == ["_private"]
+    assert "_private" not in _texts(namespace_completions("frame.", namespace))
+    assert "append" in _texts(namespace_completions("frame.columns.ap", namespace))
+    assert "bit_length" in _texts(namespace_completions("count.b", namespace))
+    assert "join" in _texts(namespace_completions("str.jo", namespace))  # Builtins resolve too
+    # An unknown root or a failing attribute gives nothing rather than raising
+    assert _texts(namespace_completions("missing.x", namespace)) == []
+    assert _texts(namespace_completions("frame.shape.x", namespace)) == []
+
+    session = Session()
+    session.python_locals["answer"] = 42
+    completer = NexusCompleter(session)
+    document = Document("> answer.real.con")
+    completions = list(completer.get_completions(document, CompleteEvent()))
+    assert _texts(completions) == ["conjugate"] and completions[0].start_position == -3
+    print("✓ Python names and attributes complete from the live namespace")
+
+
+def test_namespace_completions_run_no_code():
+    """Completing never loads lazy values or runs properties and __getattr__"""
+    calls = []
+
+    class Model:
+        __slots__ = ("weights",)
+
+        def __init__(self):
+            self.weights = [1.0]
+
+        @property
+        def summary(self):
+            calls.append("property")
+            return ""
+
+        def __getattr__(self, name):
+            calls.append("__getattr__")
+            return ""
+
+    def load():
+        calls.append("load")
+        return Model()
+
+    namespace = LazyNamespace({"model": Model()})
+    namespace.add_lazy("restored", load, Path("."), {})
+    chain = ChainMap({}, namespace)
+    assert _texts(namespace_completions("rest", chain)) == ["restored"]
+    assert _texts(namespace_completions("restored.w", chain)) == []
+    assert _texts(namespace_completions("model.summary.st", chain)) == []
+    assert _texts(namespace_completions("model.missing.st", chain)) == []
+    assert "append" in _texts(namespace_completions("model.weights.ap", chain))
+    assert not calls and namespace.pending().keys() == {"restored"}
+    print("✓ Completion doesn't load values or run attribute code")
+
+
+class _SlowCompleter(Completer):
+    def __init__(self, delay):
+        self.delay = delay
+
+    def get_completions(self, document, complete_event):
+        for i in range(100):
+            time.sleep(self.delay)
+            yield Completion(str(i))
+
+
+def test_budget_cuts_off_slow_completers():
+    """A slow completer is cut off once the budget is spent; a fast one isn't"""
+    document, event = Document(""), CompleteEvent()
+    started = time.monotonic()
+    slow = list(BudgetedCompleter(_SlowCompleter(0.01), budget=0.05).get_completions(document, event))
+    assert 1 <= len(slow) < 20 and time.monotonic() - started < 0.5, len(slow)
+    fast = list(BudgetedCompleter(_SlowCompleter(0), budget=0.05).get_completions(document, event))
+    assert len(fast) == 100
+    print("✓ Completion stops at its time budget")
+
+
+def test_executable_index():
+    """Executables on $PATH are cached, and a changed directory is rescanned"""
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_dir = Path(tmp) / "bin"
+        bin_dir.mkdir()
+        for name in ("nexus-one", "nexus-two", "not-executable"):
+            (bin_dir / name).write_text("#!/bin/sh\n")
+        (bin_dir / "nexus-one").chmod(0o755)
+        (bin_dir / "nexus-two").chmod(0o755)
+        cache_file = Path(tmp) / "path_index.json"
+
+        old_path = os.environ["PATH"]
+        os.environ["PATH"] = f"{bin_dir}{os.pathsep}{Path(tmp) / 'missing'}"
+        try:
+            index = ExecutableIndex(cache_file)
+            index.refresh()
+            assert index.complete("nexus-") == ["nexus-one", "nexus-two"]
+            assert index.complete("not") == [] and index.complete("nexus-", limit=1) == ["nexus-one"]
+            assert list(json.loads(cache_file.read_text())["dirs"]) == [str(bin_dir)]
+
+            # A new instance reads the cache instead of scanning
+            cached = ExecutableIndex(cache_file)
+            cached._scan = lambda directory: ["scanned"]
+            cached.refresh()
+            assert cached.complete("nexus-") == ["nexus-one", "nexus-two"]
+
+            (bin_dir / "nexus-three").write_text("#!/bin/sh\n")
+            (bin_dir / "nexus-three").chmod(0o755)
+            mtime = os.stat(bin_dir).st_mtime + 1
+            os.utime(bin_dir, (mtime, mtime))
+            index.refresh()
+            assert index.complete("nexus-t") == ["nexus-three", "nexus-two"]
+
+            completer = NexusCompleter(executables=index)
+            assert _texts(completer.get_completions(Document("!nexus-o"), CompleteEvent())) == ["nexus-one"]
+        finally:
+            os.environ["PATH"] = old_path
+    print("✓ The $PATH index is cached and refreshed by mtime")
+
+
+if __name__ == "__main__":
+    test_namespace_completions()
+    test_namespace_completions_run_no_code()
+    test_budget_cuts_off_slow_completers()
+    test_executable_index()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the resident daemon: session registry, attach and reattach
+Drives the client protocol in-process over a temporary Unix socket
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.server import daemon
+from nexus_ai.server.daemon import NexusDaemon, SessionManager
+
+
+def test_new_session_ids():
+    """Sessions opened without an id never replace a live one"""
+    with tempfile.TemporaryDirectory() as state_dir:
+        sessions = SessionManager(state_dir)
+        first, second = sessions.get(None), sessions.get(None)
+        assert first is not second
+        assert first.session.session_id != second.session.session_id
+        assert len(sessions.hosts) == 2
+        assert sessions.get(first.session.session_id) is first
+    print("✓ New sessions get unique ids")
+
+
+def test_busy_sessions_stay_live():
+    """Jobs and RPC calls keep a detached session from being evicted"""
+    async def main(state_dir):
+        sessions = SessionManager(state_dir, idle_timeout=0)
+        host = sessions.get("jobs")
+        host.repl.start_background("sleep 30")
+        with host.serving():
+            sessions.evict_idle()
+            assert host.busy and "jobs" in sessions.hosts
+        sessions.evict_idle()
+        assert "jobs" in sessions.hosts  # The job still runs
+
+        host.repl.jobs.cancel_all()
+        await asyncio.gather(*(job.task for job in host.repl.jobs.running()), return_exceptions=True)
+        await asyncio.sleep(0)
+        host.last_active = 0
+        sessions.evict_idle()
+        assert not host.busy and "jobs" not in sessions.hosts
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        asyncio.run(main(state_dir))
+    print("✓ Busy sessions aren't evicted")
+
+
+def test_failed_restore_keeps_state():
+    """The saved state is deleted only once the restored session is live"""
+    with tempfile.TemporaryDirectory() as state_dir:
+        sessions = SessionManager(state_dir)
+        sessions.get("kept").session.python_locals["x"] = 42
+        sessions.evict(sessions.hosts["kept"])
+        state_file = sessions._state_file("kept")
+
+        host_class = daemon.SessionHost
+        def broken(*args, **kwargs):
+            raise RuntimeError("no router")
+        daemon.SessionHost = broken
+        try:
+            sessions.get("kept")
+        except RuntimeError:
+            pass
+        finally:
+            daemon.SessionHost = host_class
+        assert state_file.exists() and "kept" not in sessions.hosts
+
+        host = sessions.get("kept")
+        assert host.restored and host.session.python_locals["x"] == 42
+        assert not state_file.exists()
+    print("✓ A failed restore leaves the saved session")
+
+
+async def _send(writer, message):
+    writer.write((json.dumps(message) + "\n").encode())
+    await writer.drain()
+
+
+async def _receive(reader, kind):
+    """Read messages until one of the given type; returns it and the output before it"""
+    output = []
+    while True:
+        message = json.loads(await asyncio.wait_for(reader.readline(), 10))
+        if message["type"] == kind:
+            return message, "".join(output)
+        if message["type"] == "output":
+            output.append(message["data"])
+
+
+async def _attach_session(state_dir):
+    daemon = NexusDaemon(state_dir=state_dir)
+    socket_path = os.path.join(state_dir, "nexus.sock")
+    server = await asyncio.start_unix_server(daemon._handle_client, path=socket_path)
+    try:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        await _send(writer, {"type": "attach", "session_id": "work"})
+        attached, _ = await _receive(reader, "attached")
+        assert attached["session_id"] == "work" and not attached["restored"]
+
+        await _send(writer, {"type": "command", "line": "> x = 6 * 7"})
+        await _receive(reader, "done")
+
+        # Drop the connection mid-command: its output waits for the next client
+        await _send(writer, {"type": "command",
+                             "line": "> import asyncio; await asyncio.sleep(0.3); print('late', x)"})
+        writer.close()
+        await asyncio.sleep(0.6)
+
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        await _send(writer, {"type": "attach", "session_id": "work"})
+        attached, _ = await _receive(reader, "attached")
+        assert "".join(m["data"] for m in attached["backlog"]).strip() == "late 42"
+        assert not attached["running"]
+
+        await _send(writer, {"type": "command", "line": "> print(x + 1)"})
+        _, output = await _receive(reader, "done")
+        assert output.strip() == "43"
+        await _send(writer, {"type": "detach"})
+        assert await reader.read() == b""  # The daemon has let go of the client
+
+        # An evicted session comes back with its namespace
+        daemon.sessions.evict(daemon.sessions.hosts["work"])
+        host = daemon.sessions.get("work")
+        assert host.restored and host.session.python_locals["x"] == 42
+    finally:
+        server.close()
+
+
+def test_attach_and_reattach():
+    """A session outlives its client, keeps state and replays missed output"""
+    with tempfile.TemporaryDirectory() as state_dir:
+        asyncio.run(_attach_session(state_dir))
+    print("✓ Sessions survive detach and reattach")
+
+
+if __name__ == "__main__":
+    test_new_session_ids()
+    test_busy_sessions_stay_live()
+    test_failed_restore_keeps_state()
+    test_attach_and_reattach()
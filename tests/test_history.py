@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the indexed NEXUS command history
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_toolkit.history import FileHistory
+
+from nexus_ai.repl.history import HistoryIndex, IndexedHistory
+
+
+def test_frecency_prefers_frequent_recent_commands():
+    """Duplicates collapse and suggestions follow frecency, not insertion order"""
+    now = time.time()
+    index = HistoryIndex()
+    index.add("git status", now - 60)
+    index.add("git status", now - 30)
+    index.add("git stash", now - 10)
+    index.add("git stash list", now - 30 * 24 * 3600)
+
+    assert len(index) == 3
+    assert index.best_match("git st", now) == "git status"
+    assert index.best_match("git stash", now) == "git stash list"
+    assert index.best_match("nope", now) is None
+    print("✓ Frecency suggestions work")
+
+
+def test_reads_filehistory_and_compacts():
+    """Existing ~/.nexus_history files load, and compaction caps unique entries"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history")
+        legacy = FileHistory(path)
+        for command in ["pwd", "ls", "pwd", "echo 'multi\nline'", "ls", "ls"]:
+            legacy.store_string(command)
+
+        history = IndexedHistory(path, max_entries=2)
+        strings = list(history.load_history_strings())
+        assert strings[0] == "ls"
+        # Loading compacted the file, and the index keeps only what the file kept
+        assert sorted(strings) == ["ls", "pwd"] and len(history.index.entries) == 2
+        assert history.index.entries["ls"][0] == 3
+        assert history.index.best_match("ec") is None
+
+        for _ in range(3):
+            history.store_string("pwd")
+        reloaded = IndexedHistory(path, max_entries=2)
+        strings = list(reloaded.load_history_strings())
+        assert sorted(strings) == ["ls", "pwd"]
+        assert reloaded.index.entries["pwd"][0] == 5
+    print("✓ History compaction works")
+
+
+if __name__ == "__main__":
+    test_frecency_prefers_frequent_recent_commands()
+    test_reads_filehistory_and_compacts()
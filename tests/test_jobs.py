@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for background jobs: a trailing '&', 'jobs' and 'kill %N'
+"""
+
+import asyncio
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.session import Session
+from nexus_ai.repl.jobs import JobManager
+from nexus_ai.repl.prompt_toolkit_repl import NexusPromptToolkitREPL
+
+
+def _running(command: bytes) -> bool:
+    """Whether any process has this exact command line"""
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                if f.read().replace(b"\0", b" ").strip() == command:
+                    return True
+        except OSError:
+            pass
+    return False
+
+
+def test_split_background():
+    """Only a lone trailing '&' backgrounds a command"""
+    split = NexusPromptToolkitREPL.split_background
+    assert split("sleep 5 &") == ("sleep 5", True)
+    assert split("sleep 5&  ") == ("sleep 5", True)
+    assert split("make && make test") == ("make && make test", False)
+    assert split("make &&") == ("make &&", False)
+    assert split("&") == ("&", False)
+    print("✓ A trailing '&' is split off")
+
+
+def test_job_manager():
+    """Jobs are listed while they run and dropped, with a note, when they end"""
+    async def main():
+        manager = JobManager()
+        slow = manager.start("slow", asyncio.sleep(10))
+        quick = manager.start("quick", asyncio.sleep(0))
+        assert (slow.job_id, quick.job_id) == (1, 2)
+        assert manager.toolbar_text() == "Jobs: 2 running | "
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            await asyncio.sleep(0.01)
+            assert [job.job_id for job in manager.running()] == [1]
+            assert manager.toolbar_text().startswith("Job: [1] slow")
+            assert manager.cancel(1) and not manager.cancel(3)
+            await asyncio.gather(slow.task, return_exceptions=True)
+            await asyncio.sleep(0)
+        assert not manager.running() and manager.toolbar_text() == ""
+        assert out.getvalue().splitlines() == ["[2] Done: quick (0.0s)", "[1] Cancelled: slow"]
+    asyncio.run(main())
+    print("✓ Jobs are tracked until they finish")
+
+
+def test_background_command_keeps_the_prompt_live():
+    """A backgrounded command runs while foreground commands go ahead"""
+    async def main():
+        session = Session()
+        repl = NexusPromptToolkitREPL(session, headless=True)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            repl.start_background("sleep 0.5; echo background")
+            repl.start_background("sleep 30.5; echo never")
+            repl.start_background("!i top")
+            await repl.route_command("echo foreground")
+            await repl.route_command("jobs")
+            listed = out.getvalue()
+            await asyncio.sleep(0.1)
+            assert _running(b"sleep 30.5")
+            await repl.route_command("kill %2")
+            await repl.route_command("kill %9")
+            while repl.jobs.running():
+                await asyncio.sleep(0.05)
+        printed = out.getvalue()
+
+        assert "[1] Started: sleep 0.5; echo background" in printed
+        assert "Interactive commands need the terminal" in printed
+        assert "[1] sleep 0.5; echo background" in listed and "[2] sleep 30.5; echo never" in listed
+        # Not just the shell: the command it started is gone too
+        assert not _running(b"sleep 30.5")
+        assert "No such job: %9" in printed and "[2] Cancelled: sleep 30.5; echo never" in printed
+        outputs = [str(record["content"]).strip() for record in session.output_history]
+        # The foreground command finished first even though it started last
+        assert outputs.index("foreground") < outputs.index("background"), outputs
+    asyncio.run(main())
+    print("✓ Background commands don't hold up the prompt")
+
+
+if __name__ == "__main__":
+    test_split_background()
+    test_job_manager()
+    test_background_command_keeps_the_prompt_live()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the output normalization pipeline
+"""
+
+import asyncio
+import os
+import pty
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.normalize import command_program, normalize_lines, normalize_text
+from nexus_ai.core.session import Session
+from nexus_ai.core.spill import SpillStore
+from nexus_ai.repl.prompt_toolkit_repl import NexusPromptToolkitREPL
+
+
+def test_generic_stages():
+    """ANSI codes, CR redraws and repeated lines are collapsed"""
+    text = ("\x1b[1;31merror\x1b[0m\n"
+            "Downloading 10%\rDownloading 55%\rDownloading 100%\r\n"
+            + "retrying\n" * 50 + "twice\ntwice\nend")
+    assert normalize_text(text) == (
+        "error\nDownloading 100%\nretrying\n⋯ previous line repeated 49 more times\ntwice\ntwice\nend"
+    )
+    # Lazy: stages pull one line at a time
+    stream = normalize_lines(iter(["a", "a", "a", "b"]))
+    assert next(stream) == "a"
+    assert list(stream) == ["⋯ previous line repeated 2 more times", "b"]
+    print("✓ Generic normalization works")
+
+
+def test_command_filters():
+    """Per-command filters apply by program name"""
+    assert command_program("sudo PIP_NO_INPUT=1 python3 -m pip install -U x") == "pip"
+    assert command_program("docker build . | tee log") == "docker"
+
+    pip_output = "".join(f"Requirement already satisfied: pkg{i} in /site\n" for i in range(20))
+    assert normalize_text(pip_output, "pip install -r requirements.txt") == (
+        "Requirement already satisfied: pkg0 in /site\n⋯ 19 more requirements already satisfied\n"
+    )
+    assert normalize_text(pip_output, "cat log") == pip_output
+
+    docker_output = "#5 [2/3] RUN apt-get update\n#5 sha256:0a1b 1.2MB / 30.1MB 0.4s\n#5 DONE 3.1s\n"
+    assert normalize_text(docker_output, "docker build .") == "#5 [2/3] RUN apt-get update\n#5 DONE 3.1s\n"
+    print("✓ Command filters work")
+
+
+def test_store_command_output_keeps_raw():
+    """History gets the normalized text; the raw text is spilled when asked"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = Session().output_manager
+        manager.spills = SpillStore(tmp)
+        manager.keep_raw = True
+        raw = "50%\r100%\n"
+        assert manager.store_command_output("bash_stdout", raw, "curl -O x") == "100%\n"
+        entry = manager._session.output_history[-1]
+        with open(entry["data"]["raw"]["path"], newline="") as f:
+            assert f.read() == raw
+
+        manager.store_command_output("bash_stdout", "clean\n", "echo clean")
+        assert "data" not in manager._session.output_history[-1]
+    print("✓ Raw output kept on request")
+
+
+@contextmanager
+def fake_program(name, script):
+    """A terminal on stdin and a stand-in for name first on $PATH, so it runs in the PTY"""
+    master, slave = pty.openpty()
+    old_stdin, old_path = sys.stdin, os.environ["PATH"]
+    with tempfile.TemporaryDirectory() as tmp:
+        program = Path(tmp) / name
+        program.write_text(f"#!/bin/sh\n{script}\n")
+        program.chmod(0o755)
+        sys.stdin = open(slave, "r")
+        os.environ["PATH"] = f"{tmp}{os.pathsep}{old_path}"
+        try:
+            yield tmp
+        finally:
+            sys.stdin.close()
+            os.close(master)
+            sys.stdin, os.environ["PATH"] = old_stdin, old_path
+
+
+def test_pty_output_is_filtered():
+    """pip runs in the PTY by default; its transcript is filtered all the same"""
+    with fake_program("pip", "for i in $(seq 20); do echo \"Requirement already satisfied: pkg$i in /site\"; done"):
+        session = Session()
+        repl = NexusPromptToolkitREPL(session, headless=True)
+        repl.executor.allow_interactive = True
+        command = "pip install -r requirements.txt"
+        assert repl.executor.is_likely_interactive(command)
+        asyncio.run(repl.route_command(command))
+
+    record = session.output_history[-1]
+    assert record.type == "bash_interactive" and "transcript" in record.data
+    assert str(record["content"]) == (
+        f"Executed: {command}\nRequirement already satisfied: pkg1 in /site\n"
+        "⋯ 19 more requirements already satisfied"
+    ), str(record["content"])
+    print("✓ PTY transcripts are filtered")
+
+
+if __name__ == "__main__":
+    test_generic_stages()
+    test_command_filters()
+    test_store_command_output_keeps_raw()
+    test_pty_output_is_filtered()
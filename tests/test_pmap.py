@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the process-pool map over session data
+"""
+
+import asyncio
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core import pmap as process_map
+from nexus_ai.core.pmap import ItemError, PMapError, encode_callable, pmap
+
+
+def _repl_namespace():
+    namespace = {}
+    exec("import math\n"
+         "SCALE = 2\n"
+         "def fact(n):\n    return 1 if n < 2 else n * fact(n - 1)\n"
+         "def work(x, offset=1):\n    return math.floor(x * SCALE) + fact(3) + offset\n",
+         namespace)
+    return namespace
+
+
+def test_repl_functions_are_sent_as_code():
+    """Functions defined in the session rebuild with their globals, recursion and defaults"""
+    namespace = _repl_namespace()
+    rebuilt = process_map._decode_callable(encode_callable(namespace["work"]))
+    assert rebuilt is not namespace["work"] and rebuilt(1.5) == 3 + 6 + 1
+
+    scale = 3
+    closure = process_map._decode_callable(encode_callable(lambda x: x * scale))
+    assert closure(2) == 6
+    # Importable functions go by reference
+    assert process_map._decode_callable(encode_callable(abs)) is abs
+
+    namespace["lock"] = __import__("threading").Lock()
+    exec("def locked(x):\n    return lock", namespace)
+    try:
+        encode_callable(namespace["locked"])
+    except PMapError as e:
+        assert "'lock'" in str(e)
+    else:
+        raise AssertionError("expected PMapError")
+    print("✓ REPL functions are sent as code")
+
+
+def test_pmap_on_the_pool():
+    """Ordered and unordered results, chunking, pool reuse and cancellation"""
+    namespace = _repl_namespace()
+    exec("def spin(x):\n    while True:\n        pass\n", namespace)
+
+    async def run():
+        mapping = pmap(namespace["work"], range(100), workers=2)
+        assert mapping.chunksize == 13  # 100 items over 2 workers x 4 chunks
+        assert await mapping == [namespace["work"](x) for x in range(100)]
+        pool = process_map.get_pool(2)
+
+        streamed = [r async for r in pmap(namespace["work"], iter(range(40)), ordered=False,
+                                          chunksize=3, workers=2)]
+        assert sorted(streamed) == sorted(namespace["work"](x) for x in range(40))
+        assert process_map.get_pool(2) is pool
+
+        # A failing item doesn't cost the others their results
+        mapping = pmap(lambda x: 1 / x, [1, 0, 2, 0], chunksize=2, workers=2)
+        results = await mapping
+        assert results[0] == 1 and results[2] == 0.5
+        assert sorted(e.index for e in mapping.errors) == [1, 3]  # As chunks finish
+        assert isinstance(results[1], ItemError) and results[1] in mapping.errors
+        assert results[3].error == "ZeroDivisionError: division by zero"
+        assert "1 / x" in results[3].traceback and "_run_chunk" not in results[3].traceback
+
+        # Chunks carry the digest; the function goes to each worker once, from a file
+        payload = encode_callable(namespace["work"])
+        assert len(list(process_map._payload_dir.iterdir())) == 2  # One per function
+        assert any(path.read_bytes() == payload for path in process_map._payload_dir.iterdir())
+
+        task = asyncio.ensure_future(pmap(namespace["spin"], range(2), workers=2)._collect())
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if process_map.active_maps():
+                break
+        assert process_map.toolbar_text().startswith("pmap spin 0/2")
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        assert not process_map.active_maps() and process_map._payload_dir is None
+        # Busy workers were stopped; the next map starts a fresh pool
+        assert await pmap(abs, [-1, -2], workers=2) == [1, 2]
+
+        # Work that hasn't started is cancelled on shutdown, not left to fail
+        queued = [process_map.get_pool(1).submit(time.sleep, 5) for _ in range(10)]
+        process_map._submitted.update(queued)
+        process_map.shutdown_pool(kill=True)
+        assert queued[-1].cancelled()
+
+    try:
+        asyncio.run(run())
+    finally:
+        process_map.shutdown_pool(kill=True)
+    print("✓ pmap runs on a reused process pool")
+
+
+if __name__ == "__main__":
+    test_repl_functions_are_sent_as_code()
+    test_pmap_on_the_pool()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the %time, %prof and %mem magics
+"""
+
+import asyncio
+import os
+import resource
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.session import Session
+from nexus_ai.repl.prompt_toolkit_repl import NexusPromptToolkitREPL
+
+
+def _measure(line):
+    """Run a magic in a fresh headless REPL; returns the stored measurements"""
+    session = Session()
+    repl = NexusPromptToolkitREPL(session, headless=True)
+    asyncio.run(repl.route_command(line))
+    record = session.output_history[-1]
+    assert record.type == "profile"
+    return record.data
+
+
+def test_prof_covers_only_the_cell():
+    """The profile holds the cell's code, not routing or output storage"""
+    data = _measure("%prof -n 50 > sum(i * i for i in range(50000))")
+    functions = [row["function"] for row in data["profile"]]
+    assert any("genexpr" in function for function in functions), functions
+    for module in ("prompt_toolkit_repl", "executor", "output", "spill", "blobs", "cells"):
+        assert not any(f"{module}.py" in function for function in functions), (module, functions)
+    print("✓ %prof profiles only the cell")
+
+
+def test_mem_python_cell():
+    """Allocations are traced in the cell, not where its output is stored"""
+    data = _measure("%mem > kept = [bytes(1000) for _ in range(2000)]; print('x' * 10**6)")
+    memory = data["memory"]
+    assert memory["net_mb"] > 1.5, memory
+    locations = [entry["location"] for entry in memory["top"]]
+    assert locations[0].startswith("<cell>"), locations
+    for module in ("output", "spill", "blobs", "cells"):
+        assert not any(f"{module}.py" in location for location in locations), (module, locations)
+    print("✓ %mem traces the cell's allocations")
+
+
+def test_mem_command_uses_its_own_usage():
+    """A command's peak RSS is its own, not the largest of any earlier child"""
+    size = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 + 64 * 2**20
+    data = _measure(f"%mem {sys.executable} -c 'x = bytearray({size})'")
+    (usage,) = data["usage"]
+    assert usage["max_rss"] > size, usage
+    assert "memory" not in data
+    print("✓ %mem reports a command's own peak")
+
+
+if __name__ == "__main__":
+    test_prof_covers_only_the_cell()
+    test_mem_python_cell()
+    test_mem_command_uses_its_own_usage()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the NEXUS JSON-RPC API
+Drives the server in-process over a temporary Unix socket
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.server.daemon import SessionManager
+from nexus_ai.server.rpc import JSONRPCServer, METHOD_NOT_FOUND, INVALID_PARAMS
+
+
+async def _call_many(socket_path, requests):
+    """Send all requests at once and collect responses and notifications"""
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    for request in requests:
+        writer.write((json.dumps(request) + "\n").encode())
+    await writer.drain()
+
+    responses, notifications = {}, []
+    while len(responses) < len(requests):
+        message = json.loads(await reader.readline())
+        if "id" in message:
+            responses[message["id"]] = message
+        else:
+            notifications.append(message)
+    writer.close()
+    return responses, notifications
+
+
+async def _run_rpc_session():
+    with tempfile.TemporaryDirectory() as state_dir:
+        socket_path = os.path.join(state_dir, "rpc.sock")
+        sessions = SessionManager(state_dir)
+        servers = await JSONRPCServer(sessions).start(socket_path)
+        try:
+            responses, notifications = await _call_many(socket_path, [
+                {"jsonrpc": "2.0", "id": 1, "method": "python.execute",
+                 "params": {"session_id": "rpc", "code": "x = 6 * 7"}},
+                {"jsonrpc": "2.0", "id": 2, "method": "bash.execute",
+                 "params": {"session_id": "rpc", "command": "echo streamed"}},
+                {"jsonrpc": "2.0", "id": 3, "method": "no.such.method"},
+                {"jsonrpc": "2.0", "id": 4, "method": "python.execute",
+                 "params": {"session_id": "rpc", "wrong": 1}},
+            ])
+            assert responses[1]["result"] == {"stdout": "", "stderr": ""}
+            assert responses[2]["result"]["stdout"] == "streamed\n"
+            assert any(n["params"]["request_id"] == 2 for n in notifications)
+            assert responses[3]["error"]["code"] == METHOD_NOT_FOUND
+            assert responses[4]["error"]["code"] == INVALID_PARAMS
+
+            responses, _ = await _call_many(socket_path, [
+                {"jsonrpc": "2.0", "id": 5, "method": "nexus.execute",
+                 "params": {"session_id": "rpc", "line": "> x"}},
+                {"jsonrpc": "2.0", "id": 6, "method": "history.query",
+                 "params": {"session_id": "rpc", "type": "bash_stdout"}},
+            ])
+            assert responses[5]["result"]["stdout"].strip() == "42"
+            assert [e["content"] for e in responses[6]["result"]] == ["streamed\n"]
+
+            # Calls without a session_id share one session
+            sessions_before = len(sessions.hosts)
+            await _call_many(socket_path, [
+                {"jsonrpc": "2.0", "id": 7, "method": "python.execute", "params": {"code": "y = 5"}},
+            ])
+            responses, _ = await _call_many(socket_path, [
+                {"jsonrpc": "2.0", "id": 8, "method": "nexus.execute", "params": {"line": "> y"}},
+            ])
+            assert responses[8]["result"]["stdout"].strip() == "5"
+            assert len(sessions.hosts) == sessions_before + 1
+
+            # seq numbers don't move as old entries are trimmed
+            history = sessions.get("rpc").session.output_manager
+            history.max_history = 2
+            for i in range(3):
+                history.store_output("note", f"note {i}")
+            responses, _ = await _call_many(socket_path, [
+                {"jsonrpc": "2.0", "id": 9, "method": "history.query",
+                 "params": {"session_id": "rpc", "type": "note"}},
+            ])
+            notes = responses[9]["result"]
+            assert [e["content"] for e in notes] == ["note 1", "note 2"]
+            responses, _ = await _call_many(socket_path, [
+                {"jsonrpc": "2.0", "id": 10, "method": "history.query",
+                 "params": {"session_id": "rpc", "after": notes[0]["seq"]}},
+            ])
+            assert [e["content"] for e in responses[10]["result"]] == ["note 2"]
+        finally:
+            for server in servers:
+                server.close()
+
+
+def test_rpc_methods():
+    """Requests run concurrently and return results instead of printing"""
+    asyncio.run(_run_rpc_session())
+    print("✓ JSON-RPC methods work")
+
+
+if __name__ == "__main__":
+    test_rpc_methods()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for storing repeated command output as diffs
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.rundiff import RunDiffer, normalize_command, output_diff
+from nexus_ai.core.session import Session
+from nexus_ai.core.spill import SpillStore
+from nexus_ai.repl.prompt_toolkit_repl import NexusPromptToolkitREPL
+from test_normalize import fake_program
+
+HEADER = "NAME        READY   STATUS    RESTARTS   AGE\n"
+POD = "{name:<12}1/1     {status:<10}0          {age}\n"
+
+
+def pods(age, broken=()):
+    names = [f"api-{i}" for i in range(10)] + [f"worker-{i}" for i in range(10)]
+    return HEADER + "".join(POD.format(name=name, age=age, status="Error" if name in broken else "Running")
+                            for name in names)
+
+
+def test_output_diff():
+    """Colors and changing ages or durations don't count as changes"""
+    assert output_diff("a\nb\n", "a\nb\n") == []
+    assert output_diff("\x1b[32mok\x1b[0m\n", "ok\n") == []
+    assert output_diff("done in 1.52s at 10:01:02\n", "done in 0.97s at 10:03:44\n") == []
+    diff = output_diff("1 passed\n", "1 failed\n")
+    assert "-1 passed" in diff and "+1 failed" in diff
+    print("✓ Output diffs ignore colors and times")
+
+
+def test_run_differ_keys():
+    """Runs match on normalized command and directory"""
+    differ = RunDiffer()
+    assert normalize_command("ls   -l 'a b'") == normalize_command('ls -l "a b"')
+    assert differ.compare("git status", "clean\n", cwd="/a") is None
+    assert differ.compare("git  status", "clean\n", cwd="/a").exact
+    assert differ.compare("git status", "clean\n", cwd="/b") is None
+    assert differ.seen("git status", cwd="/b") and not differ.seen("git log", cwd="/b")
+    print("✓ Repeated commands are keyed by normalized command and cwd")
+
+
+def test_repeats_stored_as_diffs():
+    """A rerun is stored as a diff, with the full output spilled for 'view'"""
+    with tempfile.TemporaryDirectory() as directory:
+        session = Session("rundiff-test")
+        manager = session.output_manager
+        manager.spills = SpillStore(directory)
+
+        first = manager.store_command_output("bash_stdout", pods("5m"),
+                                             "kubectl get pods", diff=True)
+        assert first.startswith("NAME")
+
+        same = manager.store_command_output("bash_stdout", pods("6m"),
+                                            "kubectl get pods", diff=True)
+        assert same.startswith("↻ Same output apart from times"), same
+
+        changed = manager.store_command_output("bash_stdout", pods("7m", broken={"worker-1"}),
+                                               "kubectl get pods", diff=True)
+        assert "-worker-1    1/1     Running   0          6m" in changed, changed
+        assert "+worker-1    1/1     Error     0          7m" in changed
+        assert changed.startswith("↻ 2 lines changed") and "api-1 " not in changed
+
+        record = session.output_history[-1]
+        full = manager.spills.get(record["data"]["rundiff"]["full"]["id"])
+        assert "worker-1    1/1     Error" in full.path.read_text()
+        assert len(str(record["content"])) < len(pods("7m")) // 2
+    print("✓ Reruns are stored as diffs with the full output on demand")
+
+
+def test_pty_reruns_stored_as_diffs():
+    """kubectl runs in the PTY by default; its reruns are diffs all the same"""
+    with fake_program("kubectl", 'cat "$(dirname "$0")/pods"') as directory:
+        session = Session("rundiff-pty-test")
+        session.output_manager.spills = SpillStore(directory)
+        repl = NexusPromptToolkitREPL(session, headless=True)
+        repl.executor.allow_interactive = True
+        assert repl.executor.is_likely_interactive("kubectl get pods")
+        for output in (pods("5m"), pods("6m", broken={"worker-1"})):
+            (Path(directory) / "pods").write_text(output)
+            asyncio.run(repl.route_command("kubectl get pods"))
+
+        first, second = [record for record in session.output_history if record.type == "bash_interactive"]
+        assert "api-1 " in str(first["content"]) and "rundiff" not in first.data
+        changed = str(second["content"])
+        assert changed.startswith("↻ 2 lines changed") and "api-1 " not in changed, changed
+        assert "+worker-1    1/1     Error     0          6m" in changed
+        assert "usage" in second.data and "transcript" in second.data
+    print("✓ PTY reruns are stored as diffs")
+
+
+if __name__ == "__main__":
+    test_output_diff()
+    test_run_differ_keys()
+    test_repeats_stored_as_diffs()
+    test_pty_reruns_stored_as_diffs()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Tests for per-command resource usage and duration statistics
+"""
+
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.executor import CodeExecutor
+from nexus_ai.core.rusage import CommandStats, Estimate, ShellProcess, Usage, set_session_count
+from nexus_ai.core.session import Session
+
+
+def test_stats():
+    """Runs of the same command build a mean and spread that survive a restart"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "command_stats.json"
+        stats = CommandStats(path)
+        assert stats.estimate("make test", cwd="/src") is None
+        for wall in (1.0, 2.0, 3.0):
+            stats.record("make  test", Usage(wall, returncode=0), cwd="/src")
+        stats.record("make test", Usage(60.0, returncode=-2), cwd="/src")  # Ctrl+C'd
+        stats.record("make test", Usage(9.0, returncode=0), cwd="/elsewhere")
+        stats.save()
+
+        estimate = CommandStats(path).estimate("make 'test'", cwd="/src")
+        assert estimate.runs == 3
+        assert abs(estimate.mean - 2.0) < 1e-9 and abs(estimate.std - 1.0) < 1e-9
+    print("✓ Durations are kept per command and directory, interrupted runs left out")
+
+
+def test_slow_runs():
+    """Only runs well outside a settled history are flagged"""
+    settled = Estimate(runs=8, mean=10.0, std=0.5)
+    assert settled.is_slow(20.0)
+    assert not settled.is_slow(11.0)
+    assert not Estimate(runs=8, mean=10.0, std=4.0).is_slow(20.0)
+    assert not Estimate(runs=2, mean=10.0, std=0.0).is_slow(100.0)
+    print("✓ Slow runs are flagged against mean and spread")
+
+
+def test_shell_process_usage():
+    """wait4 reports CPU and peak memory, and Popen doesn't reap the shell again"""
+    async def main():
+        # Peaks only count above our own, which a forked child starts from
+        size = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 + 64 * 2**20
+        code = f"x = bytearray({size}); sum(range(3 * 10**6)); print(len(x))"
+        process = await ShellProcess.start(f"{sys.executable} -c '{code}'; exit 3")
+        stdout, _ = await process.communicate()
+        assert stdout.strip() == str(size).encode()
+        assert process.returncode == 3 and process.popen.poll() == 3
+        usage = process.usage
+        assert usage.max_rss > size, usage.max_rss
+        assert usage.user > 0 and usage.wall >= usage.user * 0.5
+
+        sleeper = await ShellProcess.start("sleep 30")
+        sleeper.kill()
+        assert await asyncio.wait_for(sleeper.wait(), 5) == -9
+    asyncio.run(main())
+    print("✓ Shell processes report their resource usage")
+
+
+def test_return_codes():
+    """Exit statuses come back as is; a killed command's as minus the signal"""
+    async def main():
+        exited = await ShellProcess.start("exit 3")
+        killed = await ShellProcess.start("sleep 30")
+        killed.kill()
+        assert await exited.wait() == 3 and exited.usage.returncode == 3
+        assert await killed.wait() == -9
+    asyncio.run(main())
+    print("✓ Return codes match Popen's")
+
+
+def test_peak_below_our_lifetime_peak():
+    """A command smaller than our past peak, but bigger than we are now, is still measured"""
+    async def main():
+        set_session_count(1)  # Daemon tests may have left hosts behind
+        spike = bytearray(256 * 2**20)
+        spike[::4096] = b"x" * len(spike[::4096])  # Touch every page
+        del spike  # Our lifetime peak stays up; our RSS goes back down
+        size = 128 * 2**20
+        process = await ShellProcess.start(
+            f"{sys.executable} -c 'x = bytearray({size}); x[::4096] = b\"x\" * len(x[::4096])'")
+        await process.communicate()
+        usage = process.usage
+        if not os.path.exists("/proc/self/clear_refs"):
+            return  # No way to lower the floor: the limitation is reported instead
+        assert usage.rss_floor < size and usage.max_rss > size, usage.to_dict()
+
+        small = await ShellProcess.start("true")
+        await small.communicate()
+        assert small.usage.max_rss == 0 and small.usage.rss_floor
+        assert small.usage.describe().endswith(f"peak ≤ {small.usage.rss_floor / 2**20:,.0f} MB")
+    asyncio.run(main())
+    print("✓ Peaks are measured from our size when the command started")
+
+
+def test_peak_kept_while_shared():
+    """Our high-water mark isn't reset under a running command or other sessions"""
+    def spike():
+        memory = bytearray(256 * 2**20)
+        memory[::4096] = b"x" * len(memory[::4096])
+
+    async def floor():
+        process = await ShellProcess.start("true")
+        await process.communicate()
+        return process.usage.rss_floor
+
+    async def main():
+        set_session_count(1)  # Daemon tests may have left hosts behind
+        if not os.path.exists("/proc/self/clear_refs"):
+            return
+        running = await ShellProcess.start("sleep 0.5")
+        spike()
+        assert await floor() > 256 * 2**20  # The sleep started before the spike
+        await running.communicate()
+
+        set_session_count(2)
+        try:
+            assert await floor() > 256 * 2**20
+        finally:
+            set_session_count(1)
+        assert await floor() < 256 * 2**20
+    asyncio.run(main())
+    print("✓ The high-water mark is reset only when nothing else measures against it")
+
+
+def test_executor_records_usage():
+    """Every captured run lands in the stats and is handed over once"""
+    with tempfile.TemporaryDirectory() as tmp:
+        executor = CodeExecutor(Session())
+        executor.stats = CommandStats(Path(tmp) / "command_stats.json")
+        async def main():
+            stdout, _, returncode = await executor.run_command("echo hi; exit 2")
+            assert stdout == "hi\n" and returncode == 2
+            return executor.take_usage("echo other"), executor.take_usage("echo hi; exit 2")
+
+        other, usage = asyncio.run(main())
+        assert other is None and usage.returncode == 2 and usage.wall > 0
+        assert executor.take_usage("echo hi; exit 2") is None  # Only the task that ran it sees it
+        assert executor.stats.estimate("echo hi; exit 2").runs == 1
+    print("✓ The executor records usage for each command")
+
+
+def test_concurrent_runs_keep_their_usage():
+    """Two runs of one command at once each get their own usage back"""
+    with tempfile.TemporaryDirectory() as tmp:
+        executor = CodeExecutor(Session())
+        executor.stats = CommandStats(Path(tmp) / "command_stats.json")
+        # Whichever run makes the directory exits 3, the other 4
+        command = f"sleep 0.1; mkdir {tmp}/lock 2>/dev/null && exit 3; sleep 0.1; exit 4"
+
+        async def run():
+            _, _, returncode = await executor.run_command(command)
+            await asyncio.sleep(0.3)  # Both have finished before either takes its usage
+            return returncode, executor.take_usage(command)
+
+        async def main():
+            return await asyncio.gather(run(), run())
+
+        runs = asyncio.run(main())
+        assert sorted(returncode for returncode, _ in runs) == [3, 4]
+        assert all(usage is not None and usage.returncode == returncode for returncode, usage in runs)
+    print("✓ Concurrent runs of a command don't swap usages")
+
+
+if __name__ == "__main__":
+    test_stats()
+    test_slow_runs()
+    test_shell_process_usage()
+    test_return_codes()
+    test_peak_below_our_lifetime_peak()
+    test_peak_kept_while_shared()
+    test_executor_records_usage()
+    test_concurrent_runs_keep_their_usage()
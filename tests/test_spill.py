@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for spilling large outputs and the line index behind the pager
+"""
+
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.session import Session
+from nexus_ai.core.spill import LineIndex, SpillStore, compile_search, parse_range
+
+
+def test_large_output_is_spilled_with_preview():
+    """History keeps a head/tail preview and a reference to the spill file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = Session().output_manager
+        manager.spills = SpillStore(tmp)
+        text = "".join(f"line {i}\n" for i in range(10000))
+
+        stored = manager.store_output("bash_stdout", text, label="seq")
+        assert stored.startswith("line 0\n")
+        assert stored.endswith("line 9999")
+        assert "more lines" in stored and "'view 1'" in stored
+
+        entry = manager._session.output_history[-1]
+        assert entry["content"] == stored
+        spill = entry["data"]["spill"]
+        assert spill["lines"] == 10000
+        with open(spill["path"]) as f:
+            assert f.read() == text
+
+        assert manager.store_output("bash_stdout", "small\n") == "small\n"
+    print("✓ Large output spilled")
+
+
+def test_line_index_and_search():
+    """Lines are found by offset and search moves forward and backward"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out.log")
+        with open(path, "w") as f:
+            f.write("".join(f"row {i}\r\n" for i in range(5000)))
+
+        with LineIndex(path) as index:
+            assert index.line(0) == "row 0"
+            assert index.lines(4998, 10) == ["row 4998", "row 4999"]
+            assert len(index) == 5000
+            pattern = compile_search("row 42")
+            assert index.search(compile_search("Row 42"), 0) is None
+            assert index.search(pattern, 0) == 42
+            assert index.search(pattern, 42) == 420
+            assert index.search(pattern, 4999, backward=True) == 4299
+            assert index.search(compile_search(r"^row 7\b"), 0) == 7
+            assert index.search(compile_search("missing"), 0) is None
+
+        empty = os.path.join(tmp, "empty.log")
+        open(empty, "w").close()
+        with LineIndex(empty) as index:
+            assert len(index) == 0 and index.lines(0, 5) == []
+
+    assert parse_range("10:12") == (9, 3)
+    assert parse_range("5") == (4, 50)
+    print("✓ Line index works")
+
+
+def test_stores_prune_only_their_own_files():
+    """Sessions sharing the spill directory don't delete each other's spills"""
+    with tempfile.TemporaryDirectory() as tmp:
+        stale = os.path.join(tmp, "20200101-000000-1-1.log")
+        open(stale, "w").close()
+        os.utime(stale, (0, 0))
+        mine, theirs = SpillStore(tmp, max_files=2), SpillStore(tmp, max_files=2)
+        kept = [theirs.spill(f"theirs {i}\n") for i in range(2)]
+        first, *rest = [mine.spill(f"mine {i}\n") for i in range(3)]
+
+        assert not first.path.exists() and mine.get(first.spill_id) is None
+        assert all(ref.path.exists() for ref in kept + rest)
+        assert not os.path.exists(stale)  # Swept once older than SPILL_MAX_AGE_DAYS
+        # The pruned text spills again rather than pointing at the deleted file
+        assert mine.spill("mine 0\n").path.exists()
+    print("✓ Spill pruning is per store")
+
+
+if __name__ == "__main__":
+    test_large_output_is_spilled_with_preview()
+    test_line_index_and_search()
+    test_stores_prune_only_their_own_files()
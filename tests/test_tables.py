@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for parsing command output into typed tables
+"""
+
+import math
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.capture import CapturedOutput
+from nexus_ai.core.tables import parse_table
+
+
+PS = """USER       PID %CPU %MEM    VSZ   RSS TTY      STAT START   TIME COMMAND
+root         1  0.0  0.1 167744 11500 ?        Ss   Oct18   0:03 /sbin/init splash
+www-data  4211 12.5  2.0 912340 80120 ?        Sl   09:12   1:40 nginx: worker process
+root      5120  3.1  0.5 201000 20000 pts/0    R+   10:01   0:00 ps aux
+"""
+
+DF = """Filesystem      Size  Used Avail Use% Mounted on
+/dev/sda1        98G   41G   52G  45% /
+tmpfs           7.8G     0  7.8G   0% /dev/shm
+"""
+
+LS = """total 12
+-rw-r--r-- 1 root root  220 Oct 19 09:55 notes.txt
+drwxr-xr-x 2 root root 4096 Oct 19 09:56 my dir
+"""
+
+DOCKER = """CONTAINER ID   NAME      CPU %     MEM USAGE / LIMIT
+ab12cd34ef56   web       0.05%     12.3MiB / 7.7GiB
+9f8e7d6c5b4a   db        -         300MiB / 7.7GiB
+"""
+
+
+def test_whitespace_tables():
+    """ps keeps spaces in the last column; df merges a two-word heading and parses sizes"""
+    procs = parse_table(PS)
+    assert procs.names[:3] == ["USER", "PID", "%CPU"] and len(procs) == 3
+    assert list(procs["PID"]) == [1, 4211, 5120]
+    assert procs[0]["COMMAND"] == "/sbin/init splash"
+    assert [row["PID"] for row in procs.where("%CPU", ">", 1).sort("%CPU", reverse=True)] == [4211, 5120]
+
+    disks = parse_table(DF)
+    assert disks.names[-1] == "Mounted on"
+    assert disks["Size"][0] == 98 * 2**30 and disks["Use%"][0] == 45
+
+    files = parse_table(LS)
+    assert files.names[0] == "col0" and len(files) == 2
+    assert files[1]["col8"] == "my dir" and files["col4"][1] == 4096
+
+    stats = parse_table(DOCKER)
+    assert stats.names == ["CONTAINER ID", "NAME", "CPU %", "MEM USAGE / LIMIT"]
+    assert stats["CPU %"][0] == 0.05 and math.isnan(stats["CPU %"][1])
+    print("✓ Whitespace tables parsed")
+
+
+def test_delimited_tables_and_summary():
+    """CSV/TSV are detected, and the summary is a compact stand-in for the rows"""
+    table = parse_table(CapturedOutput(b"name,size,kind\na,10,x\nb,,y\nc,30,x\n", command="report"))
+    assert table.names == ["name", "size", "kind"] and table.source == "report"
+    assert math.isnan(table["size"][1])
+    assert len(table.filter(lambda row: row["kind"] == "x")) == 2
+
+    summary = table.summary()
+    assert summary.startswith("Table: 3 rows × 3 columns from `report`")
+    assert "size (float): min 10, mean 20, max 30" in summary
+    assert "kind (str): 2 distinct; top: x (2)" in summary
+
+    tsv = parse_table("1\t2\n3\t4\n")
+    assert tsv.names == ["col0", "col1"] and list(tsv["col1"]) == [2, 4]
+    print("✓ Delimited tables parsed")
+
+
+if __name__ == "__main__":
+    test_whitespace_tables()
+    test_delimited_tables_and_summary()
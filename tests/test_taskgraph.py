@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for model-planned task graphs and their parallel runner
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.taskgraph import DONE, PENDING, TaskPlanError, TaskRunner, TaskStore, parse_plan
+
+
+PLAN = {"steps": [
+    {"id": "venv", "command": "python -m venv .venv"},
+    {"id": "node", "command": "npm ci"},
+    {"id": "deps", "command": "pip install -r requirements.txt", "depends_on": ["venv"]},
+    {"id": "test", "kind": "python", "command": "run_tests()", "depends_on": ["deps", "node"]},
+]}
+
+
+def test_parse_plan():
+    """Plans are read from fenced JSON and checked for unknown steps and cycles"""
+    graph = parse_plan("setup", "Sure:\n```json\n" + json.dumps(PLAN) + "\n```\nDone.")
+    assert [step.id for step in graph.ready()] == ["venv", "node"]
+    assert [step.id for step in graph.dependents("venv")] == ["deps", "test"]
+    assert graph.steps["test"].kind == "python"
+
+    for bad, message in (({"steps": []}, "no steps"),
+                         ({"steps": [{"id": "a", "command": "x", "depends_on": ["b"]}]}, "unknown"),
+                         ({"steps": [{"id": "a", "command": "x", "depends_on": ["b"]},
+                                     {"id": "b", "command": "y", "depends_on": ["a"]}]}, "cycle")):
+        try:
+            parse_plan("t", json.dumps(bad))
+        except TaskPlanError as e:
+            assert message in str(e), e
+        else:
+            raise AssertionError(f"expected TaskPlanError for {bad}")
+    print("✓ Plans are parsed and validated")
+
+
+def test_runner_parallel_retry_and_cache():
+    """Independent steps overlap, failures block dependents, retries reuse results"""
+    calls, broken = [], {"deps"}
+    active = {"now": 0, "peak": 0}
+
+    async def run_step(step):
+        calls.append(step.id)
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.05)
+        active["now"] -= 1
+        ok = step.id not in broken
+        return f"{step.id} out", "" if ok else "boom", ok, 0 if ok else 1
+
+    async def run():
+        events = []
+        runner = TaskRunner(run_step, concurrency=2, on_event=lambda step, event: events.append((step.id, event)))
+        graph = parse_plan("setup", json.dumps(PLAN))
+        counts = await runner.run(graph)
+        assert counts == {"pending": 0, "running": 0, "done": 2, "failed": 1, "blocked": 1}
+        assert active["peak"] == 2 and ("test", "blocked") in events
+        assert graph.steps["deps"].error == "boom"
+
+        broken.clear()
+        calls.clear()
+        graph.reset_unfinished()
+        assert (await runner.run(graph))["done"] == 4
+        assert calls == ["deps", "test"]
+
+        # A fresh plan for the same task reuses every finished step
+        calls.clear()
+        again = parse_plan("setup", json.dumps(PLAN))
+        await runner.run(again)
+        assert calls == [] and all(step.status == DONE and step.cached for step in again)
+    asyncio.run(run())
+    print("✓ Runner runs in parallel, retries only failures and caches results")
+
+
+def test_store_resume():
+    """Records are saved as steps finish; a reloaded task skips its finished steps"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = TaskStore(directory)
+        calls = []
+
+        async def interrupted(step):
+            calls.append(step.id)
+            if step.id == "deps":
+                # Interrupted mid-step, like Ctrl+C or a dropped session
+                raise asyncio.CancelledError()
+            return f"{step.id} out", "", True, 0
+
+        async def run_until_crash():
+            runner = TaskRunner(interrupted, concurrency=4, store=store)
+            graph = parse_plan("setup", json.dumps(PLAN))
+            try:
+                await runner.run(graph)
+            except asyncio.CancelledError:
+                pass
+            return graph.id
+        task_id = asyncio.run(run_until_crash())
+
+        saved = store.list()
+        assert [(t["id"], t["done"], t["steps"]) for t in saved] == [(task_id, 2, 4)]
+        graph = store.load(task_id[:15])
+        assert graph.steps["venv"].status == DONE and graph.steps["venv"].stdout == "venv out"
+        assert graph.steps["deps"].status == PENDING and graph.steps["venv"].finished_at
+
+        calls.clear()
+
+        async def succeed(step):
+            calls.append(step.id)
+            return "", "", True, 0
+        counts = asyncio.run(TaskRunner(succeed, store=store).run(graph))
+        assert counts["done"] == 4 and calls == ["deps", "test"]
+        assert store.list()[0]["done"] == 4
+
+        try:
+            store.load("nope")
+        except TaskPlanError:
+            pass
+        else:
+            raise AssertionError("expected TaskPlanError for an unknown task")
+    print("✓ Task records are saved and resumed without redoing finished steps")
+
+
+def test_run_waits_for_the_plan_to_be_seen():
+    """task run <description> shows the model's plan and runs nothing unconfirmed"""
+    from nexus_ai.core.session import Session
+    from nexus_ai.repl.prompt_toolkit_repl import NexusPromptToolkitREPL
+
+    with tempfile.TemporaryDirectory() as directory:
+        marker = os.path.join(directory, "ran")
+        plan = {"steps": [{"id": "touch", "kind": "bash", "command": f"touch {marker}"}]}
+        repl = NexusPromptToolkitREPL(Session(), headless=True)
+        repl.task_store.directory = Path(directory) / "tasks"
+
+        async def ask_model(query, *args, **kwargs):
+            return "planner", json.dumps(plan)
+        repl.ask_model = ask_model
+
+        asyncio.run(repl.route_command("task run make a marker"))
+        assert not os.path.exists(marker) and repl.task_graph is not None
+        asyncio.run(repl.route_command("task run"))
+        assert os.path.exists(marker)
+    print("✓ Planned commands run only once asked to")
+
+
+if __name__ == "__main__":
+    test_parse_plan()
+    test_runner_parallel_retry_and_cache()
+    test_store_resume()
+    test_run_waits_for_the_plan_to_be_seen()
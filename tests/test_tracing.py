@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for span tracing and its rotating JSONL log
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.tracing import Tracer, format_flame, format_top
+
+
+def test_disabled_tracer_records_nothing():
+    """While off, spans are a shared no-op and nothing is written"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tracer = Tracer(trace_dir=Path(tmp))
+        tracer.enabled = False
+        first, second = tracer.span("a"), tracer.span("b", x=1)
+        assert first is second
+        with first as span:
+            span.event("ignored")
+            tracer.event("ignored")
+        assert not tracer.buffer and not os.listdir(tmp)
+        assert format_top(tracer.top()).startswith("No traces")
+    print("✓ A disabled tracer records nothing")
+
+
+def test_enabled_tracer_nests_spans():
+    """Spans nest under the active one; errors and events are kept"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tracer = Tracer(trace_dir=Path(tmp))
+        tracer.enabled = True
+        with tracer.span("command", line="ls"):
+            with tracer.span("executor"):
+                tracer.event("first byte")
+            try:
+                with tracer.span("print"):
+                    raise ValueError
+            except ValueError:
+                pass
+
+        spans = tracer.last_trace()
+        assert [span.name for span in spans] == ["executor", "print", "command"]
+        root = spans[-1]
+        assert all(span.parent_id == root.span_id for span in spans[:2])
+        assert spans[0].events[0][0] == "first byte"
+        assert spans[1].attrs == {"error": "ValueError"}
+        assert {row["name"] for row in tracer.top()} == {"command", "executor", "print"}
+        assert format_flame(spans).splitlines()[0].startswith("command")
+
+        lines = (Path(tmp) / "trace.jsonl").read_text().splitlines()
+        assert [json.loads(line)["name"] for line in lines] == ["executor", "print", "command"]
+    print("✓ Spans nest and are logged")
+
+
+def test_log_rotates():
+    """The log rotates past max_bytes, keeping a bounded number of backups"""
+    with tempfile.TemporaryDirectory() as tmp:
+        # Each line is ~200 bytes, so a file rotates every second span
+        tracer = Tracer(trace_dir=Path(tmp), max_bytes=300, backups=2)
+        tracer.enabled = True
+        for i in range(21):
+            with tracer.span("command", line="x" * 100, run=i):
+                pass
+        tracer._file.close()
+
+        assert sorted(os.listdir(tmp)) == ["trace.1.jsonl", "trace.2.jsonl", "trace.jsonl"]
+        runs = [[json.loads(line)["attrs"]["run"] for line in (Path(tmp) / name).read_text().splitlines()]
+                for name in ("trace.2.jsonl", "trace.1.jsonl", "trace.jsonl")]
+        flat = [run for chunk in runs for run in chunk]
+        assert flat == list(range(flat[0], 21)), runs  # Newest runs, oldest backup first
+        assert len(flat) < 21 and len(tracer.buffer) == 21
+    print("✓ The trace log rotates")
+
+
+if __name__ == "__main__":
+    test_disabled_tracer_records_nothing()
+    test_enabled_tracer_nests_spans()
+    test_log_rotates()
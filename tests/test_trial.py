@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for forked trial runs (>?) and committing or discarding their changes
+"""
+
+import asyncio
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core import trial as trial_module
+from nexus_ai.core.executor import CodeExecutor
+from nexus_ai.core.session import Session
+
+
+def test_trial_leaves_namespace_until_commit():
+    """A trial's changes stay in the child until committed"""
+    async def run():
+        executor = CodeExecutor(Session())
+        executor.execute_python("import asyncio")
+        executor.execute_python("rows = [1, 2, 3]\nold = 'x'\nkept = object()")
+        namespace = executor.session.python_locals
+        kept = namespace["kept"]
+        streamed = []
+
+        trial = await executor.execute_python_trial(
+            "rows[0] = 99\ntotal = await asyncio.sleep(0, sum(rows))\ndel old\nprint('ran')",
+            on_output=streamed.append)
+        assert not trial.failed and "".join(streamed) == trial.output == "ran\n"
+        assert trial.names == ["old", "rows", "total"]
+        assert namespace["rows"] == [1, 2, 3] and "total" not in namespace and "old" in namespace
+
+        assert executor.commit_trial(trial) == ["old", "rows", "total"]
+        assert namespace["rows"] == [99, 2, 3] and namespace["total"] == 104
+        assert "old" not in namespace and namespace["kept"] is kept
+        assert executor.cells.latest().writes >= {"rows", "total"}
+    asyncio.run(run())
+    print("✓ Trials change nothing until committed")
+
+
+def test_trial_sees_in_place_changes():
+    """Mutating a value the cell read counts as a change, without any assignment"""
+    async def run():
+        executor = CodeExecutor(Session())
+        executor.execute_python("data = [1, 2]\nother = {'k': 1}")
+        trial = await executor.execute_python_trial("data.append(3)\nprint(len(other))")
+        assert trial.names == ["data"], trial.names
+        assert executor.session.python_locals["data"] == [1, 2]
+        executor.commit_trial(trial)
+        assert executor.session.python_locals["data"] == [1, 2, 3]
+
+        # Only mutable values the cell reads without assigning are hashed, and only small ones
+        namespace = {"data": [1], "rows": [2], "n": 3, "big": bytearray(4096)}
+        digests = trial_module._digests("data.append(n)\nrows = rows[:1]\nbig[0] = n", namespace)
+        assert list(digests) == ["data"]
+        saved, trial_module.TRIAL_DIGEST_BYTES = trial_module.TRIAL_DIGEST_BYTES, 1024
+        try:
+            executor.execute_python("big = bytearray(4096)")
+            trial = await executor.execute_python_trial("big.extend(b'x')")
+        finally:
+            trial_module.TRIAL_DIGEST_BYTES = saved
+        assert trial.unchecked == ["big"] and trial.names == []
+    asyncio.run(run())
+    print("✓ In-place changes are committed")
+
+
+def test_trial_failures_and_unpicklable_values():
+    """Failed cells, values that can't be sent back, and dead children are reported"""
+    async def run():
+        executor = CodeExecutor(Session())
+        failed = await executor.execute_python_trial("x = 1\n1 / 0")
+        assert failed.failed and "division by zero" in failed.output
+        assert "x" not in executor.session.python_locals
+
+        trial = await executor.execute_python_trial("f = lambda v: v\nsmall = 1")
+        assert list(trial.unpicklable) == ["f"] and list(trial.changed) == ["small"]
+
+        # Values that don't pickle can't be checked for in-place changes
+        executor.execute_python("handle = lambda: None")
+        trial = await executor.execute_python_trial("handle.calls = 1")
+        assert trial.unchecked == [] and list(trial.unpicklable) == ["handle"]
+        trial = await executor.execute_python_trial("handle()")
+        assert trial.unchecked == ["handle"] and trial.names == []
+
+        # Larger than the cap: commit would re-run the cell rather than copy it over
+        saved, trial_module.TRIAL_MAX_BYTES = trial_module.TRIAL_MAX_BYTES, 1024
+        try:
+            trial = await executor.execute_python_trial("blob = bytes(4096)")
+        finally:
+            trial_module.TRIAL_MAX_BYTES = saved
+        assert "over" in trial.unpicklable["blob"]
+
+        try:
+            await executor.execute_python_trial("import os\nos._exit(3)")
+        except trial_module.TrialError as e:
+            assert "exit status 3" in str(e)
+        else:
+            raise AssertionError("expected TrialError")
+    asyncio.run(run())
+    print("✓ Trial failures are reported")
+
+
+if __name__ == "__main__":
+    test_trial_leaves_namespace_until_commit()
+    test_trial_sees_in_place_changes()
+    test_trial_failures_and_unpicklable_values()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests for resolving PTY transcripts through the virtual screen
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.vscreen import TranscriptBuffer, summarize
+
+
+def test_redraws_resolve_to_final_text():
+    """Progress bars, cursor-up redraws and full-screen apps leave only final text"""
+    buffer = TranscriptBuffer()
+    buffer.append(b"$ pull\r\n")
+    for percent in range(0, 101, 10):
+        buffer.append(f"\rDownloading {percent:3d}%".encode())
+    buffer.append(b"\r\n\x1b[1;32mdone\x1b[0m\r\n")
+    buffer.append(b"a: waiting\r\nb: waiting\r\n\x1b[2A\x1b[Ka: ok\r\n\x1b[Kb: ok\r\n")
+    buffer.append(b"\x1b[?1049h\x1b[H\x1b[2Jeditor screen\x1b[?1049lback\bk\r\n")
+
+    summary = summarize(buffer)
+    assert summary["text"] == "$ pull\nDownloading 100%\ndone\na: ok\nb: ok\nback"
+    assert summary["dropped_bytes"] == 0
+    print("✓ Redraws resolved")
+
+
+def test_transcript_is_bounded():
+    """The ring buffer and scrollback cap what a long session can store"""
+    buffer = TranscriptBuffer(max_bytes=4096)
+    for i in range(10000):
+        buffer.append(f"line {i}\r\n".encode())
+    assert buffer.size <= 4096 + 16
+    assert buffer.total > 100000
+
+    summary = summarize(buffer, columns=80, rows=10, max_scrollback=20)
+    lines = summary["text"].split("\n")
+    assert lines[0].startswith("⋯ ") and "not kept" in lines[0]
+    assert lines[-1] == "line 9999"
+    assert len(lines) <= 1 + 20 + 10
+    print("✓ Transcript bounded")
+
+
+if __name__ == "__main__":
+    test_redraws_resolve_to_final_text()
+    test_transcript_is_bounded()
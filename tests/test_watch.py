@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for inotify watchers, debouncing and re-run cancellation
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nexus_ai.core.watch import Watcher, pattern_regex, watch_loop
+
+
+def write(path, text="x\n"):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def test_pattern_regex():
+    """* stays within a directory, ** crosses any number of them"""
+    assert pattern_regex("/src/*.py").match("/src/a.py")
+    assert not pattern_regex("/src/*.py").match("/src/pkg/a.py")
+    assert pattern_regex("/src/**/*.py").match("/src/a.py")
+    assert pattern_regex("/src/**/*.py").match("/src/pkg/sub/a.py")
+    assert not pattern_regex("/src/**/*.py").match("/src/pkg/a.pyc")
+    assert pattern_regex("/log/app-[0-9].txt").match("/log/app-3.txt")
+    print("✓ Globs match the paths they should")
+
+
+def test_watcher_events_and_debounce():
+    """Matching changes are seen, new directories are watched, bursts are coalesced"""
+    async def run():
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "pkg"))
+            watcher = Watcher(["**/*.py"], cwd=root)
+            watcher.start()
+            try:
+                write(os.path.join(root, "notes.txt"))
+                write(os.path.join(root, "pkg", "a.py"))
+                changed = await asyncio.wait_for(watcher.settle(0.05), 2)
+                assert changed == {os.path.join(root, "pkg", "a.py")}, changed
+
+                os.makedirs(os.path.join(root, "pkg", "new"))
+                await asyncio.sleep(0.05)
+                for i in range(5):
+                    write(os.path.join(root, "pkg", "new", f"b{i}.py"))
+                    await asyncio.sleep(0.01)
+                changed = await asyncio.wait_for(watcher.settle(0.1), 2)
+                assert len(changed) == 5, changed
+            finally:
+                watcher.close()
+    asyncio.run(run())
+    print("✓ Watcher sees matching changes in new directories, debounced")
+
+
+def test_watch_loop_cancels_stale_runs():
+    """A change during a run cancels it; the command runs again once files settle"""
+    async def run():
+        with tempfile.TemporaryDirectory() as root:
+            target = os.path.join(root, "a.py")
+            write(target)
+            watcher = Watcher([target])
+            watcher.start()
+            started, finished, restarts = [], [], []
+
+            async def command(changed):
+                started.append(changed)
+                await asyncio.sleep(0.3)
+                finished.append(changed)
+
+            loop_task = asyncio.ensure_future(
+                watch_loop(watcher, command, debounce=0.05, on_restart=lambda: restarts.append(1)))
+            await asyncio.sleep(0.1)
+            write(target, "y\n")  # Interrupts the first run
+            await asyncio.sleep(0.6)
+            loop_task.cancel()
+            await asyncio.gather(loop_task, return_exceptions=True)
+            watcher.close()
+            assert started == [set(), {target}] and finished == [{target}] and restarts == [1]
+    asyncio.run(run())
+    print("✓ In-flight runs are cancelled by new changes")
+
+
+if __name__ == "__main__":
+    test_pattern_regex()
+    test_watcher_events_and_debounce()
+    test_watch_loop_cancels_stale_runs()